@@ -0,0 +1,187 @@
+import asyncio
+import os
+import random
+import time
+import aiohttp
+from request_scheduler import QuotaExceeded
+
+API_BASE_URL = "https://apiv3.apifootball.com/"
+
+# Connection pool settings (overridable from .env)
+API_POOL_LIMIT = int(os.getenv('API_POOL_LIMIT', '100'))
+API_POOL_LIMIT_PER_HOST = int(os.getenv('API_POOL_LIMIT_PER_HOST', '10'))
+API_DNS_CACHE_TTL = int(os.getenv('API_DNS_CACHE_TTL', '300'))
+API_KEEPALIVE_TIMEOUT = float(os.getenv('API_KEEPALIVE_TIMEOUT', '30'))
+API_TIMEOUT = float(os.getenv('API_TIMEOUT', '15'))
+API_CONNECT_TIMEOUT = float(os.getenv('API_CONNECT_TIMEOUT', '5'))
+
+# Retry settings for rate limiting (429) and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+API_RETRY_BACKOFF = float(os.getenv('API_RETRY_BACKOFF', '1'))
+API_MAX_BACKOFF = float(os.getenv('API_MAX_BACKOFF', '30'))
+
+
+class TokenBucket:
+    """Async token bucket allowing `rate` requests/second with bursts of `capacity`"""
+
+    def __init__(self, rate: float, capacity: float = 1, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def backoff_delay(attempt: int, retry_after=None, base: float = API_RETRY_BACKOFF,
+                  cap: float = API_MAX_BACKOFF) -> float:
+    """Full-jitter exponential backoff, honouring a numeric Retry-After header"""
+    if retry_after is not None and str(retry_after).isdigit():
+        return min(cap, float(retry_after)) + random.uniform(0, base)
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class ApiClient:
+    """Long-lived pooled HTTP client shared by every API-Football call"""
+
+    def __init__(self, base_url: str = API_BASE_URL,
+                 limit: int = API_POOL_LIMIT,
+                 limit_per_host: int = API_POOL_LIMIT_PER_HOST,
+                 dns_cache_ttl: int = API_DNS_CACHE_TTL,
+                 keepalive_timeout: float = API_KEEPALIVE_TIMEOUT,
+                 timeout: float = API_TIMEOUT,
+                 connect_timeout: float = API_CONNECT_TIMEOUT,
+                 rate_limiter: TokenBucket = None,
+                 store=None,
+                 scheduler=None,
+                 metrics=None):
+        self.base_url = base_url
+        self.rate_limiter = rate_limiter
+        # Optional response_store.ResponseStore consulted before the network
+        self.store = store
+        # Optional request_scheduler.RequestScheduler admitting every network request
+        self.scheduler = scheduler
+        # Optional metrics.Metrics recording latency and status per endpoint
+        self.metrics = metrics
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self.session = None
+        # HTTP requests actually sent, retries included, for budgeting
+        self.requests = 0
+
+    async def start(self):
+        """Open the pooled session (idempotent)"""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self
+
+    async def close(self):
+        """Close the session and release pooled connections"""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    async def fetch(self, params: dict, retries: int = 0, priority: int = None):
+        """GET the API with query params, returning (status, json_or_None)
+        
+        429 and 5xx responses and connection errors are retried up to
+        `retries` times with jittered exponential backoff. With a store,
+        fresh stored responses skip the network, successful ones are saved,
+        and a stale copy is returned if the API can't be reached or the
+        quota is spent. In offline mode a response missing from the store
+        returns (None, None). Raises QuotaExceeded when the scheduler's quota
+        is spent and there is nothing stored to fall back on.
+        """
+        if self.store is None:
+            return await self.fetch_network(params, retries, priority)
+        
+        # SQLite can wait up to its busy timeout on another process's write lock,
+        # so store calls run in a worker thread, off the event loop
+        data = await asyncio.to_thread(self.store.get, params)
+        if data is not None:
+            return 200, data
+        if self.store.offline:
+            return None, None
+        
+        try:
+            status, data = await self.fetch_network(params, retries, priority)
+        except (aiohttp.ClientError, asyncio.TimeoutError, QuotaExceeded):
+            stale = await asyncio.to_thread(self.store.get, params, True)
+            if stale is None:
+                raise
+            return 200, stale
+        
+        # The API reports bad keys and parameters as a 200 with an error object
+        if status == 200 and data is not None and not (isinstance(data, dict) and 'error' in data):
+            await asyncio.to_thread(self.store.put, params, data)
+        elif status in RETRY_STATUSES:
+            stale = await asyncio.to_thread(self.store.get, params, True)
+            if stale is not None:
+                return 200, stale
+        return status, data
+
+    async def fetch_network(self, params: dict, retries: int = 0, priority: int = None):
+        """GET the API itself, bypassing any store"""
+        await self.start()
+        for attempt in range(retries + 1):
+            retry_after = status = sent_at = None
+            # Each attempt, retries included, is admitted and counted by the scheduler
+            if self.scheduler is not None:
+                await self.scheduler.acquire(priority)
+            try:
+                if self.rate_limiter is not None:
+                    await self.rate_limiter.acquire()
+                self.requests += 1
+                sent_at = time.perf_counter()
+                async with self.session.get(self.base_url, params=params) as response:
+                    status = response.status
+                    if response.status == 200:
+                        try:
+                            return response.status, await response.json(content_type=None)
+                        except ValueError:
+                            return response.status, None
+                    retry_after = response.headers.get('Retry-After')
+                    if response.status not in RETRY_STATUSES or attempt == retries:
+                        return response.status, None
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if attempt == retries:
+                    raise
+            finally:
+                if self.scheduler is not None:
+                    self.scheduler.release()
+                    self.scheduler.record(status, retry_after)
+                if self.metrics is not None and sent_at is not None:
+                    endpoint = params.get('action', '')
+                    self.metrics.observe('api_request_seconds', time.perf_counter() - sent_at, endpoint=endpoint)
+                    self.metrics.inc('api_requests_total', endpoint=endpoint, status=status or 'error')
+            await asyncio.sleep(backoff_delay(attempt, retry_after))
+
+    async def get_json(self, params: dict):
+        """GET the API and return decoded JSON, or None on any failure"""
+        try:
+            _, data = await self.fetch(params)
+            return data
+        except Exception:
+            return None
@@ -0,0 +1,85 @@
+"""
+Atomic file and directory writes shared by the bot and the pipeline
+Output goes to a uniquely named temp file or directory beside the target and
+is renamed over it once complete, so readers (the bot, a scraper, a resumed
+run) see the old version or the new one, never half of either, and two
+writers never share a temp path
+"""
+
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+# mkstemp/mkdtemp create owner-only paths; finished files get the usual umask permissions
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+
+def remove_path(path: str):
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def temp_beside(path: str, directory: bool = False) -> str:
+    """A new, uniquely named temp file or directory in the target's directory"""
+    parent = os.path.dirname(path) or '.'
+    os.makedirs(parent, exist_ok=True)
+    prefix = f".{os.path.basename(path)}."
+    if directory:
+        tmp_path = tempfile.mkdtemp(prefix=prefix, suffix='.tmp', dir=parent)
+        os.chmod(tmp_path, 0o777 & ~UMASK)
+    else:
+        fd, tmp_path = tempfile.mkstemp(prefix=prefix, suffix='.tmp', dir=parent)
+        os.close(fd)
+        os.chmod(tmp_path, 0o666 & ~UMASK)
+    return tmp_path
+
+
+@contextmanager
+def atomic_path(path: str):
+    """Yield a temp file path to write to; it replaces `path` when the block succeeds"""
+    tmp_path = temp_beside(path)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        remove_path(tmp_path)
+        raise
+
+
+@contextmanager
+def atomic_dir(path: str):
+    """Yield an empty temp directory to fill; it replaces the directory `path` when the block succeeds
+
+    A directory can't be renamed over a non-empty one, so the old one moves
+    to `path`.old first; readers seeing neither should retry (see
+    event_store.load_event_store).
+    """
+    tmp_path = temp_beside(path, directory=True)
+    try:
+        yield tmp_path
+        old_path = f"{path}.old"
+        if os.path.isdir(path):
+            remove_path(old_path)
+            os.rename(path, old_path)
+        try:
+            os.rename(tmp_path, path)
+        except OSError:
+            if os.path.isdir(old_path):
+                os.rename(old_path, path)
+            raise
+        remove_path(old_path)
+    except BaseException:
+        remove_path(tmp_path)
+        raise
+
+
+@contextmanager
+def atomic_open(path: str, mode: str = 'w'):
+    """open() for writing, atomically replacing `path` once the file is closed"""
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, mode) as f:
+            yield f
@@ -0,0 +1,64 @@
+"""
+How head-to-head lookups scale with the number of events
+Compares the full scan in calculate_h2h_record against the pair index
+
+    python benchmarks/bench_h2h.py --seasons 1 5 10 --leagues 1 3
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_events
+from data_pipeline.build_features import calculate_h2h_record, build_h2h_index, lookup_h2h_record
+from data_pipeline.matches import parse_events
+
+
+def time_scan(events: list) -> float:
+    start = time.perf_counter()
+    for event in events:
+        calculate_h2h_record(events, event.home_id, event.away_id)
+    return time.perf_counter() - start
+
+
+def time_index(events: list) -> float:
+    start = time.perf_counter()
+    index = build_h2h_index(events)
+    for event in events:
+        lookup_h2h_record(index, event.home_id, event.away_id)
+    return time.perf_counter() - start
+
+
+def check_parity(events: list):
+    index = build_h2h_index(events)
+    for event in events[:200]:
+        home_id, away_id = event.home_id, event.away_id
+        assert lookup_h2h_record(index, home_id, away_id) == calculate_h2h_record(events, home_id, away_id)
+
+
+def main(seasons: list, leagues: list, max_scan_events: int):
+    print(f"{'leagues':>8}{'seasons':>9}{'events':>9}{'scan (s)':>12}{'index (s)':>12}{'speedup':>10}")
+    for n_leagues in leagues:
+        for n_seasons in seasons:
+            events = parse_events(make_events(seasons=n_seasons, leagues=n_leagues))
+            check_parity(events)
+            index_time = time_index(events)
+            if len(events) <= max_scan_events:
+                scan_time = time_scan(events)
+                scan, speedup = f"{scan_time:.3f}", f"{scan_time / index_time:.0f}x"
+            else:
+                scan, speedup = "skipped", "-"
+            print(f"{n_leagues:>8}{n_seasons:>9}{len(events):>9}{scan:>12}{index_time:>12.4f}{speedup:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--seasons', type=int, nargs='+', default=[1, 2, 5, 10])
+    parser.add_argument('--leagues', type=int, nargs='+', default=[1])
+    parser.add_argument('--max-scan-events', type=int, default=4000,
+                        help="skip the quadratic scan above this many events")
+    args = parser.parse_args()
+    main(args.seasons, args.leagues, args.max_scan_events)
@@ -0,0 +1,68 @@
+"""
+Compare a fresh aiohttp session per call against the shared pooled ApiClient
+Runs entirely against a local stub server, no API key needed
+
+    python benchmarks/bench_http_client.py --calls 200
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiohttp
+from api_client import ApiClient
+from benchmarks.stub_api import StubApi
+
+PARAMS = {'action': 'get_standings', 'league_id': '152', 'APIkey': 'stub'}
+
+
+async def session_per_call(base_url: str, calls: int):
+    """Previous behaviour: open a new ClientSession for every request"""
+    for _ in range(calls):
+        async with aiohttp.ClientSession() as session:
+            async with session.get(base_url, params=PARAMS) as response:
+                await response.json()
+
+
+async def shared_client(base_url: str, calls: int):
+    """New behaviour: one pooled client reused across requests"""
+    client = ApiClient(base_url=base_url)
+    await client.start()
+    try:
+        for _ in range(calls):
+            await client.get_json(PARAMS)
+    finally:
+        await client.close()
+
+
+async def run(calls: int):
+    results = {}
+    for name, runner in [('session per call', session_per_call), ('shared ApiClient', shared_client)]:
+        stub = await StubApi().start()
+        try:
+            start = time.perf_counter()
+            await runner(stub.base_url, calls)
+            elapsed = time.perf_counter() - start
+        finally:
+            await stub.stop()
+        results[name] = (elapsed, len(stub.connections), stub.requests)
+
+    print(f"{'mode':<20}{'requests':>10}{'connections':>13}{'ms/request':>12}")
+    for name, (elapsed, connections, requests) in results.items():
+        print(f"{name:<20}{requests:>10}{connections:>13}{elapsed / requests * 1000:>12.3f}")
+
+    old, new = results['session per call'], results['shared ApiClient']
+    assert new[1] == 1, f"expected a single reused connection, saw {new[1]}"
+    print(f"\nShared client reused 1 connection for {new[2]} requests "
+          f"({old[0] / new[0]:.1f}x faster per request)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--calls', type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.calls))
@@ -0,0 +1,107 @@
+"""
+Prediction latency and load time on the shipped model
+Compares DataFrame + predict_proba against the flat NumPy forest and the
+precomputed probability table, checking both agree with the model
+
+    python benchmarks/bench_inference.py
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import joblib
+import numpy as np
+import pandas as pd
+from prob_table import ProbabilityTable
+from flat_forest import FlatForest, check_parity
+
+warnings.filterwarnings('ignore', category=UserWarning)
+
+
+def per_call(fn, repeat: int) -> float:
+    """Mean seconds per call after one warm-up call"""
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def random_rows(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        rng.integers(0, 6, n), rng.integers(0, 6, n),
+        rng.integers(1, 21, n), rng.integers(1, 21, n),
+        rng.integers(0, 6, n), rng.integers(0, 6, n),
+    ]).astype(float)
+
+
+def main(model_dir: str, repeat: int):
+    model_path = os.path.join(model_dir, 'predictor.joblib')
+    model = joblib.load(model_path)
+    feature_columns = joblib.load(os.path.join(model_dir, 'feature_info.joblib'))['feature_columns']
+    rows = random_rows(1000)
+    row = rows[:1]
+
+    if not hasattr(model, 'estimators_'):
+        print(f"Shipped model is a {type(model).__name__}, not a forest; see data_pipeline/compress_model.py")
+        return
+
+    # Flat forest: parity with predict_proba, then load time of both formats
+    flat = FlatForest.from_sklearn(model, feature_columns)
+    difference = check_parity(model, flat, rows)
+    assert difference == 0.0, f"flat forest differs from predict_proba by {difference:.2e}"
+    print(f"Flat forest: {flat.n_trees} trees, {len(flat.feature):,} nodes, "
+          f"identical to predict_proba on {len(rows)} rows")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        flat_path = os.path.join(tmp, 'predictor_flat.npz')
+        flat.save(flat_path)
+        joblib_load = per_call(lambda: joblib.load(model_path), 5)
+        flat_load = per_call(lambda: FlatForest.load(flat_path), 5)
+    print(f"Load time: joblib {joblib_load * 1000:.1f} ms, flat npz {flat_load * 1000:.1f} ms "
+          f"({joblib_load / flat_load:.0f}x faster)\n")
+
+    table = ProbabilityTable.build(model, feature_columns)
+    cells = table.table.size // len(table.classes)
+    print(f"Probability table: {cells:,} cells, {table.nbytes / 1e6:.1f} MB, built in {table.build_seconds:.2f}s")
+
+    # Table must agree with the model (up to float32 storage)
+    expected = model.predict_proba(pd.DataFrame(rows, columns=feature_columns))
+    looked_up, in_range = table.lookup_batch(rows)
+    assert in_range.all()
+    print(f"Max abs difference vs predict_proba: {np.abs(expected - looked_up).max():.2e}")
+
+    results = {
+        'DataFrame + predict_proba': per_call(
+            lambda: model.predict_proba(pd.DataFrame(row, columns=feature_columns)), repeat),
+        'flat forest': per_call(lambda: flat.predict_proba(row), repeat),
+        'table lookup_batch': per_call(lambda: table.lookup_batch(row), repeat * 100),
+        'table lookup (dict row)': per_call(
+            lambda: table.lookup(dict(zip(feature_columns, row[0]))), repeat * 100),
+    }
+    print(f"\n{'single-row path':<28}{'latency':>14}")
+    for name, seconds in results.items():
+        print(f"{name:<28}{seconds * 1e6:>11.1f} us")
+    baseline = results['DataFrame + predict_proba']
+    print(f"\nFlat forest is {baseline / results['flat forest']:.0f}x faster per prediction, "
+          f"table lookup {baseline / results['table lookup_batch']:.0f}x")
+
+    batch = rows[:100]
+    sklearn_batch = per_call(lambda: model.predict_proba(pd.DataFrame(batch, columns=feature_columns)), repeat)
+    flat_batch = per_call(lambda: flat.predict_proba(batch), repeat)
+    print(f"100-row batch: predict_proba {sklearn_batch * 1000:.2f} ms, flat forest {flat_batch * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--model-dir', default='models')
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+    main(args.model_dir, args.repeat)
@@ -0,0 +1,74 @@
+"""
+Memory and feature-build time of raw API dicts vs compact Match records
+
+    python benchmarks/bench_matches.py --seasons 10 --leagues 3
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_events
+from data_pipeline.build_features import calculate_h2h_record, extract_features_offline
+from data_pipeline.event_store import convert_json
+from data_pipeline.matches import load_matches
+
+
+def traced(load):
+    """Run load() and return (result, bytes allocated, seconds)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = load()
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+def main(seasons: int, leagues: int):
+    events = make_events(seasons=seasons, leagues=leagues)
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, 'raw_events.json')
+        store_path = os.path.join(tmp, 'events')
+        with open(json_path, 'w') as f:
+            json.dump(events, f, indent=2)
+        convert_json(json_path, store_path)
+
+        def load_dicts():
+            with open(json_path) as f:
+                return json.load(f)
+
+        dicts, dict_bytes, dict_load = traced(load_dicts)
+        matches, match_bytes, match_load = traced(lambda: load_matches(store_path))
+
+    start = time.perf_counter()
+    features = extract_features_offline(matches)
+    build_time = time.perf_counter() - start
+
+    # Per-match inner loop cost: one H2H scan over every record
+    sample = matches[0]
+    start = time.perf_counter()
+    calculate_h2h_record(matches, sample.home_id, sample.away_id)
+    scan_time = time.perf_counter() - start
+
+    print(f"{len(events)} events ({seasons} seasons x {leagues} leagues)")
+    print(f"{'':<16}{'bytes/event':>12}{'load (s)':>10}")
+    print(f"{'API dicts':<16}{dict_bytes / len(dicts):>12.0f}{dict_load:>10.3f}")
+    print(f"{'Match records':<16}{match_bytes / len(matches):>12.0f}{match_load:>10.3f}")
+    print(f"\nMemory per event: {dict_bytes / match_bytes:.1f}x smaller")
+    print(f"Offline feature build: {build_time:.3f}s for {len(features)} rows")
+    print(f"Full H2H scan over typed records: {scan_time * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--seasons', type=int, default=10)
+    parser.add_argument('--leagues', type=int, default=3)
+    args = parser.parse_args()
+    main(args.seasons, args.leagues)
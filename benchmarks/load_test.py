@@ -0,0 +1,230 @@
+"""
+Load test for the bot's command handlers, no Discord or API access needed
+Calls the /predict and /result coroutines with fake interactions against the
+local stub API, ramping concurrency and reporting throughput, latency
+percentiles and event-loop lag per stage
+
+    python benchmarks/load_test.py --latency 0.05 --error-rate 0.02 --levels 1 4 16 64
+    python benchmarks/load_test.py --cache --duration 10   # with the response caches warm
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+warnings.filterwarnings('ignore', category=UserWarning)
+
+# The bot reads these at import time
+TMP_DIR = tempfile.mkdtemp(prefix='load_test_')
+os.environ['RESPONSE_STORE_PATH'] = os.path.join(TMP_DIR, 'responses.sqlite3')
+os.environ['API_FOOTBALL_KEY'] = 'load-test'
+
+import bot
+from api_client import ApiClient
+from request_scheduler import RequestScheduler
+from response_cache import ResponseCache
+from response_store import ResponseStore
+from benchmarks.stub_api import StubApi
+
+LEVELS = [1, 2, 4, 8, 16, 32, 64]
+LAG_INTERVAL = 0.01
+
+
+class FakeResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+
+    async def send_message(self, content=None, ephemeral=False):
+        self.interaction.record(content)
+
+    async def defer(self):
+        pass
+
+
+class FakeFollowup:
+    def __init__(self, interaction):
+        self.interaction = interaction
+
+    async def send(self, content=None):
+        self.interaction.record(content)
+
+
+class FakeUser:
+    class guild_permissions:
+        administrator = True
+
+
+class FakeInteraction:
+    """Just enough of discord.Interaction for the command handlers"""
+
+    def __init__(self):
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+        self.user = FakeUser()
+        self.extras = {}
+        self.content = None
+
+    def record(self, content):
+        self.content = content
+
+    async def edit_original_response(self, content=None):
+        self.record(content)
+
+
+def percentile(samples: list, q: float) -> float:
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, max(0, int(round(q * len(samples))) - 1))]
+
+
+async def monitor_lag(lags: list, stop: asyncio.Event):
+    """Record how late a short sleep wakes up: time the loop spent blocked"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(LAG_INTERVAL)
+        lags.append(max(0.0, loop.time() - start - LAG_INTERVAL))
+
+
+async def call_command(rng: random.Random, predict_share: float, teams: list):
+    """Run one command, returning (command name, seconds, ok)"""
+    home, away = rng.sample(teams, 2)
+    interaction = FakeInteraction()
+    start = time.perf_counter()
+    if rng.random() < predict_share:
+        name = 'predict'
+        await bot.predict.callback(interaction, home, away)
+    else:
+        name = 'result'
+        await bot.result.callback(interaction, home, away)
+    ok = interaction.content is not None and not interaction.content.startswith('❌')
+    return name, time.perf_counter() - start, ok
+
+
+async def run_stage(concurrency: int, duration: float, predict_share: float, teams: list, seed: int) -> dict:
+    latencies = {'predict': [], 'result': []}
+    errors = 0
+    lags = []
+    stop = asyncio.Event()
+    deadline = time.perf_counter() + duration
+
+    async def worker(worker_id):
+        nonlocal errors
+        rng = random.Random(seed * 1000 + worker_id)
+        while time.perf_counter() < deadline:
+            name, seconds, ok = await call_command(rng, predict_share, teams)
+            latencies[name].append(seconds)
+            errors += not ok
+
+    lag_task = asyncio.create_task(monitor_lag(lags, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await lag_task
+
+    everything = latencies['predict'] + latencies['result']
+    return {
+        'concurrency': concurrency,
+        'requests': len(everything),
+        'throughput': len(everything) / elapsed,
+        'error_rate': errors / len(everything) if everything else 0.0,
+        'p50': percentile(everything, 0.5),
+        'p95': percentile(everything, 0.95),
+        'p99': percentile(everything, 0.99),
+        'predict_p95': percentile(latencies['predict'], 0.95),
+        'result_p95': percentile(latencies['result'], 0.95),
+        'lag_p99': percentile(lags, 0.99),
+        'lag_max': max(lags, default=0.0),
+    }
+
+
+def sustainable(stages: list, degradation: float) -> dict:
+    """Last stage before p95 latency exceeds `degradation` times the single-user p95"""
+    best = stages[0]
+    for stage in stages[1:]:
+        if stage['p95'] > stages[0]['p95'] * degradation:
+            break
+        best = stage
+    return best
+
+
+async def main(levels: list, duration: float, latency: float, error_rate: float, predict_share: float,
+               cache: bool, degradation: float, output: str, seed: int):
+    stub = await StubApi(latency=latency, error_rate=error_rate, seed=seed).start()
+
+    # Same wiring as the bot, pointed at the stub; caches off unless --cache
+    bot.request_scheduler = RequestScheduler(daily_quota=10 ** 9, path=os.path.join(TMP_DIR, 'quota.sqlite3'))
+    store = ResponseStore(os.path.join(TMP_DIR, 'responses.sqlite3')) if cache else None
+    bot.api_client = ApiClient(stub.base_url, store=store, scheduler=bot.request_scheduler, metrics=bot.metrics)
+    if not cache:
+        bot.response_cache = ResponseCache(ttls={'get_standings': 0, 'get_events': 0, 'get_H2H': 0})
+    await bot.api_client.start()
+    await bot.batch_predictor.start()
+
+    try:
+        bot.load_model()
+        if bot.model_bundle is None:
+            return
+        await bot.refresh_team_index.coro()
+        teams = sorted(bot.team_index.names.values())
+
+        print(f"\n🔥 Load test: stub latency {latency * 1000:.0f}ms, error rate {error_rate:.0%}, "
+              f"{predict_share:.0%} /predict, caches {'on' if cache else 'off'}, "
+              f"{bot.request_scheduler.max_in_flight} API requests in flight")
+        print(f"{'conc':>5}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}"
+              f"{'lag p99':>9}{'lag max':>9}")
+        stages = []
+        for concurrency in levels:
+            stage = await run_stage(concurrency, duration, predict_share, teams, seed)
+            stages.append(stage)
+            print(f"{concurrency:>5}{stage['throughput']:>9.1f}{stage['p50'] * 1000:>9.1f}"
+                  f"{stage['p95'] * 1000:>9.1f}{stage['p99'] * 1000:>9.1f}{stage['error_rate']:>8.1%}"
+                  f"{stage['lag_p99'] * 1000:>9.1f}{stage['lag_max'] * 1000:>9.1f}")
+
+        best = sustainable(stages, degradation)
+        print(f"\n✅ Sustains ~{best['throughput']:.0f} commands/s at concurrency {best['concurrency']} "
+              f"before p95 latency passes {degradation:g}x the single-user p95")
+        print(f"Stub API served {stub.requests} requests ({stub.errors} injected errors)")
+
+        if output:
+            with open(output, 'w') as f:
+                json.dump({'latency': latency, 'error_rate': error_rate, 'predict_share': predict_share,
+                           'cache': cache, 'stages': stages}, f, indent=2)
+            print(f"Results saved to {output}")
+    finally:
+        await bot.batch_predictor.stop()
+        await bot.api_client.close()
+        bot.request_scheduler.close()
+        if store is not None:
+            store.close()
+        bot.response_store.close()
+        await stub.stop()
+        shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--levels', type=int, nargs='+', default=LEVELS, help="concurrency levels to ramp through")
+    parser.add_argument('--duration', type=float, default=5, help="seconds per level")
+    parser.add_argument('--latency', type=float, default=0.05, help="stub API latency in seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="share of stub responses that are 503s")
+    parser.add_argument('--predict-share', type=float, default=0.8, help="share of commands that are /predict")
+    parser.add_argument('--cache', action='store_true', help="keep the response cache and store enabled")
+    parser.add_argument('--degradation', type=float, default=2.0,
+                        help="p95 multiple of the single-user p95 that counts as degraded")
+    parser.add_argument('--output', default=None, help="save per-stage results as JSON")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(main(args.levels, args.duration, args.latency, args.error_rate, args.predict_share,
+                     args.cache, args.degradation, args.output, args.seed))
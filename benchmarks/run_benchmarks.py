@@ -0,0 +1,229 @@
+"""
+Repeatable microbenchmarks for the pipeline and inference hot paths
+Runs offline on synthetic (or recorded) events, saves timings as JSON and
+compares them with a stored baseline to catch regressions
+
+    python benchmarks/run_benchmarks.py --seasons 5 --save-baseline
+    python benchmarks/run_benchmarks.py --seasons 5           # compare with the baseline
+    python benchmarks/run_benchmarks.py --events data_pipeline/events --only form
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import warnings
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from benchmarks.synthetic import make_events
+from data_pipeline.build_features import (FORM_WINDOW, calculate_form, calculate_h2h_record, build_h2h_index,
+                                          extract_features, extract_features_offline)
+from data_pipeline.matches import parse_events, load_matches
+from data_pipeline.feature_store import FeatureStore
+from data_pipeline.train_model import FEATURE_COLUMNS, split_dataset, fit_model
+import bot
+
+warnings.filterwarnings('ignore', category=UserWarning)
+
+RESULTS_PATH = 'benchmarks/results.json'
+BASELINE_PATH = 'benchmarks/baseline.json'
+MODEL_PATH = 'models/predictor.joblib'
+# Slowdown against the baseline that counts as a regression
+REGRESSION_THRESHOLD = 0.2
+
+
+def measure(fn, repeat: int = 5, number: int = 1, warmup: bool = True) -> dict:
+    """Seconds per call of fn(): median and min over `repeat` runs of `number` calls"""
+    if warmup:
+        fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - start) / number)
+    return {'median': statistics.median(times), 'min': min(times), 'repeat': repeat, 'number': number}
+
+
+def quiet(coroutine):
+    """Run a coroutine with its progress prints suppressed"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return asyncio.run(coroutine)
+
+
+class ReplayClient:
+    """Answers the online feature fetchers from in-memory events, no network"""
+
+    def __init__(self, events: list, standings: list):
+        self.standings = standings
+        self.by_team = {}
+        for event in sorted(events, key=lambda e: (e['match_date'], e['match_time'])):
+            for key in ('match_hometeam_id', 'match_awayteam_id'):
+                self.by_team.setdefault(event[key], []).append(event)
+
+    async def get_json(self, params: dict):
+        if params['action'] == 'get_standings':
+            return self.standings
+        return self.by_team.get(str(params['team_id']), [])[-int(params['limit']):]
+
+
+def load_events(path: str = None, seasons: int = 5, leagues: int = 1):
+    """(API dicts, Match records) from a recorded store/JSON file or the synthetic generator"""
+    if path is None:
+        events = make_events(seasons=seasons, leagues=leagues)
+        return events, parse_events(events)
+    if os.path.isdir(path):
+        from data_pipeline.event_store import load_events as load_stored_events
+        events = load_stored_events(path)
+        return events, load_matches(path)
+    with open(path, 'r') as f:
+        events = json.load(f)
+    return events, parse_events(events)
+
+
+def build_cases(events: list, matches: list, rows: int):
+    """(name, fn, measure kwargs) for every benchmark"""
+    team_ids = sorted({m.home_id for m in matches})[:20]
+    recent_dicts = {str(t): [e for e in events if str(t) in (e['match_hometeam_id'], e['match_awayteam_id'])][-FORM_WINDOW:]
+                    for t in team_ids}
+    recent_matches = {t: parse_events(recent_dicts[str(t)]) for t in team_ids}
+    pairs = [(m.home_id, m.away_id) for m in matches[:50]]
+
+    standings = [{'team_id': str(t), 'overall_league_position': str(position)}
+                 for position, t in enumerate(team_ids, start=1)]
+    client = ReplayClient(events, standings)
+    # The online path walks every fixture, so time it on the latest season only
+    online_matches = matches[-380:]
+
+    def build_store():
+        store = FeatureStore()
+        store.apply(matches)
+        return store
+    store = build_store()
+
+    features = pd.DataFrame(extract_features_offline(matches))
+    X_train, _, y_train, _ = split_dataset(features)
+
+    model = joblib.load(MODEL_PATH)
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.integers(0, 6, rows), rng.integers(0, 6, rows), rng.integers(1, 21, rows),
+                         rng.integers(1, 21, rows), rng.integers(0, 6, rows), rng.integers(0, 6, rows)]).astype(float)
+    single_frames = [pd.DataFrame(X[i:i + 1], columns=FEATURE_COLUMNS) for i in range(rows)]
+    batch_frame = pd.DataFrame(X, columns=FEATURE_COLUMNS)
+
+    return [
+        ('calculate_form_bot', lambda: [bot.calculate_form(recent_dicts[str(t)], str(t)) for t in team_ids],
+         {'number': 50}),
+        ('calculate_form_pipeline', lambda: [calculate_form(recent_matches[t], t) for t in team_ids],
+         {'number': 50}),
+        ('calculate_h2h_record_x50', lambda: [calculate_h2h_record(matches, h, a) for h, a in pairs], {}),
+        ('build_h2h_index', lambda: build_h2h_index(matches), {}),
+        ('extract_features_offline', lambda: extract_features_offline(matches), {'repeat': 3}),
+        ('extract_features_online_replay', lambda: quiet(extract_features(online_matches, 'bench', client)),
+         {'repeat': 3}),
+        ('feature_store_build', build_store, {'repeat': 3}),
+        ('feature_store_features_x50', lambda: [store.features(h, a) for h, a in pairs], {'number': 50}),
+        ('train_model_fit', lambda: fit_model(X_train, y_train), {'repeat': 3, 'warmup': False}),
+        (f'predict_proba_single_x{rows}', lambda: [model.predict_proba(frame) for frame in single_frames],
+         {'repeat': 3}),
+        (f'predict_proba_batch_x{rows}', lambda: model.predict_proba(batch_frame), {'number': 5}),
+    ]
+
+
+def compare(results: dict, baseline: dict, threshold: float = REGRESSION_THRESHOLD) -> list:
+    """Print current vs baseline medians; return the names that regressed"""
+    regressions = []
+    print(f"\n{'Benchmark':<34}{'baseline':>12}{'current':>12}{'ratio':>8}")
+    for name, current in results['results'].items():
+        before = baseline['results'].get(name)
+        if before is None:
+            print(f"{name:<34}{'-':>12}{current['median'] * 1000:>10.3f}ms{'new':>8}")
+            continue
+        ratio = current['median'] / before['median'] if before['median'] else float('inf')
+        flag = ' ⚠️' if ratio > 1 + threshold else ''
+        print(f"{name:<34}{before['median'] * 1000:>10.3f}ms{current['median'] * 1000:>10.3f}ms{ratio:>7.2f}x{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main(seasons: int, leagues: int, events_path: str, rows: int, only: list, output: str,
+         baseline_path: str, save_baseline: bool, threshold: float) -> int:
+    events, matches = load_events(events_path, seasons, leagues)
+    print(f"⏱️ Benchmarking on {len(matches)} events "
+          f"({events_path or f'synthetic, {seasons} seasons x {leagues} leagues'})")
+
+    results = {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'events': len(matches),
+            'source': events_path or f'synthetic:{seasons}x{leagues}',
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'sklearn': sklearn.__version__,
+            'machine': platform.machine(),
+        },
+        'results': {},
+    }
+    for name, fn, kwargs in build_cases(events, matches, rows):
+        if only and not any(pattern in name for pattern in only):
+            continue
+        results['results'][name] = timing = measure(fn, **kwargs)
+        print(f"  {name:<34}{timing['median'] * 1000:>10.3f}ms  (min {timing['min'] * 1000:.3f}ms)")
+
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"✅ Results saved to {output}")
+
+    if save_baseline:
+        with open(baseline_path, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Baseline saved to {baseline_path}")
+        return 0
+
+    if not os.path.exists(baseline_path):
+        print(f"No baseline at {baseline_path}; rerun with --save-baseline to create one")
+        return 0
+    with open(baseline_path, 'r') as f:
+        baseline = json.load(f)
+    if baseline['meta'].get('source') != results['meta']['source']:
+        print(f"⚠️ Baseline was measured on {baseline['meta'].get('source')}, not comparable")
+        return 0
+
+    regressions = compare(results, baseline, threshold)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) over {threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    print(f"\n✅ No regressions over {threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seasons', type=int, default=5, choices=range(1, 21), metavar='1-20',
+                        help="synthetic seasons to generate")
+    parser.add_argument('--leagues', type=int, default=1)
+    parser.add_argument('--events', default=None, help="recorded events: an event store dir or raw_events.json")
+    parser.add_argument('--rows', type=int, default=64, help="rows for single vs batched predict_proba")
+    parser.add_argument('--only', nargs='+', default=None, help="run benchmarks whose name contains any of these")
+    parser.add_argument('--output', default=RESULTS_PATH)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help="store this run as the new baseline")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="slowdown ratio above the baseline that counts as a regression")
+    args = parser.parse_args()
+    sys.exit(main(args.seasons, args.leagues, args.events, args.rows, args.only, args.output,
+                  args.baseline, args.save_baseline, args.threshold))
@@ -0,0 +1,92 @@
+"""
+Local stub of the API-Football endpoints used by the bot
+Serves canned JSON over plain HTTP and counts the TCP connections it accepts
+"""
+
+import asyncio
+import random
+from aiohttp import web
+
+
+def make_fixture(match_id: int, home_id: int, away_id: int, home_score: int = 1, away_score: int = 0):
+    """Build one API-Football style event dict"""
+    return {
+        'match_id': str(match_id),
+        'match_date': '2024-01-01',
+        'match_time': '15:00',
+        'match_status': 'Finished',
+        'league_id': '152',
+        'league_name': 'Premier League',
+        'match_hometeam_id': str(home_id),
+        'match_hometeam_name': f'Team {home_id}',
+        'match_awayteam_id': str(away_id),
+        'match_awayteam_name': f'Team {away_id}',
+        'match_hometeam_score': str(home_score),
+        'match_awayteam_score': str(away_score),
+    }
+
+
+class StubApi:
+    """aiohttp.web stub with configurable latency and error rate"""
+
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.connections = set()
+        self.actions = {}
+        self.runner = None
+        self.port = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.port}/"
+
+    async def handle(self, request):
+        self.requests += 1
+        self.connections.add(request.transport.get_extra_info('peername'))
+        action = request.query.get('action', '')
+        self.actions[action] = self.actions.get(action, 0) + 1
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.errors += 1
+            return web.json_response({'error': 'stub failure'}, status=503)
+
+        if action == 'get_standings':
+            return web.json_response([
+                {'team_id': str(team_id), 'team_name': f'Team {team_id}', 'overall_league_position': str(pos)}
+                for pos, team_id in enumerate(range(1, 21), start=1)
+            ])
+        if action == 'get_events':
+            team_id = request.query.get('team_id', '1')
+            team_id = int(team_id) if team_id.isdigit() else 1
+            limit = int(request.query.get('limit', '5'))
+            return web.json_response([
+                make_fixture(i, team_id, (team_id + i) % 20 + 1, i % 3, 1) for i in range(limit)
+            ])
+        if action == 'get_H2H':
+            return web.json_response({
+                'firstTeam_VS_secondTeam': [make_fixture(1, 1, 2, 2, 1)],
+                'firstTeam_lastResults': [],
+                'secondTeam_lastResults': [],
+            })
+        return web.json_response({'error': 'unknown action'}, status=404)
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/', self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+        self.runner = None
@@ -1,68 +1,293 @@
 import discord
-from discord.ext import commands
+from discord import app_commands
+from discord.ext import commands, tasks
 from dotenv import load_dotenv
 import os
-import aiohttp
-import joblib
-import pandas as pd
-import urllib.parse
+import sys
+import time
+import asyncio
+from datetime import date, datetime, timedelta
 from typing import Optional
 
-bot = commands.Bot(command_prefix='!', intents=discord.Intents.default())
-API_BASE_URL = "https://apiv3.apifootball.com/"
+# Settings below and in the project modules are read at import time, so .env goes first
+load_dotenv()
 
-# Global variables for ML model and caching
-model = None
-feature_columns = None
-standings_cache = {}
+from api_client import ApiClient
+from response_cache import ResponseCache
+from response_store import ResponseStore, FINAL_STATUSES
+from request_scheduler import RequestScheduler, INTERACTIVE, PREFETCH, current_priority
+from inference import BatchPredictor
+from model_store import load_bundle, model_version
+from team_index import TeamIndex, build_team_index, load_stored_team_names
+from metrics import Metrics
+from data_pipeline.feature_store import FeatureStore, FEATURE_STORE_PATH, FORM_WINDOW
+
+# Latency histograms and counters behind /stats and the Prometheus export
+metrics = Metrics()
+# Export path for a Prometheus textfile scraper (disabled when empty)
+METRICS_TEXTFILE = os.getenv('METRICS_TEXTFILE', '')
+METRICS_EXPORT_SECONDS = float(os.getenv('METRICS_EXPORT_SECONDS', '15'))
+# Responses persisted on disk, so restarts don't refetch (API_OFFLINE=1 replays them)
+response_store = ResponseStore()
+# Daily API quota and priorities (commands > prefetch > pipeline backfill)
+request_scheduler = RequestScheduler()
+# Shared pooled HTTP client, opened in setup_hook and closed on shutdown
+api_client = ApiClient(store=response_store, scheduler=request_scheduler, metrics=metrics)
+# TTL/LRU cache in front of the API, coalescing identical in-flight lookups
+response_cache = ResponseCache()
+
+class InstrumentedTree(app_commands.CommandTree):
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        # Start of the command's end-to-end latency, see on_app_command_completion
+        interaction.extras['started'] = time.perf_counter()
+        return True
+
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        command = interaction.command.name if interaction.command else 'unknown'
+        metrics.inc('command_errors_total', command=command)
+        await super().on_error(interaction, error)
+
+class FootballBot(commands.Bot):
+    async def setup_hook(self):
+        await api_client.start()
+        await batch_predictor.start()
+        # Load the model in the background instead of blocking startup
+        watch_model_files.start()
+        refresh_team_index.start()
+        refresh_feature_store.start()
+        prefetch_upcoming.start()
+        if METRICS_TEXTFILE:
+            export_metrics.start()
+
+    async def close(self):
+        watch_model_files.cancel()
+        refresh_team_index.cancel()
+        refresh_feature_store.cancel()
+        prefetch_upcoming.cancel()
+        export_metrics.cancel()
+        await batch_predictor.stop()
+        await api_client.close()
+        response_store.close()
+        request_scheduler.close()
+        await super().close()
+
+bot = FootballBot(command_prefix='!', intents=discord.Intents.default(), tree_cls=InstrumentedTree)
+
+# Current model version: model, feature columns, flat forest and optional
+# probability table, replaced as one object on hot reload
+model_bundle = None
+# Precompute probabilities over the whole feature grid (PROBA_TABLE=1 in .env)
+USE_PROBA_TABLE = os.getenv('PROBA_TABLE', '0') == '1'
+# How often to check models/ for a newly trained model
+MODEL_RELOAD_SECONDS = float(os.getenv('MODEL_RELOAD_SECONDS', '60'))
+
+# Team name -> team_id index behind name resolution and autocomplete,
+# rebuilt from stored events and current standings and swapped in whole
+team_index = TeamIndex()
+TEAM_INDEX_LEAGUES = [league.strip() for league in os.getenv('TEAM_INDEX_LEAGUES', '152').split(',') if league.strip()]
+TEAM_INDEX_REFRESH_HOURS = float(os.getenv('TEAM_INDEX_REFRESH_HOURS', '24'))
+# Retry interval while the index is still empty (no event store and no standings yet)
+TEAM_INDEX_RETRY_MINUTES = float(os.getenv('TEAM_INDEX_RETRY_MINUTES', '5'))
+
+# Per-team form, league tables and H2H tallies saved by the data pipeline; matches
+# that finish later are rolled in here, so features need no per-request API calls
+feature_store = None
+feature_store_mtime = None
+FEATURE_STORE_LEAGUES = [league.strip() for league in os.getenv('FEATURE_STORE_LEAGUES', '152').split(',') if league.strip()]
+FEATURE_STORE_REFRESH_MINUTES = float(os.getenv('FEATURE_STORE_REFRESH_MINUTES', '180'))
+
+# Upcoming fixtures are predicted ahead of kickoff so /predict answers from memory
+PREFETCH_LEAGUES = [league.strip() for league in os.getenv('PREFETCH_LEAGUES', '152').split(',') if league.strip()]
+PREFETCH_DAYS = int(os.getenv('PREFETCH_DAYS', '7'))
+PREFETCH_MINUTES = float(os.getenv('PREFETCH_MINUTES', '30'))
+# Most API requests a single prefetch run may send (cached responses are free)
+PREFETCH_API_BUDGET = int(os.getenv('PREFETCH_API_BUDGET', '40'))
+# (home_id, away_id) -> (model version, kickoff, (predicted_result, probabilities))
+prediction_cache = {}
+prefetch_stats = {'runs': 0, 'fixtures': 0, 'predicted': 0, 'api_requests': 0,
+                  'budget_exhausted': 0, 'hits': 0, 'misses': 0}
+
+# Map numeric prediction to readable result
+RESULT_LABELS = {-1: "Away Win", 0: "Draw", 1: "Home Win"}
+
+def report_bundle(bundle):
+    print(f"✅ ML model loaded in {bundle.load_seconds:.2f}s "
+          f"(accuracy: {bundle.feature_info.get('accuracy', 'N/A'):.3f})")
+    if bundle.flat_forest is not None:
+        print(f"✅ Flat forest ready ({bundle.flat_forest.n_trees} trees, {len(bundle.flat_forest.feature):,} nodes)")
+    if bundle.proba_table is not None:
+        table = bundle.proba_table
+        print(f"✅ Probability table built ({table.table.size // len(table.classes):,} cells, "
+              f"{table.nbytes / 1e6:.1f} MB, {table.build_seconds:.1f}s)")
 
 def load_model():
     """Load trained RandomForest model and feature metadata"""
-    global model, feature_columns
+    global model_bundle
     try:
-        model = joblib.load('models/predictor.joblib')
-        feature_info = joblib.load('models/feature_info.joblib')
-        feature_columns = feature_info['feature_columns']
-        print(f"✅ ML model loaded (accuracy: {feature_info.get('accuracy', 'N/A'):.3f})")
+        model_bundle = load_bundle(USE_PROBA_TABLE)
+        report_bundle(model_bundle)
     except FileNotFoundError:
         print("⚠️ No trained model found. Run setup_ml_pipeline.py first.")
-        model = None
+        model_bundle = None
+
+@tasks.loop(seconds=MODEL_RELOAD_SECONDS)
+async def watch_model_files():
+    """Load new model versions in the background and swap them in atomically"""
+    global model_bundle
+    version = model_version()
+    if version is None or (model_bundle is not None and version == model_bundle.version):
+        return
+    
+    try:
+        bundle = await asyncio.to_thread(load_bundle, USE_PROBA_TABLE)
+    except Exception as e:
+        # Keep serving the current model; retried on the next tick
+        print(f"⚠️ Model reload failed: {e}")
+        return
+    
+    # In-flight predictions keep the bundle they started with
+    reloaded = model_bundle is not None
+    model_bundle = bundle
+    print("🔄 Reloaded ML model" if reloaded else "🤖 ML model ready")
+    report_bundle(bundle)
+    
+    # Predictions from the previous version no longer apply, prefetch again now
+    if prefetch_upcoming.is_running():
+        prefetch_upcoming.restart()
+
+@tasks.loop(hours=TEAM_INDEX_REFRESH_HOURS)
+async def refresh_team_index():
+    """Rebuild the team name index from stored events and league standings"""
+    global team_index
+    team_names = await asyncio.to_thread(load_stored_team_names)
+    
+    # Background work, queued behind interactive commands
+    current_priority.set(PREFETCH)
+    api_key = os.getenv('API_FOOTBALL_KEY')
+    standings_lists = []
+    if api_key:
+        standings_lists = await asyncio.gather(*(fetch_standings(api_key, league_id) for league_id in TEAM_INDEX_LEAGUES))
+    
+    index = build_team_index(standings_lists, team_names)
+    if len(index) == 0:
+        # Keep any current index if the API was unreachable; retry soon while there is none
+        if len(team_index) == 0:
+            print(f"⚠️ Team index is empty; retrying in {TEAM_INDEX_RETRY_MINUTES:g} minutes")
+            refresh_team_index.change_interval(minutes=TEAM_INDEX_RETRY_MINUTES)
+        return
+    team_index = index
+    refresh_team_index.change_interval(hours=TEAM_INDEX_REFRESH_HOURS)
+    print(f"✅ Team index ready ({len(index)} teams)")
+
+async def fetch_finished_matches(api_key: str, since: date) -> list:
+    """Finished matches in the feature store's leagues from `since` to today, as Match records"""
+    from data_pipeline.matches import parse_events
+    
+    # Background work, queued behind interactive commands
+    current_priority.set(PREFETCH)
+    event_lists = await asyncio.gather(*(
+        fetch_fixtures(api_key, league_id, since.isoformat(), date.today().isoformat())
+        for league_id in FEATURE_STORE_LEAGUES
+    ))
+    return parse_events([event for events in event_lists for event in events
+                         if event.get('match_status') in FINAL_STATUSES])
+
+@tasks.loop(minutes=FEATURE_STORE_REFRESH_MINUTES)
+async def refresh_feature_store():
+    """Load the pipeline's feature store when it changes, then roll in matches finished since (in memory)"""
+    global feature_store, feature_store_mtime
+    try:
+        mtime = os.path.getmtime(FEATURE_STORE_PATH)
+    except OSError:
+        return
+    if mtime != feature_store_mtime:
+        try:
+            store = await asyncio.to_thread(FeatureStore.load)
+        except (OSError, ValueError, KeyError) as e:
+            # Keep the current store; retried on the next tick
+            print(f"⚠️ Feature store load failed: {e}")
+            return
+        feature_store, feature_store_mtime = store, mtime
+        print(f"✅ Feature store ready ({len(store)} teams, {len(store.applied)} matches)")
+    
+    api_key = os.getenv('API_FOOTBALL_KEY')
+    store = feature_store
+    if not api_key or store.last_kickoff < 0:
+        return
+    try:
+        since = (datetime(1970, 1, 1) + timedelta(minutes=store.last_kickoff)).date()
+        added = store.apply(await fetch_finished_matches(api_key, since))
+    except Exception as e:
+        print(f"⚠️ Feature store update failed: {e}")
+        return
+    if added:
+        # Kept in memory only: the pipeline owns the file, and its next write is reloaded above
+        print(f"🔄 Feature store updated with {added} finished matches")
+        # Cached predictions were made with the old form and tables
+        if prefetch_upcoming.is_running():
+            prefetch_upcoming.restart()
+
+@bot.event
+async def on_app_command_completion(interaction: discord.Interaction, command):
+    started = interaction.extras.get('started')
+    if started is not None:
+        metrics.observe('command_seconds', time.perf_counter() - started, command=command.name)
+
+def collect_gauges() -> dict:
+    """Point-in-time cache, quota and inference figures for the metrics export"""
+    cache = response_cache.stats()
+    store = response_store.stats()
+    quota = request_scheduler.stats()
+    inference = batch_predictor.stats()
+    prediction_lookups = prefetch_stats['hits'] + prefetch_stats['misses']
+    return {
+        'response_cache_hit_ratio': cache['hit_rate'],
+        'response_cache_entries': cache['entries'],
+        'response_store_hit_ratio': store['hit_rate'],
+        'response_store_entries': store['entries'],
+        'prediction_cache_hit_ratio': prefetch_stats['hits'] / prediction_lookups if prediction_lookups else 0.0,
+        'prediction_cache_entries': len(prediction_cache),
+        'api_quota_used': quota['used_today'],
+        'api_quota_remaining': {(('priority', name),): left for name, left in quota['remaining'].items()},
+        'api_rate_limited': quota['rate_limited'],
+        'inference_mean_batch_size': inference['mean_batch_size'],
+        'inference_queue_depth': inference['queue_depth'],
+        'model_loaded': int(model_bundle is not None),
+        'team_index_teams': len(team_index),
+        'feature_store_teams': len(feature_store) if feature_store is not None else 0,
+        'feature_store_matches': len(feature_store.applied) if feature_store is not None else 0,
+    }
+
+@tasks.loop(seconds=METRICS_EXPORT_SECONDS)
+async def export_metrics():
+    """Write the Prometheus textfile for a local scraper"""
+    try:
+        metrics.write_textfile(METRICS_TEXTFILE, collect_gauges())
+    except OSError as e:
+        print(f"⚠️ Metrics export failed: {e}")
 
 @bot.event
 async def on_ready():
     print(f'{bot.user} connected to Discord!')
-    load_model()
     try:
         synced = await bot.tree.sync()
         print(f"Synced {len(synced)} commands")
     except Exception as e:
         print(f"Failed to sync commands: {e}")
 
+async def api_get(params: dict):
+    """Cached, coalesced API lookup shared by all fetchers"""
+    return await response_cache.get_or_fetch(params, lambda: api_client.get_json(params))
+
 async def fetch_standings(api_key: str, league_id: str = "152"):
     """Fetch current league standings from API"""
-    async with aiohttp.ClientSession() as session:
-        url = f"{API_BASE_URL}?action=get_standings&league_id={league_id}&APIkey={api_key}"
-        try:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data if isinstance(data, list) else []
-        except:
-            pass
-    return []
-
-async def fetch_team_matches(api_key: str, team_id: str, limit: int = 5):
+    data = await api_get({'action': 'get_standings', 'league_id': league_id, 'APIkey': api_key})
+    return data if isinstance(data, list) else []
+
+async def fetch_team_matches(api_key: str, team_id: str, limit: int = FORM_WINDOW):
     """Fetch recent matches for a team"""
-    async with aiohttp.ClientSession() as session:
-        url = f"{API_BASE_URL}?action=get_events&team_id={team_id}&limit={limit}&APIkey={api_key}"
-        try:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data if isinstance(data, list) else []
-        except:
-            pass
-    return []
+    data = await api_get({'action': 'get_events', 'team_id': team_id, 'limit': limit, 'APIkey': api_key})
+    return data if isinstance(data, list) else []
 
 def calculate_form(matches: list, team_id: str) -> int:
     """Calculate wins in recent matches for team form"""
@@ -80,74 +305,245 @@ def calculate_form(matches: list, team_id: str) -> int:
                 wins += 1
     return wins
 
-async def predict_match(home_team: str, away_team: str, api_key: str):
-    """Generate ML prediction for match outcome"""
-    if model is None:
-        return None, "No trained model available"
-    
-    try:
-        # Convert team names to IDs (simplified approach)
-        home_team_id = home_team.lower().replace(' ', '_')
-        away_team_id = away_team.lower().replace(' ', '_')
-        
-        # Fetch recent form for both teams
-        home_matches = await fetch_team_matches(api_key, home_team_id, 5)
-        away_matches = await fetch_team_matches(api_key, away_team_id, 5)
-        
-        home_form = calculate_form(home_matches, home_team_id)
-        away_form = calculate_form(away_matches, away_team_id)
-        
-        # Cache standings to avoid repeated API calls
-        if not standings_cache:
-            standings_data = await fetch_standings(api_key)
-            for team in standings_data:
-                team_id = team.get('team_id', '')
-                position = team.get('overall_league_position', 20)
-                standings_cache[team_id] = int(position) if str(position).isdigit() else 20
+def standings_lookup(standings_data: list) -> dict:
+    """Map team_id to league position"""
+    standings = {}
+    for team in standings_data:
+        team_id = team.get('team_id', '')
+        position = team.get('overall_league_position', 20)
+        standings[team_id] = int(position) if str(position).isdigit() else 20
+    return standings
+
+def store_features(home_team_id: str, away_team_id: str) -> Optional[dict]:
+    """The fixture's feature row from the feature store, or None if it doesn't know both teams"""
+    store = feature_store
+    if store is None or not (home_team_id.isdigit() and away_team_id.isdigit()):
+        return None
+    start = time.perf_counter()
+    features = store.features(int(home_team_id), int(away_team_id))
+    if features is not None:
+        metrics.observe('feature_store_seconds', time.perf_counter() - start)
+    return features
+
+async def build_match_features(home_team_id: str, away_team_id: str, api_key: str, standings: dict = None) -> dict:
+    """Assemble the model's feature row for one fixture from the API"""
+    with metrics.timer('feature_assembly_seconds'):
+        # Fetch recent form for both teams concurrently
+        home_matches, away_matches = await asyncio.gather(
+            fetch_team_matches(api_key, home_team_id, FORM_WINDOW),
+            fetch_team_matches(api_key, away_team_id, FORM_WINDOW),
+        )
         
-        home_standing = standings_cache.get(home_team_id, 20)
-        away_standing = standings_cache.get(away_team_id, 20)
+        # Standings come from the response cache and refresh after their TTL
+        if standings is None:
+            standings = standings_lookup(await fetch_standings(api_key))
         
-        # Create feature vector for ML model
-        features = pd.DataFrame([{
-            'form_home': home_form,
-            'form_away': away_form,
-            'standing_home': home_standing,
-            'standing_away': away_standing,
+        features = {
+            'form_home': calculate_form(home_matches, home_team_id),
+            'form_away': calculate_form(away_matches, away_team_id),
+            'standing_home': standings.get(home_team_id, 20),
+            'standing_away': standings.get(away_team_id, 20),
             'h2h_home_wins': 0,  # Simplified - would need historical data
             'h2h_away_wins': 0
-        }])
+        }
+    return features
+
+async def match_features(home_team_id: str, away_team_id: str, api_key: str) -> dict:
+    """Feature row from the feature store, falling back to the API for teams it lacks"""
+    features = store_features(home_team_id, away_team_id)
+    if features is None:
+        features = await build_match_features(home_team_id, away_team_id, api_key)
+    return features
+
+def predict_batch(rows: list) -> list:
+    """Predict many feature rows with a single vectorized predict_proba call
+    
+    Returns (predicted_result, probabilities) per row, probabilities ordered
+    as model.classes_ (away, draw, home).
+    """
+    import numpy as np
+    
+    with metrics.timer('inference_seconds'):
+        # One snapshot for the whole batch, so a reload can't mix model versions
+        bundle = model_bundle
+        X = np.array([[row[col] for col in bundle.feature_columns] for row in rows], dtype=float)
+        if bundle.proba_table is not None:
+            # O(1) table lookups, falling back to the model for off-grid rows
+            probabilities, in_range = bundle.proba_table.lookup_batch(X)
+            if not in_range.all():
+                probabilities[~in_range] = bundle.predict_proba(X[~in_range])
+        else:
+            probabilities = bundle.predict_proba(X)
+        predictions = bundle.classes[probabilities.argmax(axis=1)]
+    return [(RESULT_LABELS.get(prediction, "Unknown"), probs)
+            for prediction, probs in zip(predictions, probabilities)]
+
+# Off-loop, micro-batched inference shared by every prediction command
+batch_predictor = BatchPredictor(predict_batch)
+
+def fixture_kickoff(fixture: dict) -> Optional[datetime]:
+    try:
+        return datetime.strptime(f"{fixture.get('match_date', '')} {fixture.get('match_time') or '00:00'}",
+                                 "%Y-%m-%d %H:%M")
+    except ValueError:
+        return None
+
+def cached_prediction(home_team_id: str, away_team_id: str):
+    """Prefetched prediction for a fixture if it was made by the current model before kickoff"""
+    entry = prediction_cache.get((home_team_id, away_team_id))
+    bundle = model_bundle
+    if entry is None or bundle is None:
+        prefetch_stats['misses'] += 1
+        return None
+    version, kickoff, prediction = entry
+    if version != bundle.version or datetime.now() >= kickoff:
+        prefetch_stats['misses'] += 1
+        return None
+    prefetch_stats['hits'] += 1
+    return prediction
+
+async def prefetch_predictions(api_key: str):
+    """Predict upcoming fixtures, soonest first, until the API request budget is spent"""
+    # Requests from this task queue behind interactive commands
+    current_priority.set(PREFETCH)
+    now = datetime.now()
+    start_requests = api_client.requests
+    prefetch_stats['runs'] += 1
+    
+    def budget_left(needed: int) -> bool:
+        if (api_client.requests - start_requests + needed > PREFETCH_API_BUDGET
+                or request_scheduler.quota_left(PREFETCH) < needed):
+            prefetch_stats['budget_exhausted'] += 1
+            return False
+        return True
+    
+    # Drop predictions for fixtures that have kicked off
+    for key in [key for key, (_, kickoff, _) in prediction_cache.items() if kickoff <= now]:
+        del prediction_cache[key]
+    
+    for league_id in PREFETCH_LEAGUES:
+        # Fixture list plus standings, then two form lookups per fixture
+        if not budget_left(2):
+            break
+        fixtures = await fetch_fixtures(api_key, league_id, now.date().isoformat(),
+                                        (now.date() + timedelta(days=PREFETCH_DAYS)).isoformat())
+        upcoming = []
+        for fixture in fixtures:
+            kickoff = fixture_kickoff(fixture)
+            if kickoff is not None and kickoff > now and fixture.get('match_hometeam_id') and fixture.get('match_awayteam_id'):
+                upcoming.append((kickoff, fixture))
+        upcoming.sort(key=lambda item: item[0])
+        standings = None
         
-        # Make prediction
-        probabilities = model.predict_proba(features[feature_columns])[0]
-        prediction = model.predict(features[feature_columns])[0]
+        # Soonest kickoffs first, so a tight budget covers the next matchday
+        rows, keys = [], []
+        for kickoff, fixture in upcoming:
+            home_id, away_id = fixture['match_hometeam_id'], fixture['match_awayteam_id']
+            row = store_features(home_id, away_id)
+            if row is None:
+                # Only teams missing from the feature store cost API requests
+                if not budget_left(2):
+                    break
+                if standings is None:
+                    standings = standings_lookup(await fetch_standings(api_key, league_id))
+                row = await build_match_features(home_id, away_id, api_key, standings)
+            rows.append(row)
+            keys.append((home_id, away_id, kickoff))
         
-        # Map numeric prediction to readable result
-        result_map = {-1: "Away Win", 0: "Draw", 1: "Home Win"}
-        predicted_result = result_map.get(prediction, "Unknown")
+        bundle = model_bundle
+        predictions = await batch_predictor.predict_many(rows) if rows else []
+        for (home_id, away_id, kickoff), prediction in zip(keys, predictions):
+            prediction_cache[(home_id, away_id)] = (bundle.version, kickoff, prediction)
+        prefetch_stats['fixtures'] += len(upcoming)
+        prefetch_stats['predicted'] += len(predictions)
+    
+    prefetch_stats['api_requests'] += api_client.requests - start_requests
+
+@tasks.loop(minutes=PREFETCH_MINUTES)
+async def prefetch_upcoming():
+    """Keep predictions for upcoming fixtures warm in the background"""
+    api_key = os.getenv('API_FOOTBALL_KEY')
+    if not api_key or model_bundle is None:
+        return
+    
+    try:
+        await prefetch_predictions(api_key)
+    except Exception as e:
+        # A failed run must not stop the loop; the next tick retries
+        print(f"⚠️ Prefetch failed: {e}")
+
+async def predict_match(home_team: str, away_team: str, api_key: str):
+    """Generate ML prediction for match outcome"""
+    if model_bundle is None:
+        return None, "No trained model available"
+    
+    try:
+        # Convert team names to the API's numeric team IDs
+        teams = []
+        for name in (home_team, away_team):
+            if len(team_index) == 0:
+                # No index yet: best effort with the name itself, as before the index existed
+                teams.append(name.lower().replace(' ', '_'))
+                continue
+            resolved = team_index.resolve(name)
+            if resolved is None:
+                suggestions = ", ".join(team_index.complete(name, 3))
+                return None, f"Unknown team: {name}" + (f" (did you mean {suggestions}?)" if suggestions else "")
+            teams.append(resolved[0])
+        home_team_id, away_team_id = teams
+        
+        prediction = cached_prediction(home_team_id, away_team_id)
+        if prediction is not None:
+            return prediction
         
-        return predicted_result, probabilities
+        features = await match_features(home_team_id, away_team_id, api_key)
+        return await batch_predictor.predict(features)
         
     except Exception as e:
         return None, f"Prediction error: {str(e)}"
 
+async def fetch_fixtures(api_key: str, league_id: str, start_date: str, end_date: str):
+    """Fetch all fixtures for a league between two dates"""
+    data = await api_get({'action': 'get_events', 'from': start_date, 'to': end_date,
+                          'league_id': league_id, 'APIkey': api_key})
+    return data if isinstance(data, list) else []
+
+async def predict_fixtures(fixtures: list, api_key: str, league_id: str = "152"):
+    """Predict a list of API fixtures with one feature matrix and one model call"""
+    rows = [store_features(fixture.get('match_hometeam_id', ''), fixture.get('match_awayteam_id', ''))
+            for fixture in fixtures]
+    
+    # Standings and form from the API only for fixtures the feature store can't cover
+    missing = [i for i, row in enumerate(rows) if row is None]
+    if missing:
+        standings = standings_lookup(await fetch_standings(api_key, league_id))
+        built = await asyncio.gather(*(
+            build_match_features(fixtures[i].get('match_hometeam_id', ''), fixtures[i].get('match_awayteam_id', ''),
+                                 api_key, standings)
+            for i in missing
+        ))
+        for i, row in zip(missing, built):
+            rows[i] = row
+    return list(zip(fixtures, await batch_predictor.predict_many(rows)))
+
+def format_round_predictions(predictions: list, title: str) -> str:
+    """Format batch predictions as a fixed-width table"""
+    lines = [f"{'Fixture':<34} {'Pick':<9} {'H':>4} {'D':>4} {'A':>4}"]
+    for fixture, (predicted_result, probabilities) in predictions:
+        name = f"{fixture.get('match_hometeam_name', '?')} v {fixture.get('match_awayteam_name', '?')}"
+        prob_away, prob_draw, prob_home = probabilities
+        lines.append(f"{name[:34]:<34} {predicted_result:<9} {prob_home:>4.0%} {prob_draw:>4.0%} {prob_away:>4.0%}")
+    
+    table = "\n".join(lines)
+    # Stay inside Discord's 2000 character message limit
+    if len(table) > 1900:
+        table = table[:1900].rsplit("\n", 1)[0] + "\n..."
+    return f"**🤖 AI Predictions: {title}**\n```\n{table}\n```"
+
 async def fetch_h2h_data(team1: str, team2: str, api_key: str) -> Optional[dict]:
     """Fetch head-to-head match data between two teams"""
-    try:
-        async with aiohttp.ClientSession() as session:
-            encoded_team1 = urllib.parse.quote(team1)
-            encoded_team2 = urllib.parse.quote(team2)
-            url = f"{API_BASE_URL}?action=get_H2H&firstTeam={encoded_team1}&secondTeam={encoded_team2}&APIkey={api_key.strip()}"
-            
-            async with session.get(url) as response:
-                if response.status == 200:
-                    try:
-                        return await response.json()
-                    except:
-                        return None
-                return None
-    except:
-        return None
+    # aiohttp URL-encodes the team names in the query string
+    return await api_get({'action': 'get_H2H', 'firstTeam': team1, 'secondTeam': team2, 'APIkey': api_key.strip()})
 
 def format_match_result(match_data: dict) -> str:
     """Format match data into readable string"""
@@ -187,8 +583,8 @@ async def predict(interaction: discord.Interaction, home_team: str, away_team: s
         await interaction.response.send_message("❌ API key not configured.")
         return
     
-    if model is None:
-        await interaction.response.send_message("❌ ML model not loaded. Run setup_ml_pipeline.py first.")
+    if model_bundle is None:
+        await interaction.response.send_message("❌ ML model not loaded yet. Try again shortly, or run setup_ml_pipeline.py if it was never trained.")
         return
     
     # Respond immediately to avoid Discord timeout
@@ -213,12 +609,70 @@ async def predict(interaction: discord.Interaction, home_team: str, away_team: s
         response += f"🤝 Draw: {prob_draw:.1%}\n"
         response += f"✈️ {away_team} Win: {prob_away:.1%}\n\n"
         response += f"*Based on recent form, league standings, and head-to-head records*"
+        if request_scheduler.quota_left(INTERACTIVE) == 0:
+            response += "\n⚠️ *Daily API quota reached, so this uses cached data only and may be less accurate*"
         
         await interaction.edit_original_response(content=response)
         
     except Exception as e:
+        metrics.inc('command_errors_total', command='predict')
         await interaction.edit_original_response(content=f"❌ Error making prediction: {str(e)}")
 
+async def team_autocomplete(interaction: discord.Interaction, current: str) -> list:
+    """Suggest team names from the local index as the user types"""
+    return [app_commands.Choice(name=name, value=name) for name in team_index.complete(current)]
+
+predict.autocomplete('home_team')(team_autocomplete)
+predict.autocomplete('away_team')(team_autocomplete)
+
+# A week of one league's fixtures still fits in a single Discord message
+MAX_ROUND_DAYS = 7
+
+@bot.tree.command(name="predict_round", description="Predict every fixture in a league on a date or round")
+@app_commands.describe(days=f"Number of days from match_date (1-{MAX_ROUND_DAYS})")
+async def predict_round(interaction: discord.Interaction, match_date: Optional[str] = None,
+                        league_id: str = "152", days: app_commands.Range[int, 1, MAX_ROUND_DAYS] = 1,
+                        match_round: Optional[str] = None):
+    """Predict a whole matchday in one batched model call"""
+    api_key = os.getenv('API_FOOTBALL_KEY')
+    
+    if not api_key:
+        await interaction.response.send_message("❌ API key not configured.")
+        return
+    
+    if model_bundle is None:
+        await interaction.response.send_message("❌ ML model not loaded yet. Try again shortly, or run setup_ml_pipeline.py if it was never trained.")
+        return
+    
+    try:
+        start = datetime.strptime(match_date, "%Y-%m-%d").date() if match_date else date.today()
+    except ValueError:
+        await interaction.response.send_message("❌ Date must be in YYYY-MM-DD format.")
+        return
+    end = start + timedelta(days=min(max(days, 1), MAX_ROUND_DAYS) - 1)
+    
+    await interaction.response.defer()
+    
+    try:
+        fixtures = await fetch_fixtures(api_key, league_id, start.isoformat(), end.isoformat())
+        if match_round:
+            fixtures = [f for f in fixtures if str(f.get('match_round', '')) == match_round]
+        
+        if not fixtures:
+            if request_scheduler.quota_left(INTERACTIVE) == 0:
+                await interaction.followup.send("❌ Daily API quota reached and these fixtures aren't cached. Try again tomorrow.")
+                return
+            await interaction.followup.send(f"❌ No fixtures found for league {league_id} from {start} to {end}.")
+            return
+        
+        predictions = await predict_fixtures(fixtures, api_key, league_id)
+        title = f"Round {match_round}" if match_round else (f"{start}" if start == end else f"{start} to {end}")
+        await interaction.followup.send(format_round_predictions(predictions, title))
+        
+    except Exception as e:
+        metrics.inc('command_errors_total', command='predict_round')
+        await interaction.followup.send(f"❌ Error making predictions: {str(e)}")
+
 @bot.tree.command(name="result", description="Get historical match result between two teams")
 async def result(interaction: discord.Interaction, team1: str, team2: str):
     """Get most recent match result between two teams"""
@@ -230,10 +684,17 @@ async def result(interaction: discord.Interaction, team1: str, team2: str):
     
     await interaction.response.defer()
     
+    # Use the API's spelling of each name when the index knows the team
+    team1 = (team_index.resolve(team1) or (None, team1))[1]
+    team2 = (team_index.resolve(team2) or (None, team2))[1]
+    
     try:
         h2h_data = await fetch_h2h_data(team1, team2, api_key)
         
         if not h2h_data or not isinstance(h2h_data, dict):
+            if request_scheduler.quota_left(INTERACTIVE) == 0:
+                await interaction.followup.send("❌ Daily API quota reached and this match isn't cached. Try again tomorrow.")
+                return
             await interaction.followup.send("❌ Could not fetch match data.")
             return
         
@@ -258,8 +719,62 @@ async def result(interaction: discord.Interaction, team1: str, team2: str):
         await interaction.followup.send(formatted_result)
         
     except:
+        metrics.inc('command_errors_total', command='result')
         await interaction.followup.send("❌ Error fetching match result.")
 
+result.autocomplete('team1')(team_autocomplete)
+result.autocomplete('team2')(team_autocomplete)
+
+@bot.tree.command(name="quota", description="Show today's API request usage")
+async def quota(interaction: discord.Interaction):
+    """Report the daily API quota and how each priority has used it"""
+    stats = request_scheduler.stats()
+    lines = [f"**📊 API quota ({stats['day']} UTC):** {stats['used_today']}/{stats['daily_quota']} requests used"]
+    for name in ('interactive', 'prefetch', 'backfill'):
+        lines.append(f"• {name}: {stats['sent'][name]} sent, {stats['rejected'][name]} refused, "
+                     f"{stats['remaining'][name]} left")
+    if stats['rate_limited']:
+        lines.append(f"⚠️ Rate limited {stats['rate_limited']} times (current pause {stats['pause_seconds']:.0f}s)")
+    await interaction.response.send_message("\n".join(lines), ephemeral=True)
+
+def format_latency_rows(title: str, rows: list, label: str = None) -> list:
+    lines = []
+    for labels, count, p50, p95, p99 in rows:
+        name = labels.get(label, '') if label else title
+        lines.append(f"{name[:18]:<18} {count:>6} {p50 * 1000:>7.1f} {p95 * 1000:>7.1f} {p99 * 1000:>7.1f}")
+    return lines
+
+@bot.tree.command(name="stats", description="Show latency, cache and error statistics (admin only)")
+async def stats(interaction: discord.Interaction):
+    """Report where command time goes, cache hit rates and error counts"""
+    if not interaction.user.guild_permissions.administrator:
+        await interaction.response.send_message("❌ Administrator permissions required.", ephemeral=True)
+        return
+    
+    gauges = collect_gauges()
+    lines = [f"{'Latency (ms)':<18} {'n':>6} {'p50':>7} {'p95':>7} {'p99':>7}"]
+    lines += format_latency_rows('command', metrics.summary('command_seconds'), 'command')
+    lines += format_latency_rows('api', metrics.summary('api_request_seconds'), 'endpoint')
+    lines += format_latency_rows('features', metrics.summary('feature_assembly_seconds'))
+    lines += format_latency_rows('feature store', metrics.summary('feature_store_seconds'))
+    lines += format_latency_rows('inference', metrics.summary('inference_seconds'))
+    
+    errors = metrics.counters.get('command_errors_total', {})
+    api_failures = sum(count for key, count in metrics.counters.get('api_requests_total', {}).items()
+                       if dict(key).get('status') != '200')
+    uptime = int(time.time() - metrics.started)
+    
+    response = f"**📈 Bot stats** (up {uptime // 3600}h {uptime % 3600 // 60}m)\n```\n" + "\n".join(lines) + "\n```\n"
+    response += (f"**Caches:** API responses {gauges['response_cache_hit_ratio']:.0%} in memory, "
+                 f"{gauges['response_store_hit_ratio']:.0%} on disk; "
+                 f"prefetched predictions {gauges['prediction_cache_hit_ratio']:.0%}\n")
+    response += (f"**Errors:** {sum(errors.values()):g} command, {api_failures:g} API "
+                 f"({gauges['api_rate_limited']} rate limited)\n")
+    response += (f"**Inference:** mean batch {gauges['inference_mean_batch_size']:.1f}, "
+                 f"queue {gauges['inference_queue_depth']}\n")
+    response += f"**API quota:** {gauges['api_quota_used']}/{request_scheduler.daily_quota} used today"
+    await interaction.response.send_message(response, ephemeral=True)
+
 @bot.tree.command(name="sync", description="Sync slash commands (admin only)")
 async def sync(interaction: discord.Interaction):
     """Manually sync slash commands with Discord"""
@@ -274,7 +789,10 @@ async def sync(interaction: discord.Interaction):
         await interaction.response.send_message(f"❌ Failed to sync: {e}", ephemeral=True)
 
 if __name__ == "__main__":
-    load_dotenv()
+    if '--profile-startup' in sys.argv:
+        from startup_profile import profile_startup
+        profile_startup()
+        sys.exit(0)
     
     token = os.getenv('DISCORD_TOKEN')
     if not token:
@@ -0,0 +1,229 @@
+"""
+Walk-forward backtest of the match model over chronological folds
+Each fold trains on every match before a period (week, month or season) and
+tests on that period's matches, so no result is predicted with a model that
+has seen the future. Folds run in parallel on a process pool and read one
+cached, memory-mapped feature matrix instead of re-parsing features.csv.
+
+    python data_pipeline/backtest.py --fold week --min-train 380
+    python data_pipeline/backtest.py --fold season --workers 4
+    python data_pipeline/backtest.py --fold month --scaling   # time 1, 2, 4 ... workers
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from atomic_write import atomic_dir
+from data_pipeline.train_model import FEATURE_COLUMNS, N_ESTIMATORS, MAX_DEPTH, fit_model
+from data_pipeline.feature_store import SEASON_START_MONTH
+
+FEATURES_PATH = 'data_pipeline/features.csv'
+CACHE_DIR = 'data_pipeline/backtest_cache'
+LABELS = [-1, 0, 1]  # Away win, draw, home win
+FOLD_KINDS = ('week', 'month', 'season')
+
+
+def period_labels(dates: pd.Series, kind: str) -> pd.Series:
+    """Fold label for each match date: ISO week, calendar month or season start year"""
+    if kind == 'week':
+        iso = dates.dt.isocalendar()
+        return iso['year'].astype(str) + '-W' + iso['week'].astype(str).str.zfill(2)
+    if kind == 'month':
+        return dates.dt.strftime('%Y-%m')
+    return (dates.dt.year - (dates.dt.month < SEASON_START_MONTH)).astype(str)
+
+
+def cached_matrices(features_path: str, kind: str, cache_dir: str = CACHE_DIR):
+    """(cache path, period labels), building X/y/period .npy files once per features file and fold kind
+
+    Rows are sorted by match date, so every fold's training set is a prefix of X.
+    """
+    with open(features_path, 'rb') as f:
+        digest = hashlib.sha1(f.read()).hexdigest()[:16]
+    path = os.path.join(cache_dir, f"{digest}-{kind}")
+    meta_path = os.path.join(path, 'meta.json')
+    if os.path.exists(meta_path):
+        with open(meta_path, 'r') as f:
+            return path, json.load(f)['periods']
+
+    df = pd.read_csv(features_path)
+    if 'match_date' not in df.columns:
+        raise ValueError(f"{features_path} has no match_date column; rebuild it with build_features.py")
+    df['match_date'] = pd.to_datetime(df['match_date'], errors='coerce')
+    df = df.dropna(subset=['match_date']).sort_values('match_date', kind='stable')
+    labels = period_labels(df['match_date'], kind)
+    periods = list(dict.fromkeys(labels))
+
+    with atomic_dir(path) as tmp_path:
+        np.save(os.path.join(tmp_path, 'X.npy'), df[FEATURE_COLUMNS].to_numpy(dtype=float))
+        np.save(os.path.join(tmp_path, 'y.npy'), df['result'].to_numpy(dtype=np.int8))
+        np.save(os.path.join(tmp_path, 'period.npy'),
+                labels.map({p: i for i, p in enumerate(periods)}).to_numpy(np.int32))
+        with open(os.path.join(tmp_path, 'meta.json'), 'w') as f:
+            json.dump({'features': features_path, 'kind': kind, 'periods': periods}, f)
+    return path, periods
+
+
+def make_folds(period: np.ndarray, periods: list, min_train: int) -> list:
+    """(label, train_end, test_start, test_end) for each period with at least min_train earlier matches"""
+    starts = np.searchsorted(period, np.arange(len(periods)), side='left')
+    ends = np.searchsorted(period, np.arange(len(periods)), side='right')
+    return [(label, int(start), int(start), int(end))
+            for label, start, end in zip(periods, starts, ends) if start >= min_train and end > start]
+
+
+def brier_score(y_true: np.ndarray, probabilities: np.ndarray) -> float:
+    """Multi-class Brier score: mean squared distance from the one-hot outcome"""
+    onehot = (y_true[:, None] == np.array(LABELS)[None, :]).astype(float)
+    return float(((probabilities - onehot) ** 2).sum(axis=1).mean())
+
+
+def run_fold(path: str, fold: tuple, n_estimators: int, max_depth: int) -> dict:
+    """Train on the fold's history and score its test period (runs in a worker process)"""
+    from sklearn.metrics import log_loss
+
+    label, train_end, test_start, test_end = fold
+    X = np.load(os.path.join(path, 'X.npy'), mmap_mode='r')
+    y = np.load(os.path.join(path, 'y.npy'), mmap_mode='r')
+    X_train = pd.DataFrame(np.asarray(X[:train_end]), columns=FEATURE_COLUMNS)
+    X_test = pd.DataFrame(np.asarray(X[test_start:test_end]), columns=FEATURE_COLUMNS)
+    y_train, y_test = np.asarray(y[:train_end]), np.asarray(y[test_start:test_end])
+
+    start = time.perf_counter()
+    model = fit_model(X_train, y_train, n_estimators, max_depth)
+    fit_seconds = time.perf_counter() - start
+
+    # Outcomes missing from the training history get probability 0
+    probabilities = np.zeros((len(y_test), len(LABELS)))
+    predicted = model.predict_proba(X_test)
+    for column, cls in enumerate(model.classes_):
+        probabilities[:, LABELS.index(int(cls))] = predicted[:, column]
+    predictions = np.array(LABELS)[probabilities.argmax(axis=1)]
+
+    return {
+        'fold': label,
+        'train': int(train_end),
+        'test': int(test_end - test_start),
+        'accuracy': float((predictions == y_test).mean()),
+        'log_loss': float(log_loss(y_test, np.clip(probabilities, 1e-15, 1), labels=LABELS)),
+        'brier': brier_score(y_test, probabilities),
+        'fit_seconds': fit_seconds,
+    }
+
+
+def run_folds(path: str, folds: list, workers: int, n_estimators: int, max_depth: int) -> list:
+    """Score every fold on a pool of `workers` processes, results in fold order"""
+    # Largest training sets first, so the slowest folds don't start last
+    order = sorted(range(len(folds)), key=lambda i: -folds[i][1])
+    results = [None] * len(folds)
+    if workers == 1:
+        for i in order:
+            results[i] = run_fold(path, folds[i], n_estimators, max_depth)
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_fold, path, folds[i], n_estimators, max_depth): i for i in order}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+    return results
+
+
+def summarize(results: list) -> dict:
+    """Metrics over all test matches (folds weighted by their size)"""
+    total = sum(r['test'] for r in results)
+    return {
+        'folds': len(results),
+        'test_matches': total,
+        **{metric: sum(r[metric] * r['test'] for r in results) / total
+           for metric in ('accuracy', 'log_loss', 'brier')},
+    }
+
+
+def print_results(results: list, summary: dict):
+    print(f"\n{'Fold':<10}{'train':>7}{'test':>6}{'accuracy':>10}{'log loss':>10}{'brier':>8}{'fit s':>8}")
+    for r in results:
+        print(f"{r['fold']:<10}{r['train']:>7}{r['test']:>6}{r['accuracy']:>10.3f}{r['log_loss']:>10.3f}"
+              f"{r['brier']:>8.3f}{r['fit_seconds']:>8.2f}")
+    print(f"\n📊 {summary['folds']} folds, {summary['test_matches']} test matches: "
+          f"accuracy {summary['accuracy']:.3f}, log loss {summary['log_loss']:.3f}, brier {summary['brier']:.3f}")
+
+
+def scaling_levels(max_workers: int) -> list:
+    levels = [1]
+    while levels[-1] * 2 <= max_workers:
+        levels.append(levels[-1] * 2)
+    return levels if levels[-1] == max_workers else levels + [max_workers]
+
+
+def backtest(features_path: str = FEATURES_PATH, kind: str = 'week', min_train: int = 380, workers: int = None,
+             n_estimators: int = N_ESTIMATORS, max_depth: int = MAX_DEPTH, scaling: bool = False,
+             output: str = None):
+    """Walk-forward backtest; with scaling, also times the folds on 1, 2, 4 ... workers"""
+    workers = workers or os.cpu_count() or 1
+    try:
+        path, periods = cached_matrices(features_path, kind)
+    except FileNotFoundError:
+        print(f"Error: {features_path} not found. Run build_features.py first.")
+        return
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+
+    period = np.load(os.path.join(path, 'period.npy'))
+    folds = make_folds(period, periods, min_train)
+    if not folds:
+        print(f"No {kind} folds with at least {min_train} earlier matches ({len(period)} matches in total)")
+        return
+    print(f"🔁 Walk-forward backtest: {len(folds)} {kind} folds from {folds[0][0]} to {folds[-1][0]}, "
+          f"{n_estimators} trees, max depth {max_depth}")
+
+    timings = {}
+    for level in (scaling_levels(workers) if scaling else [workers]):
+        start = time.perf_counter()
+        results = run_folds(path, folds, level, n_estimators, max_depth)
+        timings[level] = time.perf_counter() - start
+        print(f"⏱️ {level} worker(s): {timings[level]:.2f}s")
+
+    summary = summarize(results)
+    print_results(results, summary)
+    if scaling:
+        print(f"\n{'workers':>8}{'seconds':>10}{'speedup':>9}{'efficiency':>12}")
+        for level, seconds in timings.items():
+            speedup = timings[1] / seconds
+            print(f"{level:>8}{seconds:>10.2f}{speedup:>8.2f}x{speedup / level:>12.0%}")
+        if (os.cpu_count() or 1) < max(timings):
+            print(f"⚠️ Only {os.cpu_count()} CPU(s) available; more workers than cores can't speed up")
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump({'kind': kind, 'min_train': min_train, 'n_estimators': n_estimators, 'max_depth': max_depth,
+                       'summary': summary, 'folds': results,
+                       'seconds_by_workers': {str(level): seconds for level, seconds in timings.items()}},
+                      f, indent=2)
+        print(f"Results saved to {output}")
+    return summary, results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--features', default=FEATURES_PATH)
+    parser.add_argument('--fold', choices=FOLD_KINDS, default='week', help="length of each test period")
+    parser.add_argument('--min-train', type=int, default=380, help="matches needed before the first test period")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all CPUs)")
+    parser.add_argument('--n-estimators', type=int, default=N_ESTIMATORS)
+    parser.add_argument('--max-depth', type=int, default=MAX_DEPTH)
+    parser.add_argument('--scaling', action='store_true', help="time the folds on 1, 2, 4 ... up to --workers")
+    parser.add_argument('--output', default=None, help="save per-fold results as JSON")
+    args = parser.parse_args()
+    backtest(args.features, args.fold, args.min_train, args.workers, args.n_estimators, args.max_depth,
+             args.scaling, args.output)
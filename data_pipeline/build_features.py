@@ -1,97 +1,80 @@
-import json
+import argparse
 import pandas as pd
-import aiohttp
 import asyncio
 import os
+import sys
+import time
+from bisect import bisect_left
+from itertools import groupby
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The project modules read their settings at import time, so .env goes first
 load_dotenv()
 
-API_BASE_URL = "https://apiv3.apifootball.com/"
+from api_client import ApiClient, TokenBucket
+from response_store import ResponseStore, API_OFFLINE
+from request_scheduler import RequestScheduler, BACKFILL, current_priority
+from data_pipeline.event_store import to_int
+from data_pipeline.matches import parse_events, load_matches
+from data_pipeline.feature_store import FeatureStore, FORM_WINDOW, season_of, update_feature_store
+
 LEAGUE_ID = "152"  # Premier League
+API_RATE_LIMIT = float(os.getenv('API_RATE_LIMIT', '2'))  # Requests per second
 
-async def fetch_standings(api_key: str, league_id: str):
+async def fetch_standings(client: ApiClient, api_key: str, league_id: str):
     """Fetch current league standings"""
-    async with aiohttp.ClientSession() as session:
-        url = f"{API_BASE_URL}?action=get_standings&league_id={league_id}&APIkey={api_key}"
-        
-        try:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data if isinstance(data, list) else []
-        except:
-            pass
-    return []
+    data = await client.get_json({'action': 'get_standings', 'league_id': league_id, 'APIkey': api_key})
+    return data if isinstance(data, list) else []
 
-async def fetch_team_recent_matches(api_key: str, team_id: str, limit: int = 5):
+async def fetch_team_recent_matches(client: ApiClient, api_key: str, team_id: str, limit: int = FORM_WINDOW):
     """Fetch recent matches for a team"""
-    async with aiohttp.ClientSession() as session:
-        url = f"{API_BASE_URL}?action=get_events&team_id={team_id}&limit={limit}&APIkey={api_key}"
-        
-        try:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data if isinstance(data, list) else []
-        except:
-            pass
-    return []
+    data = await client.get_json({'action': 'get_events', 'team_id': team_id, 'limit': limit, 'APIkey': api_key})
+    return data if isinstance(data, list) else []
 
-def calculate_form(matches: list, team_id: str):
+def calculate_form(matches: list, team_id: int):
     """Calculate wins/draws/losses from recent matches"""
     wins = draws = losses = 0
     
     for match in matches:
-        if match.get('match_hometeam_id') == team_id:
-            # Team is home
-            home_score = match.get('match_hometeam_score', '0')
-            away_score = match.get('match_awayteam_score', '0')
-            
-            if home_score.isdigit() and away_score.isdigit():
-                if int(home_score) > int(away_score):
-                    wins += 1
-                elif int(home_score) == int(away_score):
-                    draws += 1
-                else:
-                    losses += 1
+        if match.home_score < 0 or match.away_score < 0:
+            continue
         
-        elif match.get('match_awayteam_id') == team_id:
+        if match.home_id == team_id:
+            # Team is home
+            result = match.outcome
+        elif match.away_id == team_id:
             # Team is away
-            home_score = match.get('match_hometeam_score', '0')
-            away_score = match.get('match_awayteam_score', '0')
-            
-            if home_score.isdigit() and away_score.isdigit():
-                if int(away_score) > int(home_score):
-                    wins += 1
-                elif int(away_score) == int(home_score):
-                    draws += 1
-                else:
-                    losses += 1
+            result = -match.outcome
+        else:
+            continue
+        
+        if result == 1:
+            wins += 1
+        elif result == 0:
+            draws += 1
+        else:
+            losses += 1
     
     return wins, draws, losses
 
-def calculate_h2h_record(events: list, home_team_id: str, away_team_id: str):
+def calculate_h2h_record(events: list, home_team_id: int, away_team_id: int):
     """Calculate head-to-head record between two teams"""
     home_wins = away_wins = draws = 0
     
     for match in events:
-        if (match.get('match_hometeam_id') == home_team_id and 
-            match.get('match_awayteam_id') == away_team_id) or \
-           (match.get('match_hometeam_id') == away_team_id and 
-            match.get('match_awayteam_id') == home_team_id):
-            
-            home_score = match.get('match_hometeam_score', '0')
-            away_score = match.get('match_awayteam_score', '0')
+        if (match.home_id == home_team_id and match.away_id == away_team_id) or \
+           (match.home_id == away_team_id and match.away_id == home_team_id):
             
-            if home_score.isdigit() and away_score.isdigit():
-                if int(home_score) > int(away_score):
-                    if match.get('match_hometeam_id') == home_team_id:
+            if match.home_score >= 0 and match.away_score >= 0:
+                if match.home_score > match.away_score:
+                    if match.home_id == home_team_id:
                         home_wins += 1
                     else:
                         away_wins += 1
-                elif int(home_score) < int(away_score):
-                    if match.get('match_hometeam_id') == home_team_id:
+                elif match.home_score < match.away_score:
+                    if match.home_id == home_team_id:
                         away_wins += 1
                     else:
                         home_wins += 1
@@ -100,68 +83,111 @@ def calculate_h2h_record(events: list, home_team_id: str, away_team_id: str):
     
     return home_wins, away_wins, draws
 
-async def extract_features(events: list, api_key: str):
-    """Extract ML features from events data"""
+def build_h2h_index(events: list) -> dict:
+    """Index head-to-head results by team pair, built once over all events
+    
+    Each pair maps to its kickoffs in order plus cumulative win/draw counts,
+    so any fixture's record (optionally as of a kickoff) is a bisect away.
+    """
+    pairs = {}
+    for match in events:
+        if not match.is_scored:
+            continue
+        
+        if match.home_score > match.away_score:
+            winner = match.home_id
+        elif match.home_score < match.away_score:
+            winner = match.away_id
+        else:
+            winner = None
+        pair = (min(match.home_id, match.away_id), max(match.home_id, match.away_id))
+        pairs.setdefault(pair, []).append((match.kickoff, winner))
+    
+    index = {}
+    for pair, matches in pairs.items():
+        matches.sort(key=lambda m: m[0])
+        kickoffs = []
+        first_wins, second_wins, draws = [0], [0], [0]
+        for kickoff, winner in matches:
+            kickoffs.append(kickoff)
+            first_wins.append(first_wins[-1] + (winner == pair[0]))
+            second_wins.append(second_wins[-1] + (winner == pair[1]))
+            draws.append(draws[-1] + (winner is None))
+        index[pair] = (kickoffs, first_wins, second_wins, draws)
+    return index
+
+def lookup_h2h_record(index: dict, home_team_id: int, away_team_id: int, before: int = None):
+    """Head-to-head record from a build_h2h_index index
+    
+    Same result as calculate_h2h_record; with a `before` kickoff, only
+    matches that kicked off earlier are counted.
+    """
+    pair = (min(home_team_id, away_team_id), max(home_team_id, away_team_id))
+    entry = index.get(pair)
+    if entry is None:
+        return 0, 0, 0
+    
+    kickoffs, first_wins, second_wins, draws = entry
+    n = len(kickoffs) if before is None else bisect_left(kickoffs, before)
+    if home_team_id == pair[0]:
+        return first_wins[n], second_wins[n], draws[n]
+    return second_wins[n], first_wins[n], draws[n]
+
+async def extract_features(events: list, api_key: str, client: ApiClient, store: FeatureStore = None):
+    """Extract ML features from events data
+    
+    Recent form comes from the feature store when it knows the team,
+    otherwise from one API request per team.
+    """
     features = []
     
     # Create standings lookup
-    standings_data = await fetch_standings(api_key, LEAGUE_ID)
+    standings_data = await fetch_standings(client, api_key, LEAGUE_ID)
     standings_lookup = {}
     
     if standings_data:
         for team in standings_data:
-            team_id = team.get('team_id', '')
+            team_id = to_int(team.get('team_id'))
             position = team.get('overall_league_position', 20)
             standings_lookup[team_id] = int(position) if str(position).isdigit() else 20
     
     print(f"Loaded standings for {len(standings_lookup)} teams")
     
+    h2h_index = build_h2h_index(events)
+    
     # Get unique fixtures (avoid duplicates)
     fixtures_processed = set()
     
     for event in events:
-        match_id = event.get('match_id', '')
-        home_team_id = event.get('match_hometeam_id', '')
-        away_team_id = event.get('match_awayteam_id', '')
-        home_score = event.get('match_hometeam_score', '?')
-        away_score = event.get('match_awayteam_score', '?')
-        
-        # Skip if already processed or missing data
-        if (match_id in fixtures_processed or 
-            not home_team_id or not away_team_id or 
-            home_score == '?' or away_score == '?'):
+        # Skip if already processed or missing teams/scores
+        if event.match_id in fixtures_processed or not event.is_scored:
             continue
         
-        # Skip if scores are not numeric
-        if not (home_score.isdigit() and away_score.isdigit()):
-            continue
-        
-        fixtures_processed.add(match_id)
+        fixtures_processed.add(event.match_id)
+        home_team_id = event.home_id
+        away_team_id = event.away_id
         
         # Get recent form for both teams
-        home_matches = await fetch_team_recent_matches(api_key, home_team_id, 10)
-        away_matches = await fetch_team_recent_matches(api_key, away_team_id, 10)
-        
-        home_wins, home_draws, home_losses = calculate_form(home_matches, home_team_id)
-        away_wins, away_draws, away_losses = calculate_form(away_matches, away_team_id)
+        if store is not None and store.knows(home_team_id) and store.knows(away_team_id):
+            home_wins, away_wins = store.form(home_team_id), store.form(away_team_id)
+        else:
+            home_matches = parse_events(await fetch_team_recent_matches(client, api_key, home_team_id, FORM_WINDOW))
+            away_matches = parse_events(await fetch_team_recent_matches(client, api_key, away_team_id, FORM_WINDOW))
+            
+            home_wins, home_draws, home_losses = calculate_form(home_matches, home_team_id)
+            away_wins, away_draws, away_losses = calculate_form(away_matches, away_team_id)
         
         # Calculate H2H record
-        h2h_home_wins, h2h_away_wins, h2h_draws = calculate_h2h_record(events, home_team_id, away_team_id)
+        h2h_home_wins, h2h_away_wins, h2h_draws = lookup_h2h_record(h2h_index, home_team_id, away_team_id)
         
         # Get standings
         home_standing = standings_lookup.get(home_team_id, 20)
         away_standing = standings_lookup.get(away_team_id, 20)
         
-        # Determine result (1 = home win, 0 = draw, -1 = away win)
-        if int(home_score) > int(away_score):
-            result = 1  # Home win
-        elif int(home_score) < int(away_score):
-            result = -1  # Away win
-        else:
-            result = 0  # Draw
-        
-        # Create feature vector
+        # Create feature vector (result: 1 = home win, 0 = draw, -1 = away win)
         feature_vector = {
+            'match_id': event.match_id,
+            'match_date': event.match_date,
             'home_id': home_team_id,
             'away_id': away_team_id,
             'form_home': home_wins,  # Just wins for simplicity
@@ -170,36 +196,102 @@ async def extract_features(events: list, api_key: str):
             'standing_away': away_standing,
             'h2h_home_wins': h2h_home_wins,
             'h2h_away_wins': h2h_away_wins,
-            'result': result
+            'result': event.outcome
         }
         
         features.append(feature_vector)
+    
+    return features
+
+def extract_features_offline(events: list):
+    """Extract ML features from stored matches only, as of each match's kickoff
+    
+    Form, league position and H2H are replayed through a feature store from
+    earlier stored matches, so no network calls are made and no later results
+    leak into a fixture.
+    """
+    features = []
+    
+    # Unique scored fixtures in kickoff order
+    fixtures = {}
+    for event in events:
+        if event.is_scored:
+            fixtures.setdefault(event.match_id, event)
+    fixtures = sorted(fixtures.values(), key=lambda m: m.kickoff)
+    
+    # Teams of each league's season, registered level on zero at that season's first kickoff
+    season_teams = {}
+    for event in fixtures:
+        season_teams.setdefault((event.league_id, season_of(event.kickoff)), set()).update((event.home_id, event.away_id))
+    store = FeatureStore()
+    
+    # Matches sharing a kickoff can't see each other's results
+    for kickoff, group in groupby(fixtures, key=lambda m: m.kickoff):
+        group = list(group)
+        season = season_of(kickoff)
+        
+        for event in group:
+            for team_id in sorted(season_teams.pop((event.league_id, season), ())):
+                store.register(event.league_id, season, team_id)
+            features.append({
+                'match_id': event.match_id,
+                'match_date': event.match_date,
+                'home_id': event.home_id,
+                'away_id': event.away_id,
+                **store.features(event.home_id, event.away_id, event.league_id, season),
+                'result': event.outcome
+            })
         
-        # Rate limiting
-        await asyncio.sleep(0.5)
+        # Apply the group's results before moving on to later kickoffs
+        for event in group:
+            store.update(event)
     
     return features
 
-async def build_features():
+async def build_features(offline: bool = False):
     """Main function to build features from raw events"""
     api_key = os.getenv('API_FOOTBALL_KEY')
     
-    if not api_key:
+    if not api_key and not offline and not API_OFFLINE:
         print("Error: API_FOOTBALL_KEY not found in environment")
         return
     
-    # Load raw events
+    # Load matches (columnar store, or a legacy raw_events.json)
     try:
-        with open('data_pipeline/raw_events.json', 'r') as f:
-            events = json.load(f)
+        events = load_matches()
         print(f"Loaded {len(events)} events")
     except FileNotFoundError:
-        print("Error: raw_events.json not found. Run fetch_data.py first.")
+        print("Error: no event store found. Run fetch_data.py first.")
         return
     
     # Extract features
-    print("Extracting features...")
-    features = await extract_features(events, api_key)
+    start = time.perf_counter()
+    if offline:
+        print("Extracting features offline (point-in-time)...")
+        features = extract_features_offline(events)
+        # Same replay up to today, saved for the bot and later runs
+        update_feature_store(load_matches(finished_only=True), rebuild=True)
+    else:
+        print("Extracting features...")
+        # Current form from the feature store, caught up with the stored events
+        feature_store = update_feature_store(load_matches(finished_only=True))
+        # Responses come from the shared store when fresh; only real requests are rate limited
+        current_priority.set(BACKFILL)
+        store = ResponseStore()
+        scheduler = RequestScheduler()
+        client = ApiClient(rate_limiter=TokenBucket(API_RATE_LIMIT), store=store, scheduler=scheduler)
+        try:
+            features = await extract_features(events, api_key, client, feature_store)
+        finally:
+            await client.close()
+            store_stats = store.stats()
+            store.close()
+            quota = scheduler.stats()
+            scheduler.close()
+        print(f"API responses: {store_stats['hits']} from the response store, {store_stats['writes']} fetched")
+        print(f"API quota: {quota['used_today']}/{quota['daily_quota']} used today, "
+              f"{quota['remaining']['backfill']} left for backfill")
+    print(f"Extracted {len(features)} feature rows in {time.perf_counter() - start:.2f}s")
     
     # Create DataFrame and save
     df = pd.DataFrame(features)
@@ -213,4 +305,8 @@ async def build_features():
     print(df['result'].value_counts())
 
 if __name__ == "__main__":
-    asyncio.run(build_features())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Build ML features from raw events")
+    parser.add_argument('--offline', action='store_true',
+                        help="rebuild form and standings from stored events as of each kickoff, without API calls")
+    args = parser.parse_args()
+    asyncio.run(build_features(offline=args.offline))
\ No newline at end of file
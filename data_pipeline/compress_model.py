@@ -0,0 +1,237 @@
+"""
+Smaller and faster candidates for the shipped model, with a size/latency/accuracy report
+Candidates are the current model saved compressed, its first trees only,
+smaller retrained forests, and gradient-boosted and logistic students
+distilled from the current model's probabilities. Each is measured the way
+the bot serves it (flat forest for forests, predict_proba otherwise).
+
+    python data_pipeline/compress_model.py                         # report only
+    python data_pipeline/compress_model.py --ship --tolerance 0.01 # ship the fastest within 1pt of accuracy
+"""
+
+import argparse
+import copy
+import json
+import os
+import pickle
+import statistics
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import log_loss
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flat_forest import FlatForest
+from model_store import ModelBundle, MODEL_PATH, FEATURE_INFO_PATH
+from data_pipeline.train_model import FEATURE_COLUMNS, held_out_split, fit_model, save_model
+
+FEATURES_PATH = 'data_pipeline/features.csv'
+# Accuracy points a shipped candidate may lose against the current model
+ACCURACY_TOLERANCE = 0.01
+# Synthetic rows added to the distillation set, spread over the observed feature ranges
+TRANSFER_ROWS = 20000
+BATCH_ROWS = 1000
+
+
+def sub_forest(model: RandomForestClassifier, n_trees: int) -> RandomForestClassifier:
+    """The forest's first n_trees trees, without refitting"""
+    smaller = copy.copy(model)
+    smaller.estimators_ = model.estimators_[:n_trees]
+    smaller.n_estimators = n_trees
+    return smaller
+
+
+def transfer_set(X_train: pd.DataFrame, rows: int = TRANSFER_ROWS, seed: int = 0) -> pd.DataFrame:
+    """Training rows plus uniform integer samples within each feature's observed range"""
+    rng = np.random.default_rng(seed)
+    synthetic = np.column_stack([rng.integers(X_train[c].min(), X_train[c].max() + 1, rows) for c in FEATURE_COLUMNS])
+    return pd.concat([X_train, pd.DataFrame(synthetic.astype(float), columns=FEATURE_COLUMNS)], ignore_index=True)
+
+
+def final_step(model):
+    """The estimator itself, unwrapped from a pipeline"""
+    return model.steps[-1][1] if hasattr(model, 'steps') else model
+
+
+def sample_weight_param(model) -> str:
+    # Pipelines route fit parameters to a step by name
+    return f"{model.steps[-1][0]}__sample_weight" if hasattr(model, 'steps') else 'sample_weight'
+
+
+def distill(student, teacher, X_transfer: pd.DataFrame):
+    """Fit a student on the teacher's probabilities
+
+    Each row is repeated once per class, weighted by the teacher's
+    probability, so minimising log loss matches the soft targets.
+    """
+    probabilities = teacher.predict_proba(X_transfer)
+    classes = np.asarray(teacher.classes_)
+    X = pd.concat([X_transfer] * len(classes), ignore_index=True)
+    y = np.repeat(classes, len(X_transfer))
+    weights = probabilities.T.ravel()
+    keep = weights > 0
+    student.fit(X[keep], y[keep], **{sample_weight_param(student): weights[keep]})
+    return student
+
+
+def build_candidates(teacher, X_train: pd.DataFrame, y_train: pd.Series) -> list:
+    """(name, model, joblib compress level) for every candidate, the current model first"""
+    candidates = [('current', teacher, 0), ('current, compressed', teacher, 3)]
+    if isinstance(teacher, RandomForestClassifier):
+        for n_trees in (50, 25, 10):
+            if n_trees < len(teacher.estimators_):
+                candidates.append((f"first {n_trees} trees", sub_forest(teacher, n_trees), 3))
+    for n_estimators, max_depth in ((50, 8), (25, 6), (10, 4)):
+        candidates.append((f"forest {n_estimators}x{max_depth}", fit_model(X_train, y_train, n_estimators, max_depth), 3))
+
+    X_transfer = transfer_set(X_train)
+    candidates.append(('distilled boosting', distill(
+        HistGradientBoostingClassifier(max_iter=100, max_leaf_nodes=15, random_state=42), teacher, X_transfer), 3))
+    candidates.append(('distilled logistic', distill(
+        make_pipeline(StandardScaler(), LogisticRegression(max_iter=1000)), teacher, X_transfer), 3))
+    return candidates
+
+
+def serving_bundle(model) -> ModelBundle:
+    """Bundle as the bot builds it: flat forest for random forests, sklearn otherwise"""
+    bundle = ModelBundle(model, {'feature_columns': FEATURE_COLUMNS})
+    if isinstance(model, RandomForestClassifier):
+        bundle.flat_forest = FlatForest.from_sklearn(model, FEATURE_COLUMNS)
+    return bundle
+
+
+def memory_bytes(bundle: ModelBundle) -> int:
+    """Approximate resident size of what the bot keeps: the model plus any flat forest arrays"""
+    # sklearn trees hold their nodes in C buffers tracemalloc can't see; the pickle has every byte
+    size = len(pickle.dumps(bundle.model, protocol=pickle.HIGHEST_PROTOCOL))
+    flat = bundle.flat_forest
+    if flat is not None:
+        size += sum(a.nbytes for a in (flat.feature, flat.threshold, flat.left, flat.right, flat.value, flat.roots))
+    return size
+
+
+def median_seconds(fn, repeat: int) -> float:
+    fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def measure(name: str, model, compress: int, X_test: pd.DataFrame, y_test: pd.Series,
+            reference: np.ndarray, tmp_dir: str) -> dict:
+    """File size, load time, memory, latency and test metrics of one candidate"""
+    path = os.path.join(tmp_dir, 'candidate.joblib')
+    joblib.dump(model, path, compress=compress)
+    load_seconds = median_seconds(lambda: joblib.load(path), 5)
+
+    bundle = serving_bundle(joblib.load(path))
+    X = X_test.to_numpy(dtype=float)
+    probabilities = bundle.predict_proba(X)
+    predictions = bundle.classes[probabilities.argmax(axis=1)]
+    rng = np.random.default_rng(0)
+    batch = X[rng.integers(0, len(X), BATCH_ROWS)]
+
+    return {
+        'name': name,
+        'model_type': type(final_step(model)).__name__,
+        'compress': compress,
+        'file_bytes': os.path.getsize(path),
+        'load_seconds': load_seconds,
+        'memory_bytes': memory_bytes(bundle),
+        'single_seconds': median_seconds(lambda: bundle.predict_proba(X[:1]), 200),
+        'batch_seconds': median_seconds(lambda: bundle.predict_proba(batch), 20),
+        'accuracy': float((predictions == y_test.to_numpy()).mean()),
+        'log_loss': float(log_loss(y_test, probabilities, labels=bundle.classes)),
+        'agreement': float((predictions == reference).mean()),
+    }
+
+
+def print_report(results: list, shipped: str = None):
+    print(f"\n{'Candidate':<22}{'size KB':>9}{'load ms':>9}{'mem KB':>9}{'1 row µs':>10}"
+          f"{f'{BATCH_ROWS} rows ms':>14}{'accuracy':>10}{'log loss':>10}{'agree':>7}")
+    for r in results:
+        mark = ' ✅' if r['name'] == shipped else ''
+        print(f"{r['name']:<22}{r['file_bytes'] / 1024:>9.0f}{r['load_seconds'] * 1000:>9.1f}"
+              f"{r['memory_bytes'] / 1024:>9.0f}{r['single_seconds'] * 1e6:>10.0f}{r['batch_seconds'] * 1000:>14.2f}"
+              f"{r['accuracy']:>10.3f}{r['log_loss']:>10.3f}{r['agreement']:>7.0%}{mark}")
+
+
+def pick(results: list, tolerance: float) -> dict:
+    """Fastest single-row candidate whose accuracy is within `tolerance` of the current model's"""
+    floor = results[0]['accuracy'] - tolerance
+    eligible = [r for r in results if r['accuracy'] >= floor]
+    return min(eligible, key=lambda r: (r['single_seconds'], r['file_bytes']))
+
+
+def compress_model(features_path: str = FEATURES_PATH, tolerance: float = ACCURACY_TOLERANCE,
+                   ship: bool = False, output: str = None):
+    """Build, measure and optionally ship a smaller model"""
+    try:
+        df = pd.read_csv(features_path)
+        teacher = joblib.load(MODEL_PATH)
+        feature_info = joblib.load(FEATURE_INFO_PATH)
+    except FileNotFoundError as e:
+        print(f"Error: {e.filename} not found. Run build_features.py and train_model.py first.")
+        return
+
+    # The current model's own held-out matches, so its accuracy isn't inflated by rows it trained on
+    X_train, X_test, y_train, y_test = held_out_split(df, feature_info)
+    print(f"🗜️ Building candidates from {MODEL_PATH} ({type(teacher).__name__}), "
+          f"{len(X_train)} training / {len(X_test)} test rows")
+    candidates = build_candidates(teacher, X_train, y_train)
+
+    reference = teacher.predict(X_test)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results = [measure(name, model, compress, X_test, y_test, reference, tmp_dir)
+                   for name, model, compress in candidates]
+
+    best = pick(results, tolerance)
+    print_report(results, best['name'])
+    current = results[0]
+    print(f"\nFastest within {tolerance:.1%} accuracy of the current model: {best['name']} "
+          f"({current['single_seconds'] / best['single_seconds']:.1f}x faster per row, "
+          f"{best['file_bytes'] / current['file_bytes']:.1%} of the file size, "
+          f"accuracy {best['accuracy']:.3f} vs {current['accuracy']:.3f})")
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump({'tolerance': tolerance, 'picked': best['name'], 'candidates': results}, f, indent=2)
+        print(f"Report saved to {output}")
+
+    if ship and best['name'] != 'current':
+        model, compress = next((m, c) for name, m, c in candidates if name == best['name'])
+        feature_info = {
+            **feature_info,
+            'model_type': best['model_type'],
+            'accuracy': best['accuracy'],
+            'log_loss': best['log_loss'],
+            'compressed_from': feature_info.get('model_type', type(teacher).__name__),
+        }
+        save_model(model, feature_info, df[FEATURE_COLUMNS].to_numpy(), compress)
+        print(f"🚀 Shipped {best['name']}")
+    elif ship:
+        print("The current model is already the fastest within tolerance; nothing shipped")
+    return best, results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--features', default=FEATURES_PATH)
+    parser.add_argument('--tolerance', type=float, default=ACCURACY_TOLERANCE,
+                        help="accuracy the shipped model may lose against the current one (0.01 = 1 point)")
+    parser.add_argument('--ship', action='store_true', help="replace the current model with the pick")
+    parser.add_argument('--output', default=None, help="save the report as JSON")
+    args = parser.parse_args()
+    compress_model(args.features, args.tolerance, args.ship, args.output)
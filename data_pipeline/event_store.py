@@ -0,0 +1,186 @@
+"""
+Columnar on-disk store for match events
+One typed .npy file per column plus meta.json, so reads can be memory-mapped
+and limited to the columns a caller needs
+
+    python data_pipeline/event_store.py data_pipeline/raw_events.json
+"""
+
+import os
+import sys
+import json
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from atomic_write import atomic_dir
+
+EVENT_STORE_DIR = "data_pipeline/events"
+# A reader racing save_event_store's directory swap retries for up to a second
+SWAP_RETRIES = 50
+SWAP_WAIT_SECONDS = 0.02
+
+COLUMN_TYPES = {
+    'match_id': np.int64,
+    'league_id': np.int32,
+    'home_id': np.int32,
+    'away_id': np.int32,
+    'home_score': np.int16,   # -1 when not played / unknown
+    'away_score': np.int16,
+    'kickoff': 'datetime64[m]',
+    'status': np.int8,        # Index into meta['statuses']
+}
+
+
+def to_int(value, missing: int = -1) -> int:
+    value = str(value).strip() if value is not None else ''
+    return int(value) if value.isdigit() else missing
+
+
+def parse_kickoff(event: dict):
+    match_date = event.get('match_date') or ''
+    match_time = event.get('match_time') or '00:00'
+    try:
+        return np.datetime64(f"{match_date}T{match_time}", 'm')
+    except ValueError:
+        return np.datetime64('NaT', 'm')
+
+
+def events_to_columns(events: list, meta: dict = None):
+    """Parse API event dicts into typed columns, extending meta's name tables"""
+    meta = meta or {'statuses': [], 'team_names': {}, 'league_names': {}}
+    statuses = meta['statuses']
+    status_codes = {status: code for code, status in enumerate(statuses)}
+
+    rows = {name: [] for name in COLUMN_TYPES}
+    for event in events:
+        status = event.get('match_status') or ''
+        if status not in status_codes:
+            status_codes[status] = len(statuses)
+            statuses.append(status)
+
+        rows['match_id'].append(to_int(event.get('match_id')))
+        rows['league_id'].append(to_int(event.get('league_id')))
+        rows['home_id'].append(to_int(event.get('match_hometeam_id')))
+        rows['away_id'].append(to_int(event.get('match_awayteam_id')))
+        rows['home_score'].append(to_int(event.get('match_hometeam_score')))
+        rows['away_score'].append(to_int(event.get('match_awayteam_score')))
+        rows['kickoff'].append(parse_kickoff(event))
+        rows['status'].append(status_codes[status])
+
+        for id_key, name_key in (('match_hometeam_id', 'match_hometeam_name'),
+                                 ('match_awayteam_id', 'match_awayteam_name')):
+            if event.get(id_key) and event.get(name_key):
+                meta['team_names'][str(event[id_key])] = event[name_key]
+        if event.get('league_id') and event.get('league_name'):
+            meta['league_names'][str(event['league_id'])] = event['league_name']
+
+    columns = {name: np.array(values, dtype=COLUMN_TYPES[name]) for name, values in rows.items()}
+    return columns, meta
+
+
+def merge_columns(old: dict, new: dict) -> dict:
+    """Combine two column sets, keeping the newest row per match_id, in kickoff order"""
+    if not old or len(old['match_id']) == 0:
+        merged = {name: np.asarray(new[name]) for name in COLUMN_TYPES}
+    else:
+        merged = {name: np.concatenate([old[name], new[name]]) for name in COLUMN_TYPES}
+
+    # Last occurrence of each match_id wins
+    reversed_ids = merged['match_id'][::-1]
+    _, first_in_reversed = np.unique(reversed_ids, return_index=True)
+    keep = len(reversed_ids) - 1 - first_in_reversed
+    keep = keep[np.argsort(merged['kickoff'][keep], kind='stable')]
+    return {name: merged[name][keep] for name in COLUMN_TYPES}
+
+
+def save_event_store(columns: dict, meta: dict, path: str = EVENT_STORE_DIR):
+    """Write the store to a temp dir, then swap it in so readers never see half a store"""
+    with atomic_dir(path) as tmp_path:
+        for name in COLUMN_TYPES:
+            np.save(os.path.join(tmp_path, f"{name}.npy"), np.asarray(columns[name], dtype=COLUMN_TYPES[name]))
+        with open(os.path.join(tmp_path, 'meta.json'), 'w') as f:
+            json.dump({**meta, 'rows': int(len(columns['match_id']))}, f)
+
+
+def load_event_store(path: str = EVENT_STORE_DIR, columns: list = None, mmap: bool = True):
+    """Load (columns, meta), memory-mapping only the requested columns
+
+    Raises FileNotFoundError if no store exists at path.
+    """
+    for attempt in range(SWAP_RETRIES):
+        try:
+            with open(os.path.join(path, 'meta.json'), 'r') as f:
+                meta = json.load(f)
+            mmap_mode = 'r' if mmap else None
+            data = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+                    for name in (columns or COLUMN_TYPES)}
+            return data, meta
+        except FileNotFoundError:
+            # Missing with a .old beside it (or back already) means a save is mid-swap, not that there's no store
+            swapping = os.path.exists(path) or os.path.exists(f"{path}.old")
+            if not swapping or attempt == SWAP_RETRIES - 1:
+                raise
+            time.sleep(SWAP_WAIT_SECONDS)
+
+
+def columns_to_events(columns: dict, meta: dict) -> list:
+    """Rebuild API-style event dicts (string IDs and scores) from columns"""
+    team_names = meta.get('team_names', {})
+    league_names = meta.get('league_names', {})
+    statuses = meta.get('statuses', [])
+
+    def text(value):
+        return str(value) if value >= 0 else ''
+
+    events = []
+    for i in range(len(columns['match_id'])):
+        kickoff = str(columns['kickoff'][i])
+        home_id, away_id = text(columns['home_id'][i]), text(columns['away_id'][i])
+        league_id = text(columns['league_id'][i])
+        events.append({
+            'match_id': text(columns['match_id'][i]),
+            'match_date': kickoff[:10] if kickoff != 'NaT' else '',
+            'match_time': kickoff[11:16] if kickoff != 'NaT' else '',
+            'match_status': statuses[columns['status'][i]] if statuses else '',
+            'league_id': league_id,
+            'league_name': league_names.get(league_id, ''),
+            'match_hometeam_id': home_id,
+            'match_hometeam_name': team_names.get(home_id, ''),
+            'match_awayteam_id': away_id,
+            'match_awayteam_name': team_names.get(away_id, ''),
+            'match_hometeam_score': text(columns['home_score'][i]),
+            'match_awayteam_score': text(columns['away_score'][i]),
+        })
+    return events
+
+
+def load_events(path: str = EVENT_STORE_DIR, json_fallback: str = "data_pipeline/raw_events.json") -> list:
+    """Event dicts from the columnar store, or from a legacy JSON file if there is no store"""
+    try:
+        return columns_to_events(*load_event_store(path))
+    except FileNotFoundError:
+        with open(json_fallback, 'r') as f:
+            return json.load(f)
+
+
+def convert_json(json_path: str, path: str = EVENT_STORE_DIR):
+    """One-shot conversion of a raw_events.json file into the columnar store"""
+    with open(json_path, 'r') as f:
+        events = json.load(f)
+    columns, meta = events_to_columns(events)
+    columns = merge_columns({}, columns)
+    save_event_store(columns, meta, path)
+    return len(events), len(columns['match_id'])
+
+
+if __name__ == "__main__":
+    json_path = sys.argv[1] if len(sys.argv) > 1 else "data_pipeline/raw_events.json"
+    store_path = sys.argv[2] if len(sys.argv) > 2 else EVENT_STORE_DIR
+    try:
+        total, unique = convert_json(json_path, store_path)
+    except FileNotFoundError:
+        print(f"Error: {json_path} not found")
+        sys.exit(1)
+    print(f"Converted {total} events ({unique} unique matches) from {json_path} to {store_path}")
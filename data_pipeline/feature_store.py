@@ -0,0 +1,221 @@
+"""
+Incremental per-team feature state shared by the pipeline and the bot
+Keeps each team's last results, a points/goal-difference table per league
+and season, and head-to-head tallies per team pair. A finished match updates it in O(1),
+league positions are re-ranked lazily on the next read, and the whole state
+is saved as JSON so the bot can predict without per-request API calls.
+
+    python data_pipeline/feature_store.py            # apply new stored matches
+    python data_pipeline/feature_store.py --rebuild  # replay every stored match
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from atomic_write import atomic_open
+
+FEATURE_STORE_PATH = os.getenv('FEATURE_STORE_PATH', 'data_pipeline/feature_store.json')
+FORM_WINDOW = 10  # Matches counted for form, by the pipeline, the bot and the probability table
+UNKNOWN_STANDING = 20
+SEASON_START_MONTH = 8  # Seasons run August to May, as in fetch_data.py
+# Saved stores in another format are rebuilt rather than loaded
+STORE_VERSION = 2
+
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def season_of(kickoff: int) -> int:
+    """Start year of the season a kickoff (minutes since epoch) falls in"""
+    day = date.fromordinal(EPOCH_ORDINAL + kickoff // (24 * 60))
+    return day.year - (day.month < SEASON_START_MONTH)
+
+
+class FeatureStore:
+    """Rolling form, league tables and H2H tallies, updated one match at a time"""
+
+    def __init__(self, window: int = FORM_WINDOW):
+        self.window = window
+        self.recent = {}       # team_id -> deque of the last `window` results (1/0/-1)
+        self.tables = {}       # (league_id, season) -> {team_id: [points, goal difference, goals for]}
+        self.team_table = {}   # team_id -> (league_id, season) of its latest match
+        self.h2h = {}          # (low team_id, high team_id) -> [low wins, high wins, draws]
+        self.applied = set()   # match_ids already counted
+        self.last_kickoff = -1
+        self.ranked = {}       # (league_id, season) -> {team_id: position}, dropped when the table changes
+
+    def __len__(self):
+        return len(self.team_table)
+
+    def knows(self, team_id: int) -> bool:
+        return team_id in self.team_table
+
+    def register(self, league_id: int, season: int, team_id: int):
+        """Add a team to a league's table for one season on zero points"""
+        key = (league_id, season)
+        table = self.tables.setdefault(key, {})
+        if team_id not in table:
+            table[team_id] = [0, 0, 0]
+            self.ranked.pop(key, None)
+        self.team_table.setdefault(team_id, key)
+
+    def update(self, match) -> bool:
+        """Count one finished match (a Match record); False if unscored or already applied
+
+        Matches should arrive in kickoff order; a late, older result still
+        counts towards tables and H2H but lands last in the teams' form.
+        """
+        if not match.is_scored or match.match_id in self.applied:
+            return False
+        self.applied.add(match.match_id)
+        self.last_kickoff = max(self.last_kickoff, match.kickoff)
+
+        outcome = match.outcome
+        key = (match.league_id, season_of(match.kickoff))
+        for team_id, goals_for, goals_against, result in (
+            (match.home_id, match.home_score, match.away_score, outcome),
+            (match.away_id, match.away_score, match.home_score, -outcome),
+        ):
+            self.register(*key, team_id)
+            self.team_table[team_id] = key
+            row = self.tables[key][team_id]
+            row[0] += 3 if result == 1 else 1 if result == 0 else 0
+            row[1] += goals_for - goals_against
+            row[2] += goals_for
+            self.recent.setdefault(team_id, deque(maxlen=self.window)).append(result)
+        self.ranked.pop(key, None)
+
+        pair = (min(match.home_id, match.away_id), max(match.home_id, match.away_id))
+        tally = self.h2h.setdefault(pair, [0, 0, 0])
+        if outcome == 0:
+            tally[2] += 1
+        else:
+            winner = match.home_id if outcome == 1 else match.away_id
+            tally[0 if winner == pair[0] else 1] += 1
+        return True
+
+    def apply(self, matches: list) -> int:
+        """Update with every new finished match, in kickoff order; returns how many counted"""
+        return sum(self.update(match) for match in sorted(matches, key=lambda m: m.kickoff))
+
+    def positions(self, league_id: int, season: int) -> dict:
+        """Rank a league's season by points, then goal difference, then goals scored"""
+        key = (league_id, season)
+        ranked = self.ranked.get(key)
+        if ranked is None:
+            table = self.tables.get(key, {})
+            order = sorted(table, key=lambda t: (-table[t][0], -table[t][1], -table[t][2], t))
+            ranked = self.ranked[key] = {team_id: position for position, team_id in enumerate(order, start=1)}
+        return ranked
+
+    def form(self, team_id: int) -> int:
+        """Wins in the team's last `window` matches"""
+        return self.recent.get(team_id, ()).count(1)
+
+    def standing(self, team_id: int, league_id: int = None, season: int = None) -> int:
+        """League position, in the league and season of the team's latest match unless given"""
+        latest_league, latest_season = self.team_table.get(team_id, (None, None))
+        return self.positions(latest_league if league_id is None else league_id,
+                              latest_season if season is None else season).get(team_id, UNKNOWN_STANDING)
+
+    def h2h_record(self, home_id: int, away_id: int):
+        """(home wins, away wins, draws) between two teams"""
+        pair = (min(home_id, away_id), max(home_id, away_id))
+        low_wins, high_wins, draws = self.h2h.get(pair, (0, 0, 0))
+        if home_id == pair[0]:
+            return low_wins, high_wins, draws
+        return high_wins, low_wins, draws
+
+    def features(self, home_id: int, away_id: int, league_id: int = None, season: int = None):
+        """The model's feature row for a fixture, or None if either team is unknown"""
+        if not (self.knows(home_id) and self.knows(away_id)):
+            return None
+        h2h_home_wins, h2h_away_wins, _ = self.h2h_record(home_id, away_id)
+        return {
+            'form_home': self.form(home_id),
+            'form_away': self.form(away_id),
+            'standing_home': self.standing(home_id, league_id, season),
+            'standing_away': self.standing(away_id, league_id, season),
+            'h2h_home_wins': h2h_home_wins,
+            'h2h_away_wins': h2h_away_wins,
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            'version': STORE_VERSION,
+            'window': self.window,
+            'last_kickoff': self.last_kickoff,
+            'recent': {str(t): list(results) for t, results in self.recent.items()},
+            'tables': [[league, season, {str(t): row for t, row in table.items()}]
+                       for (league, season), table in self.tables.items()],
+            'team_table': {str(t): list(key) for t, key in self.team_table.items()},
+            'h2h': [[low, high, *tally] for (low, high), tally in self.h2h.items()],
+            'applied': sorted(self.applied),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'FeatureStore':
+        if data.get('version') != STORE_VERSION:
+            raise ValueError(f"feature store version {data.get('version')}, expected {STORE_VERSION}")
+        store = cls(data['window'])
+        store.last_kickoff = data['last_kickoff']
+        store.recent = {int(t): deque(results, maxlen=store.window) for t, results in data['recent'].items()}
+        store.tables = {(league, season): {int(t): row for t, row in table.items()}
+                        for league, season, table in data['tables']}
+        store.team_table = {int(t): tuple(key) for t, key in data['team_table'].items()}
+        store.h2h = {(low, high): tally for low, high, *tally in data['h2h']}
+        store.applied = set(data['applied'])
+        return store
+
+    def save(self, path: str = FEATURE_STORE_PATH):
+        """Write atomically, so a reader never sees half a store"""
+        with atomic_open(path) as f:
+            json.dump(self.to_dict(), f, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, path: str = FEATURE_STORE_PATH) -> 'FeatureStore':
+        """Raises FileNotFoundError if no store was saved"""
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+
+def update_feature_store(matches: list, path: str = FEATURE_STORE_PATH, rebuild: bool = False) -> FeatureStore:
+    """Apply matches not yet in the saved store (or replay them all) and save it"""
+    store = FeatureStore()
+    if not rebuild:
+        try:
+            store = FeatureStore.load(path)
+        except FileNotFoundError:
+            pass
+        except ValueError as e:
+            print(f"⚠️ Rebuilding the feature store: {e}")
+    added = store.apply(matches)
+    if added or rebuild or not os.path.exists(path):
+        store.save(path)
+    print(f"✅ Feature store: {added} new matches applied, {len(store)} teams, {len(store.applied)} matches ({path})")
+    return store
+
+
+if __name__ == "__main__":
+    from data_pipeline.matches import load_matches
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rebuild', action='store_true', help="replay every stored match into a fresh store")
+    parser.add_argument('--path', default=FEATURE_STORE_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        matches = load_matches(finished_only=True)
+    except FileNotFoundError:
+        print("Error: no event store found. Run fetch_data.py first.")
+        sys.exit(1)
+    update_feature_store(matches, args.path, args.rebuild)
+    print(f"Done in {time.perf_counter() - start:.2f}s")
@@ -1,89 +1,230 @@
 import os
-import aiohttp
+import sys
+import argparse
 import asyncio
 import json
-from datetime import datetime, timedelta
+import time
+from datetime import date, datetime, timedelta
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The project modules read their settings at import time, so .env goes first
 load_dotenv()
 
-API_BASE_URL = "https://apiv3.apifootball.com/"
-LEAGUE_ID = "152"  # Premier League
-SEASON_START = "2023-08-01"
-SEASON_END = "2024-05-31"
+from api_client import ApiClient, TokenBucket
+from atomic_write import atomic_open
+from response_store import ResponseStore, FINAL_STATUSES, API_OFFLINE
+from request_scheduler import RequestScheduler, BACKFILL, current_priority
+from data_pipeline.event_store import (EVENT_STORE_DIR, events_to_columns, merge_columns,
+                                       save_event_store, load_event_store)
+from data_pipeline.matches import matches_from_columns, finished_columns
+from data_pipeline.feature_store import update_feature_store
 
-async def fetch_events_for_date_range(start_date: str, end_date: str, league_id: str, api_key: str):
-    """Fetch match events for a specific date range"""
-    events = []
-    
-    async with aiohttp.ClientSession() as session:
-        url = f"{API_BASE_URL}?action=get_events&from={start_date}&to={end_date}&league_id={league_id}&APIkey={api_key}"
-        
-        try:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if isinstance(data, list):
-                        events.extend(data)
-                    print(f"Fetched {len(data) if isinstance(data, list) else 0} events for {start_date} to {end_date}")
-                else:
-                    print(f"Error fetching events: HTTP {response.status}")
-        except Exception as e:
-            print(f"Exception fetching events: {e}")
-    
-    return events
+LEAGUE_IDS = os.getenv('LEAGUE_IDS', '152').split(',')  # Premier League
+SEASONS = os.getenv('SEASONS', '2023').split(',')         # Season start years
+SEASON_START = "08-01"
+SEASON_END = "05-31"
+
+# Download throttling, tune to the API plan
+API_RATE_LIMIT = float(os.getenv('API_RATE_LIMIT', '2'))     # Requests per second
+API_BURST = float(os.getenv('API_BURST', '5'))
+API_CONCURRENCY = int(os.getenv('API_CONCURRENCY', '4'))
+API_RETRIES = int(os.getenv('API_RETRIES', '4'))
+
+CHECKPOINT_FILE = "data_pipeline/fetch_checkpoint.json"
+# Progress is written every FETCH_SAVE_EVERY chunks or FETCH_SAVE_SECONDS, and once at the end
+FETCH_SAVE_EVERY = int(os.getenv('FETCH_SAVE_EVERY', '12'))
+FETCH_SAVE_SECONDS = float(os.getenv('FETCH_SAVE_SECONDS', '60'))
+# The API answers a range without matches with this error object instead of []
+NO_EVENTS_MESSAGE = "No event found"
+
+def season_window(season: str):
+    """First and last day of a season starting in `season`"""
+    return f"{season}-{SEASON_START}", f"{int(season) + 1}-{SEASON_END}"
+
+def month_chunks(start: str, end: str):
+    """Split a date range into (chunk_start, chunk_end) month-sized pieces"""
+    current_date = datetime.strptime(start, "%Y-%m-%d")
+    end_date = datetime.strptime(end, "%Y-%m-%d")
+    chunks = []
 
-async def fetch_all_season_data():
-    """Fetch all match events for the entire season"""
-    api_key = os.getenv('API_FOOTBALL_KEY')
-    
-    if not api_key:
-        print("Error: API_FOOTBALL_KEY not found in environment")
-        return
-    
-    print(f"Fetching data for League ID {LEAGUE_ID} from {SEASON_START} to {SEASON_END}")
-    
-    # Fetch events in monthly chunks to avoid rate limits
-    start_date = datetime.strptime(SEASON_START, "%Y-%m-%d")
-    end_date = datetime.strptime(SEASON_END, "%Y-%m-%d")
-    
-    all_events = []
-    current_date = start_date
-    
     while current_date <= end_date:
         # Calculate month-end date
         if current_date.month == 12:
             next_month = current_date.replace(year=current_date.year + 1, month=1, day=1)
         else:
             next_month = current_date.replace(month=current_date.month + 1, day=1)
-        
+
         month_end = min(next_month - timedelta(days=1), end_date)
-        
-        chunk_start = current_date.strftime("%Y-%m-%d")
-        chunk_end = month_end.strftime("%Y-%m-%d")
-        
-        print(f"Fetching events from {chunk_start} to {chunk_end}")
-        
-        events = await fetch_events_for_date_range(chunk_start, chunk_end, LEAGUE_ID, api_key)
-        all_events.extend(events)
-        
-        # Rate limiting delay
-        await asyncio.sleep(1)
+        chunks.append((current_date.strftime("%Y-%m-%d"), month_end.strftime("%Y-%m-%d")))
         current_date = next_month
+
+    return chunks
+
+def chunk_key(league_id: str, start: str, end: str) -> str:
+    return f"{league_id}:{start}:{end}"
+
+def load_json(path: str, default):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+def save_json(path: str, data, indent=None):
+    """Write JSON atomically so an interrupted run never leaves a torn file"""
+    with atomic_open(path) as f:
+        json.dump(data, f, indent=indent)
+
+def chunk_is_final(end: str, events: list) -> bool:
+    """A chunk is complete once it is in the past and all its matches are final"""
+    if datetime.strptime(end, "%Y-%m-%d").date() >= date.today():
+        return False
+    return all(event.get('match_status') in FINAL_STATUSES for event in events)
+
+async def fetch_events_for_date_range(client: ApiClient, start_date: str, end_date: str, league_id: str, api_key: str):
+    """Fetch match events for a specific date range (None if the request failed)"""
+    events = []
+    params = {'action': 'get_events', 'from': start_date, 'to': end_date,
+              'league_id': league_id, 'APIkey': api_key}
+
+    try:
+        status, data = await client.fetch(params, retries=API_RETRIES)
+        if status == 200 and isinstance(data, dict) and str(data.get('message', '')).startswith(NO_EVENTS_MESSAGE):
+            print(f"Fetched 0 events for league {league_id}, {start_date} to {end_date}")
+            return events
+        if status == 200 and isinstance(data, dict) and 'error' in data:
+            # Bad keys, plans and parameters come back as a 200 with an error object
+            print(f"Error fetching events for league {league_id}, {start_date} to {end_date}: "
+                  f"{data.get('message', data['error'])}")
+            return None
+        if status == 200:
+            if isinstance(data, list):
+                events.extend(data)
+            print(f"Fetched {len(events)} events for league {league_id}, {start_date} to {end_date}")
+        else:
+            print(f"Error fetching events for league {league_id}, {start_date} to {end_date}: HTTP {status}")
+            return None
+    except Exception as e:
+        print(f"Exception fetching events for league {league_id}, {start_date} to {end_date}: {e}")
+        return None
+
+    return events
+
+async def fetch_all_season_data(league_ids: list = LEAGUE_IDS, seasons: list = SEASONS,
+                                rate: float = API_RATE_LIMIT, burst: float = API_BURST,
+                                concurrency: int = API_CONCURRENCY, full: bool = False):
+    """Fetch match events for every league and season, many chunks at once
+
+    Chunks recorded as complete in the checkpoint are skipped and events are
+    merged into the event store by match_id every few chunks and at the end,
+    so reruns only fetch new or unfinished matches and an interrupted run
+    resumes from its last save. Pass full=True to ignore the checkpoint and
+    refetch everything.
+    """
+    api_key = os.getenv('API_FOOTBALL_KEY')
+
+    if not api_key and not API_OFFLINE:
+        print("Error: API_FOOTBALL_KEY not found in environment")
+        return
+
+    checkpoint = {'complete': []} if full else load_json(CHECKPOINT_FILE, {'complete': []})
+    complete = set(checkpoint['complete'])
+    stored, meta = {}, None
+    if not full:
+        try:
+            stored, meta = load_event_store(EVENT_STORE_DIR, mmap=False)
+        except FileNotFoundError:
+            pass
+
+    # One request per (league, season, month) not yet complete
+    chunks = []
+    for league_id in league_ids:
+        for season in seasons:
+            for start, end in month_chunks(*season_window(season)):
+                if chunk_key(league_id, start, end) not in complete:
+                    chunks.append((league_id, start, end))
+
+    print(f"{len(stored.get('match_id', []))} events on disk, {len(complete)} chunks already complete")
+    print(f"Fetching {len(chunks)} chunks for leagues {', '.join(league_ids)}, seasons {', '.join(seasons)} "
+          f"({rate:g} req/s, burst {burst:g}, {concurrency} concurrent)")
+
+    # Stored responses skip the rate limiter, only network requests take tokens.
+    # Backfill only spends the part of the daily quota the bot doesn't reserve
+    current_priority.set(BACKFILL)
+    store = ResponseStore()
+    scheduler = RequestScheduler(max_in_flight=concurrency)
+    client = ApiClient(limit_per_host=concurrency, rate_limiter=TokenBucket(rate, burst),
+                       store=store, scheduler=scheduler)
+    semaphore = asyncio.Semaphore(concurrency)
+    fetched = 0
+    # Fetched since the last save; chunks only count as complete once their events are on disk
+    pending_events, pending_complete = [], []
+    unsaved_chunks, last_save = 0, time.monotonic()
+
+    def save_progress():
+        nonlocal stored, meta, unsaved_chunks, last_save
+        if pending_events:
+            columns, meta = events_to_columns(pending_events, meta)
+            stored = merge_columns(stored, columns)
+            save_event_store(stored, meta, EVENT_STORE_DIR)
+            pending_events.clear()
+        complete.update(pending_complete)
+        pending_complete.clear()
+        checkpoint['complete'] = sorted(complete)
+        save_json(CHECKPOINT_FILE, checkpoint, indent=2)
+        unsaved_chunks, last_save = 0, time.monotonic()
+
+    async def fetch_chunk(league_id, start, end):
+        nonlocal fetched, unsaved_chunks
+        async with semaphore:
+            events = await fetch_events_for_date_range(client, start, end, league_id, api_key)
+        if events is None:
+            return
+        pending_events.extend(events)
+        fetched += len(events)
+        unsaved_chunks += 1
+        if chunk_is_final(end, events):
+            pending_complete.append(chunk_key(league_id, start, end))
+        if (unsaved_chunks >= FETCH_SAVE_EVERY
+                or time.monotonic() - last_save >= FETCH_SAVE_SECONDS):
+            save_progress()
+
+    try:
+        await asyncio.gather(*(fetch_chunk(*chunk) for chunk in chunks))
+    finally:
+        # Also on failure or Ctrl-C, so finished chunks aren't fetched again
+        save_progress()
+        await client.close()
+        store_stats = store.stats()
+        store.close()
+        quota = scheduler.stats()
+        scheduler.close()
+
+    print(f"Events fetched this run: {fetched} "
+          f"({store_stats['hits']} chunks from the response store, {store_stats['writes']} from the API)")
+    print(f"API quota: {quota['used_today']}/{quota['daily_quota']} used today, "
+          f"{quota['remaining']['backfill']} left for backfill"
+          + (f", {quota['rejected']['backfill']} requests refused" if quota['rejected']['backfill'] else ""))
+    print(f"Total events stored: {len(stored.get('match_id', []))}")
+    print(f"Events saved to {EVENT_STORE_DIR}/")
     
-    print(f"Total events fetched: {len(all_events)}")
-    
-    # Save to file
-    output_file = "data_pipeline/raw_events.json"
-    with open(output_file, 'w') as f:
-        json.dump(all_events, f, indent=2)
-    
-    print(f"Events saved to {output_file}")
-    
+    # Newly finished matches roll into the feature store, one O(1) update each
+    if stored:
+        update_feature_store(matches_from_columns(finished_columns(stored, meta)))
+
     # Show data structure summary
-    if all_events:
-        print(f"Sample event has {len(all_events[0])} fields")
-        print("Fields:", list(all_events[0].keys())[:5], "...")
+    if stored:
+        print("Columns:", ", ".join(f"{name} ({column.dtype})" for name, column in stored.items()))
 
 if __name__ == "__main__":
-    asyncio.run(fetch_all_season_data())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Download match events from API-Football")
+    parser.add_argument('--leagues', nargs='+', default=LEAGUE_IDS, help="league IDs to fetch")
+    parser.add_argument('--seasons', nargs='+', default=SEASONS, help="season start years, e.g. 2022 2023")
+    parser.add_argument('--rate', type=float, default=API_RATE_LIMIT, help="requests per second")
+    parser.add_argument('--burst', type=float, default=API_BURST, help="token bucket burst size")
+    parser.add_argument('--concurrency', type=int, default=API_CONCURRENCY, help="max requests in flight")
+    parser.add_argument('--full', action='store_true', help="ignore the checkpoint and refetch everything")
+    args = parser.parse_args()
+    asyncio.run(fetch_all_season_data(args.leagues, args.seasons, args.rate, args.burst, args.concurrency, args.full))
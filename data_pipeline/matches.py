@@ -0,0 +1,112 @@
+"""
+Compact typed match records for the feature pipeline
+Events are parsed once into __slots__ objects with int IDs, scores and
+kickoff minutes, so feature code never re-parses API strings
+"""
+
+import json
+import numpy as np
+from datetime import datetime, timedelta
+from response_store import FINAL_STATUSES
+from data_pipeline.event_store import EVENT_STORE_DIR, load_event_store, to_int
+
+EPOCH = datetime(1970, 1, 1)
+MINUTE = timedelta(minutes=1)
+NO_KICKOFF = -1
+
+
+class Match:
+    """One fixture: int IDs, scores (-1 if unknown) and kickoff in minutes since epoch"""
+    __slots__ = ('match_id', 'league_id', 'kickoff', 'home_id', 'away_id', 'home_score', 'away_score')
+
+    def __init__(self, match_id: int, league_id: int, kickoff: int,
+                 home_id: int, away_id: int, home_score: int, away_score: int):
+        self.match_id = match_id
+        self.league_id = league_id
+        self.kickoff = kickoff
+        self.home_id = home_id
+        self.away_id = away_id
+        self.home_score = home_score
+        self.away_score = away_score
+
+    @property
+    def is_scored(self) -> bool:
+        """True if both teams are known and the match has a final score"""
+        return self.home_id >= 0 and self.away_id >= 0 and self.home_score >= 0 and self.away_score >= 0
+
+    @property
+    def outcome(self) -> int:
+        """1 = home win, 0 = draw, -1 = away win"""
+        return (self.home_score > self.away_score) - (self.home_score < self.away_score)
+
+    @property
+    def match_date(self) -> str:
+        return (EPOCH + self.kickoff * MINUTE).strftime("%Y-%m-%d") if self.kickoff != NO_KICKOFF else ''
+
+    def __repr__(self):
+        return (f"Match({self.match_id}, {self.match_date}, {self.home_id} {self.home_score}"
+                f"-{self.away_score} {self.away_id})")
+
+
+def kickoff_minutes(match_date: str, match_time: str = '') -> int:
+    try:
+        kickoff = datetime.strptime(f"{match_date} {match_time or '00:00'}", "%Y-%m-%d %H:%M")
+    except ValueError:
+        return NO_KICKOFF
+    return (kickoff - EPOCH) // MINUTE
+
+
+def parse_event(event: dict) -> Match:
+    """Parse one API event dict"""
+    return Match(
+        to_int(event.get('match_id')),
+        to_int(event.get('league_id')),
+        kickoff_minutes(event.get('match_date') or '', event.get('match_time') or ''),
+        to_int(event.get('match_hometeam_id')),
+        to_int(event.get('match_awayteam_id')),
+        to_int(event.get('match_hometeam_score')),
+        to_int(event.get('match_awayteam_score')),
+    )
+
+
+def parse_events(events: list) -> list:
+    return [parse_event(event) for event in events]
+
+
+def matches_from_columns(columns: dict) -> list:
+    """Build Match records straight from event store columns"""
+    kickoffs = columns['kickoff'].astype('int64')
+    # NaT is the minimum int64
+    kickoffs[kickoffs == -2 ** 63] = NO_KICKOFF
+    return [Match(*row) for row in zip(
+        columns['match_id'].tolist(), columns['league_id'].tolist(), kickoffs.tolist(),
+        columns['home_id'].tolist(), columns['away_id'].tolist(),
+        columns['home_score'].tolist(), columns['away_score'].tolist(),
+    )]
+
+
+def finished_columns(columns: dict, meta: dict) -> dict:
+    """Only the rows of matches whose status is final"""
+    final = [code for code, status in enumerate(meta.get('statuses', [])) if status in FINAL_STATUSES]
+    keep = np.isin(columns['status'], final)
+    return {name: column[keep] for name, column in columns.items()}
+
+
+def load_matches(path: str = EVENT_STORE_DIR, json_fallback: str = "data_pipeline/raw_events.json",
+                 finished_only: bool = False) -> list:
+    """Match records from the event store, or from a legacy raw_events.json
+
+    With finished_only, matches that are still in play (or not yet final) are left out.
+    """
+    try:
+        columns, meta = load_event_store(path, ['match_id', 'league_id', 'kickoff', 'home_id',
+                                                'away_id', 'home_score', 'away_score', 'status'])
+        if finished_only:
+            columns = finished_columns(columns, meta)
+        return matches_from_columns(columns)
+    except FileNotFoundError:
+        with open(json_fallback, 'r') as f:
+            events = json.load(f)
+        if finished_only:
+            events = [event for event in events if event.get('match_status') in FINAL_STATUSES]
+        return parse_events(events)
@@ -1,12 +1,255 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import product
+import numpy as np
 import pandas as pd
 import joblib
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, classification_report
+from sklearn.model_selection import train_test_split, TimeSeriesSplit
+from sklearn.metrics import accuracy_score, classification_report, log_loss
 
-def train_model():
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from atomic_write import atomic_open, atomic_path
+from flat_forest import FLAT_MODEL_PATH, export_flat_forest
+
+FEATURE_COLUMNS = ['form_home', 'form_away', 'standing_home', 'standing_away',
+                   'h2h_home_wins', 'h2h_away_wins']
+N_ESTIMATORS = 100
+MAX_DEPTH = 10
+MODEL_PATH = 'models/predictor.joblib'
+FEATURE_INFO_PATH = 'models/feature_info.joblib'
+# Best parameters from the last --tune run, used by later trainings
+TUNED_PARAMS_PATH = 'models/tuned_params.json'
+
+# Search space for --tune, tried in random order until the time budget runs out
+PARAM_GRID = {
+    'n_estimators': [50, 100, 200, 400],
+    'max_depth': [4, 6, 8, 10, 12, None],
+    'min_samples_leaf': [1, 2, 5, 10],
+}
+TUNE_BUDGET_SECONDS = float(os.getenv('TUNE_BUDGET_SECONDS', '300'))
+TUNE_SPLITS = 5
+
+# --incremental adds this share of the forest's trees per run, dropping the oldest past MAX_TREES
+INCREMENTAL_TREE_SHARE = 0.2
+MAX_TREES = int(os.getenv('MAX_TREES', '400'))
+
+def split_dataset(df: pd.DataFrame, feature_columns: list = FEATURE_COLUMNS):
+    """Stratified 80/20 train/test split of a features DataFrame"""
+    return train_test_split(df[feature_columns], df['result'], test_size=0.2, random_state=42, stratify=df['result'])
+
+def fit_model(X_train, y_train, n_estimators: int = N_ESTIMATORS, max_depth: int = MAX_DEPTH,
+              min_samples_leaf: int = 1, n_jobs: int = None):
+    """Fit the RandomForest classifier, no file IO"""
+    model = RandomForestClassifier(
+        n_estimators=n_estimators,
+        max_depth=max_depth,
+        min_samples_leaf=min_samples_leaf,
+        random_state=42,
+        n_jobs=n_jobs,
+        class_weight='balanced'  # Handle class imbalance
+    )
+    model.fit(X_train, y_train)
+    return model
+
+def load_params() -> dict:
+    """Tuned parameters if a --tune run saved some, else the defaults"""
+    params = {'n_estimators': N_ESTIMATORS, 'max_depth': MAX_DEPTH, 'min_samples_leaf': 1}
+    try:
+        with open(TUNED_PARAMS_PATH, 'r') as f:
+            params.update(json.load(f)['params'])
+        print(f"Using tuned parameters from {TUNED_PARAMS_PATH}: {params}")
+    except FileNotFoundError:
+        pass
+    return params
+
+def chronological(df: pd.DataFrame) -> pd.DataFrame:
+    """Rows in kickoff order (row order for feature files without match_date)"""
+    if 'match_date' not in df.columns:
+        print("⚠️ No match_date column; assuming rows are in kickoff order")
+        return df
+    return df.sort_values('match_date', kind='stable')
+
+# Cross-validation data, sent once to each tuning worker
+cv_data = {}
+
+def set_cv_data(X: np.ndarray, y: np.ndarray, splits: list):
+    cv_data.update(X=X, y=y, splits=splits)
+
+def score_params(params: dict) -> dict:
+    """Mean log loss and accuracy of params over the time-ordered CV splits (runs in a worker)"""
+    X, y = cv_data['X'], cv_data['y']
+    start = time.perf_counter()
+    losses, accuracies = [], []
+    for train_index, test_index in cv_data['splits']:
+        model = fit_model(pd.DataFrame(X[train_index], columns=FEATURE_COLUMNS), y[train_index], **params)
+        probabilities = model.predict_proba(pd.DataFrame(X[test_index], columns=FEATURE_COLUMNS))
+        losses.append(log_loss(y[test_index], probabilities, labels=model.classes_))
+        accuracies.append(accuracy_score(y[test_index], model.classes_[probabilities.argmax(axis=1)]))
+    return {'params': params, 'log_loss': float(np.mean(losses)), 'accuracy': float(np.mean(accuracies)),
+            'seconds': time.perf_counter() - start}
+
+def tune(df: pd.DataFrame, budget: float = TUNE_BUDGET_SECONDS, workers: int = None, splits: int = TUNE_SPLITS):
+    """Random search over PARAM_GRID with time-ordered CV on a process pool, within `budget` seconds
+
+    Each candidate is scored on TimeSeriesSplit folds (train on the past,
+    test on the next block) and ranked by mean log loss. Candidates running
+    when the budget ends are allowed to finish, and the first batch always
+    runs, even with a budget of 0.
+    """
+    workers = workers or os.cpu_count() or 1
+    df = chronological(df)
+    X = df[FEATURE_COLUMNS].to_numpy(dtype=float)
+    y = df['result'].to_numpy()
+    cv_splits = list(TimeSeriesSplit(n_splits=splits).split(X))
+
+    candidates = [dict(zip(PARAM_GRID, values)) for values in product(*PARAM_GRID.values())]
+    random.Random(42).shuffle(candidates)
+    print(f"Tuning: up to {len(candidates)} candidates x {splits} time-ordered folds, "
+          f"{workers} workers, {budget:.0f}s budget")
+
+    results = []
+    start = time.perf_counter()
+    deadline = start + budget
+    with ProcessPoolExecutor(max_workers=workers, initializer=set_cv_data, initargs=(X, y, cv_splits)) as pool:
+        pending = set()
+        submitted = 0
+        queue = iter(candidates)
+        while True:
+            # Keep every worker busy until the budget is spent
+            while len(pending) < workers and (submitted < workers or time.perf_counter() < deadline):
+                params = next(queue, None)
+                if params is None:
+                    break
+                pending.add(pool.submit(score_params, params))
+                submitted += 1
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            results.extend(future.result() for future in done)
+    wall = time.perf_counter() - start
+    if not results:
+        print("⚠️ No tuning candidates finished; training with the current parameters")
+        return None, results
+
+    results.sort(key=lambda r: r['log_loss'])
+    print(f"\n{'n_estimators':>12}{'max_depth':>10}{'min_leaf':>9}{'log loss':>10}{'accuracy':>10}{'fit s':>8}")
+    for r in results[:10]:
+        p = r['params']
+        print(f"{p['n_estimators']:>12}{str(p['max_depth']):>10}{p['min_samples_leaf']:>9}"
+              f"{r['log_loss']:>10.4f}{r['accuracy']:>10.3f}{r['seconds']:>8.2f}")
+
+    serial = sum(r['seconds'] for r in results)
+    print(f"\n⏱️ {len(results)}/{len(candidates)} candidates in {wall:.1f}s wall, {serial:.1f}s of fitting: "
+          f"{max(0.0, serial - wall):.1f}s saved over one core ({serial / wall if wall else 0:.1f}x)")
+
+    best = results[0]
+    with atomic_open(TUNED_PARAMS_PATH) as f:
+        json.dump({'params': best['params'], 'log_loss': best['log_loss'], 'accuracy': best['accuracy'],
+                   'candidates': len(results), 'splits': splits}, f, indent=2)
+    print(f"✅ Best parameters {best['params']} saved to {TUNED_PARAMS_PATH}")
+    return best['params'], results
+
+def save_model(model, feature_info: dict, X: np.ndarray, compress: int = 0):
+    """Save model, metadata and flat forest atomically, so a running bot never loads half a model"""
+    with atomic_path(MODEL_PATH) as tmp_path:
+        joblib.dump(model, tmp_path, compress=compress)
+    print(f"\nModel saved to {MODEL_PATH}")
+
+    with atomic_path(FEATURE_INFO_PATH) as tmp_path:
+        joblib.dump(feature_info, tmp_path)
+    print(f"Feature info saved to {FEATURE_INFO_PATH}")
+
+    # Flat array export for fast inference, verified against predict_proba
+    if isinstance(model, RandomForestClassifier):
+        export_flat_forest(model, feature_info['feature_columns'], FLAT_MODEL_PATH, X)
+        print(f"Flat forest saved to {FLAT_MODEL_PATH}")
+    elif os.path.exists(FLAT_MODEL_PATH):
+        # Other model types are served by predict_proba
+        os.remove(FLAT_MODEL_PATH)
+
+def held_out_split(df: pd.DataFrame, feature_info: dict, feature_columns: list = FEATURE_COLUMNS):
+    """The saved model's train/test split: its recorded test matches if known, else split_dataset()
+
+    Rows added since training (incremental runs, rebuilt features) land on the train side.
+    """
+    if 'match_id' not in df.columns or 'test_match_ids' not in feature_info:
+        return split_dataset(df, feature_columns)
+    test = df['match_id'].isin(set(feature_info['test_match_ids']))
+    return (df.loc[~test, feature_columns], df.loc[test, feature_columns],
+            df.loc[~test, 'result'], df.loc[test, 'result'])
+
+def train_incremental(df: pd.DataFrame, feature_columns: list = FEATURE_COLUMNS):
+    """Add warm-started trees for matches the saved model hasn't seen, keeping its test set held out
+
+    Returns None when there is no saved model to extend (train from scratch instead).
+    """
+    try:
+        model = joblib.load(MODEL_PATH)
+        feature_info = joblib.load(FEATURE_INFO_PATH)
+    except FileNotFoundError:
+        print("No saved model to extend; training from scratch")
+        return None
+    if not isinstance(model, RandomForestClassifier):
+        print(f"Saved model is a {type(model).__name__}, not a forest; training from scratch")
+        return None
+    if 'match_id' not in df.columns or 'test_match_ids' not in feature_info:
+        print("Saved model has no match bookkeeping; training from scratch")
+        return None
+
+    test_ids = set(feature_info['test_match_ids'])
+    seen = set(feature_info['train_match_ids']) | test_ids
+    new_rows = ~df['match_id'].isin(seen)
+    if not new_rows.any():
+        print("No new matches since the last training")
+        return model, feature_columns
+
+    # New matches train; the original test set stays unseen by every tree
+    X_train, X_test, y_train, y_test = held_out_split(df, feature_info, feature_columns)
+
+    trees = len(model.estimators_)
+    added = max(1, round(trees * INCREMENTAL_TREE_SHARE))
+    print(f"{new_rows.sum()} new matches: adding {added} trees to the {trees}-tree forest")
+
+    start = time.perf_counter()
+    model.set_params(warm_start=True, n_estimators=trees + added, n_jobs=-1)
+    with warnings.catch_warnings():
+        # Balanced class weights are computed on the whole training set, as for a full fit
+        warnings.filterwarnings('ignore', message='class_weight presets')
+        model.fit(X_train, y_train)
+    seconds = time.perf_counter() - start
+    if len(model.estimators_) > MAX_TREES:
+        # Oldest trees go first, so old data ages out of the forest
+        model.estimators_ = model.estimators_[-MAX_TREES:]
+    model.set_params(warm_start=False, n_estimators=len(model.estimators_), n_jobs=None)
+
+    # A full refit grows every tree on the same data, so it costs about trees / added as much
+    full_estimate = seconds * len(model.estimators_) / added
+    print(f"⏱️ Warm start took {seconds:.2f}s; a full refit of {len(model.estimators_)} trees "
+          f"would take ~{full_estimate:.2f}s (~{full_estimate - seconds:.2f}s saved)")
+
+    accuracy = accuracy_score(y_test, model.predict(X_test))
+    print(f"Accuracy on the held-out test set: {accuracy:.3f} (was {feature_info.get('accuracy', float('nan')):.3f})")
+
+    feature_info.update(
+        accuracy=accuracy,
+        n_estimators=len(model.estimators_),
+        train_match_ids=sorted(set(feature_info['train_match_ids']) | set(df.loc[new_rows, 'match_id'].tolist())),
+        train_seconds=seconds,
+    )
+    save_model(model, feature_info, df[feature_columns].to_numpy())
+    return model, feature_columns
+
+def train_model(tune_budget: float = None, incremental: bool = False, workers: int = None):
     """Train RandomForest classifier on match features"""
-    
+
     # Load features
     try:
         df = pd.read_csv('data_pipeline/features.csv')
@@ -14,73 +257,79 @@ def train_model():
     except FileNotFoundError:
         print("Error: features.csv not found. Run build_features.py first.")
         return
-    
+
+    if incremental:
+        trained = train_incremental(df)
+        if trained is not None:
+            return trained
+    if tune_budget is not None:
+        tune(df, tune_budget, workers)
+    params = load_params()
+
     # Prepare features and target
-    feature_columns = ['form_home', 'form_away', 'standing_home', 'standing_away', 
-                      'h2h_home_wins', 'h2h_away_wins']
-    
+    feature_columns = FEATURE_COLUMNS
+
     X = df[feature_columns]
     y = df['result']
-    
+
     print(f"Feature matrix shape: {X.shape}")
     print(f"Target distribution: {y.value_counts()}")
-    
+
     # Split data into train/test sets
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
-    )
-    
+    X_train, X_test, y_train, y_test = split_dataset(df, feature_columns)
+
     print(f"Training set: {X_train.shape[0]} samples")
     print(f"Test set: {X_test.shape[0]} samples")
-    
-    # Train RandomForest classifier
-    model = RandomForestClassifier(
-        n_estimators=100,
-        max_depth=10,
-        random_state=42,
-        class_weight='balanced'  # Handle class imbalance
-    )
-    
+
     print("Training RandomForest classifier...")
-    model.fit(X_train, y_train)
-    
+    # Trees are grown on every core; the forest is the same as a single-core fit
+    start = time.perf_counter()
+    model = fit_model(X_train, y_train, n_jobs=-1, **params)
+    train_seconds = time.perf_counter() - start
+    print(f"Trained in {train_seconds:.2f}s")
+
     # Evaluate model
     y_pred = model.predict(X_test)
     accuracy = accuracy_score(y_test, y_pred)
-    
+
     print(f"\nModel Performance:")
     print(f"Accuracy: {accuracy:.3f}")
     print("\nClassification Report:")
-    print(classification_report(y_test, y_pred, 
+    print(classification_report(y_test, y_pred,
                               target_names=['Away Win', 'Draw', 'Home Win']))
-    
+
     # Feature importance
     feature_importance = pd.DataFrame({
         'feature': feature_columns,
         'importance': model.feature_importances_
     }).sort_values('importance', ascending=False)
-    
+
     print("\nFeature Importance:")
     print(feature_importance)
-    
-    # Save model and metadata
-    model_path = 'models/predictor.joblib'
-    joblib.dump(model, model_path)
-    print(f"\nModel saved to {model_path}")
-    
+
     # Save feature info for later use
     feature_info = {
         'feature_columns': feature_columns,
         'model_type': 'RandomForestClassifier',
         'accuracy': accuracy,
-        'n_estimators': 100,
-        'max_depth': 10
+        **params,
+        'train_seconds': train_seconds,
     }
-    
-    joblib.dump(feature_info, 'models/feature_info.joblib')
-    print("Feature info saved to models/feature_info.joblib")
-    
+    if 'match_id' in df.columns:
+        # Lets --incremental tell new matches apart and keep the test set held out
+        feature_info['train_match_ids'] = sorted(df.loc[X_train.index, 'match_id'].tolist())
+        feature_info['test_match_ids'] = sorted(df.loc[X_test.index, 'match_id'].tolist())
+
+    save_model(model, feature_info, X.to_numpy())
     return model, feature_columns
 
 if __name__ == "__main__":
-    train_model()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Train the match outcome model")
+    parser.add_argument('--tune', action='store_true',
+                        help="search hyperparameters with time-ordered CV on all cores before training")
+    parser.add_argument('--budget', type=float, default=TUNE_BUDGET_SECONDS, help="tuning time budget in seconds")
+    parser.add_argument('--workers', type=int, default=None, help="tuning worker processes (default: all CPUs)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="add warm-started trees for new matches instead of refitting the whole forest")
+    args = parser.parse_args()
+    train_model(args.budget if args.tune else None, args.incremental, args.workers)
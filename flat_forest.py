@@ -0,0 +1,163 @@
+"""
+Flattened array export of a scikit-learn forest with a pure-NumPy evaluator
+All trees are packed into shared node arrays, so inference skips pandas and
+sklearn input validation and the file loads without unpickling estimators
+
+    python flat_forest.py   # export models/predictor.joblib to models/predictor_flat.npz
+"""
+
+import os
+import sys
+import time
+import numpy as np
+from atomic_write import atomic_open
+
+FLAT_MODEL_PATH = 'models/predictor_flat.npz'
+
+
+class FlatForest:
+    """Forest of decision trees stored as flat node arrays"""
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, left: np.ndarray,
+                 right: np.ndarray, value: np.ndarray, roots: np.ndarray, max_depth: int,
+                 classes: np.ndarray, feature_columns: list):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.classes_ = classes
+        self.feature_columns = list(feature_columns)
+
+    @classmethod
+    def from_sklearn(cls, model, feature_columns: list):
+        """Pack every tree of a fitted RandomForestClassifier (or single tree)"""
+        estimators = getattr(model, 'estimators_', [model])
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        for estimator in estimators:
+            tree = estimator.tree_
+            nodes = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+
+            # Leaves point at themselves so every tree can take max_depth steps
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+            lefts.append(np.where(is_leaf, nodes, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, nodes, tree.children_right) + offset)
+
+            # Per-node class fractions; sklearn < 1.4 stored raw counts that
+            # predict_proba normalised, newer versions store the fractions
+            value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = value.sum(axis=1, keepdims=True)
+            if not np.allclose(normalizer, 1.0):
+                normalizer[normalizer == 0.0] = 1.0
+                value = value / normalizer
+            values.append(value)
+
+            roots.append(offset)
+            offset += tree.node_count
+
+        return cls(
+            np.concatenate(features).astype(np.intp),
+            np.concatenate(thresholds),
+            np.concatenate(lefts).astype(np.intp),
+            np.concatenate(rights).astype(np.intp),
+            np.concatenate(values),
+            np.array(roots, dtype=np.intp),
+            max(estimator.tree_.max_depth for estimator in estimators),
+            np.asarray(model.classes_),
+            feature_columns,
+        )
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Class probabilities for a (n_samples, n_features) matrix, as predict_proba"""
+        # sklearn trees compare float32 inputs against float64 thresholds
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        samples = np.arange(len(X))
+
+        # Walk every tree for every sample at once, one level per step
+        nodes = np.repeat(self.roots[:, None], len(X), axis=1)
+        for _ in range(self.max_depth):
+            go_left = X[samples, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        # Accumulate tree by tree, in the same order as sklearn, for identical sums
+        probabilities = np.zeros((len(X), self.value.shape[1]))
+        for tree_nodes in nodes:
+            probabilities += self.value[tree_nodes]
+        return probabilities / self.n_trees
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    def save(self, path: str = FLAT_MODEL_PATH):
+        with atomic_open(path, 'wb') as f:
+            np.savez(f, feature=self.feature, threshold=self.threshold, left=self.left,
+                     right=self.right, value=self.value, roots=self.roots,
+                     max_depth=np.array(self.max_depth), classes=self.classes_,
+                     feature_columns=np.array(self.feature_columns))
+
+    @classmethod
+    def load(cls, path: str = FLAT_MODEL_PATH):
+        with np.load(path) as data:
+            return cls(data['feature'], data['threshold'], data['left'], data['right'],
+                       data['value'], data['roots'], int(data['max_depth']),
+                       data['classes'], data['feature_columns'].tolist())
+
+
+def load_or_build(model, feature_columns: list, path: str = FLAT_MODEL_PATH,
+                  model_path: str = 'models/predictor.joblib'):
+    """Flat forest for a loaded model: the exported file if it is current, else built in memory
+
+    Returns None for models that aren't tree ensembles.
+    """
+    try:
+        if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(model_path):
+            flat = FlatForest.load(path)
+            if flat.feature_columns == list(feature_columns) and flat.n_trees == len(model.estimators_):
+                return flat
+        return FlatForest.from_sklearn(model, feature_columns)
+    except (AttributeError, OSError, KeyError):
+        return None
+
+
+def check_parity(model, flat: FlatForest, X) -> float:
+    """Largest absolute difference between the flat forest and model.predict_proba"""
+    import pandas as pd
+    expected = model.predict_proba(pd.DataFrame(np.asarray(X), columns=flat.feature_columns))
+    return float(np.abs(expected - flat.predict_proba(X)).max())
+
+
+def export_flat_forest(model, feature_columns: list, path: str = FLAT_MODEL_PATH, X=None) -> FlatForest:
+    """Export a fitted forest, refusing to save if it disagrees with the model on X"""
+    flat = FlatForest.from_sklearn(model, feature_columns)
+    if X is not None:
+        difference = check_parity(model, flat, X)
+        if difference != 0.0:
+            raise ValueError(f"Flat forest differs from predict_proba by {difference:.2e}")
+    flat.save(path)
+    return flat
+
+
+if __name__ == "__main__":
+    import joblib
+
+    model_path = sys.argv[1] if len(sys.argv) > 1 else 'models/predictor.joblib'
+    feature_columns = joblib.load('models/feature_info.joblib')['feature_columns']
+    model = joblib.load(model_path)
+
+    # Random in-range rows to verify the export before saving it
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.integers(0, 21, 5000) for _ in feature_columns]).astype(float)
+
+    start = time.perf_counter()
+    flat = export_flat_forest(model, feature_columns, FLAT_MODEL_PATH, X)
+    print(f"✅ Exported {flat.n_trees} trees ({len(flat.feature):,} nodes) to {FLAT_MODEL_PATH} "
+          f"in {time.perf_counter() - start:.2f}s, identical to predict_proba on {len(X)} rows")
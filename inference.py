@@ -0,0 +1,123 @@
+import asyncio
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+# Requests arriving within this window are predicted in one model call
+INFERENCE_WINDOW_MS = float(os.getenv('INFERENCE_WINDOW_MS', '5'))
+INFERENCE_MAX_BATCH = int(os.getenv('INFERENCE_MAX_BATCH', '64'))
+
+
+class BatchPredictor:
+    """Runs inference on a worker thread, micro-batching concurrent requests
+
+    `predict_fn` takes a list of feature rows and returns one result per row.
+    It runs off the event loop, so a burst of predictions never blocks
+    discord.py heartbeats or other commands.
+    """
+
+    def __init__(self, predict_fn, window_ms: float = INFERENCE_WINDOW_MS,
+                 max_batch: int = INFERENCE_MAX_BATCH):
+        self.predict_fn = predict_fn
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.queue = None
+        self.executor = None
+        self.task = None
+
+        # Tuning metrics
+        self.requests = 0
+        self.batches = 0
+        self.batch_sizes = Counter()
+        self.max_queue_depth = 0
+        self.inference_seconds = 0.0
+
+    async def start(self):
+        """Start the batching task (idempotent)"""
+        if self.task is None or self.task.done():
+            self.queue = asyncio.Queue()
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='inference')
+            self.task = asyncio.create_task(self._run())
+        return self
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+    async def predict(self, row):
+        """Queue one feature row and wait for its batched result"""
+        await self.start()
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((row, future))
+        self.requests += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+        return await future
+
+    async def predict_many(self, rows: list) -> list:
+        return list(await asyncio.gather(*(self.predict(row) for row in rows)))
+
+    async def _collect(self) -> list:
+        """Wait for a first request, then gather more until the window closes"""
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.window
+        while len(batch) < self.max_batch:
+            if not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            # Drop requests whose caller has gone away
+            batch = [(row, future) for row, future in batch if not future.done()]
+            if not batch:
+                continue
+
+            start = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(self.executor, self.predict_fn, [row for row, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            finally:
+                self.inference_seconds += time.perf_counter() - start
+                self.batches += 1
+                self.batch_sizes[len(batch)] += 1
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            'requests': self.requests,
+            'batches': self.batches,
+            'mean_batch_size': (sum(size * count for size, count in self.batch_sizes.items()) / self.batches
+                                if self.batches else 0.0),
+            'max_batch_size': max(self.batch_sizes, default=0),
+            'batch_sizes': dict(sorted(self.batch_sizes.items())),
+            'queue_depth': self.queue.qsize() if self.queue is not None else 0,
+            'max_queue_depth': self.max_queue_depth,
+            'inference_seconds': self.inference_seconds,
+        }
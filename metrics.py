@@ -0,0 +1,133 @@
+"""
+In-process counters and latency histograms for the bot
+Percentiles come from a window of recent samples; Prometheus output uses
+cumulative buckets and can be written as a textfile for a local scraper
+(node_exporter's textfile collector, or anything that reads the format)
+"""
+
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from atomic_write import atomic_open
+
+# Latency buckets in seconds, Prometheus-style upper bounds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Recent samples kept per histogram for percentiles
+PERCENTILE_WINDOW = 2048
+
+
+class Histogram:
+    """Bucketed latency distribution plus a window of recent samples"""
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS, window: int = PERCENTILE_WINDOW):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+
+    def percentiles(self, quantiles=(0.5, 0.95, 0.99)) -> dict:
+        """Nearest-rank percentiles over the recent window"""
+        samples = sorted(self.recent)
+        if not samples:
+            return {q: 0.0 for q in quantiles}
+        return {q: samples[min(len(samples) - 1, max(0, int(round(q * len(samples))) - 1))] for q in quantiles}
+
+
+def label_key(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(key: tuple, extra: tuple = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{escape_label(v)}"' for k, v in pairs) + '}'
+
+
+class Metrics:
+    """Registry of labelled counters and histograms"""
+
+    def __init__(self, prefix: str = 'football_bot'):
+        self.prefix = prefix
+        self.counters = {}    # name -> {label_key: value}
+        self.histograms = {}  # name -> {label_key: Histogram}
+        self.started = time.time()
+
+    def inc(self, name: str, value: float = 1, **labels):
+        series = self.counters.setdefault(name, {})
+        key = label_key(labels)
+        series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels):
+        series = self.histograms.setdefault(name, {})
+        key = label_key(labels)
+        if key not in series:
+            series[key] = Histogram()
+        series[key].observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Observe the duration of the with-block, even if it raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def summary(self, name: str) -> list:
+        """(labels, count, p50, p95, p99) per series of a histogram, busiest first"""
+        rows = []
+        for key, histogram in self.histograms.get(name, {}).items():
+            p = histogram.percentiles()
+            rows.append((dict(key), histogram.count, p[0.5], p[0.95], p[0.99]))
+        return sorted(rows, key=lambda row: -row[1])
+
+    def render(self, gauges: dict = None) -> str:
+        """Prometheus text exposition of all metrics plus point-in-time gauges
+
+        `gauges` maps a name to a number or to {label dict as tuple: number}.
+        """
+        lines = []
+        for name, series in sorted(self.counters.items()):
+            full = f"{self.prefix}_{name}"
+            lines.append(f"# TYPE {full} counter")
+            for key, value in sorted(series.items()):
+                lines.append(f"{full}{format_labels(key)} {value}")
+
+        for name, series in sorted(self.histograms.items()):
+            full = f"{self.prefix}_{name}"
+            lines.append(f"# TYPE {full} histogram")
+            for key, histogram in sorted(series.items()):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + (float('inf'),), histogram.counts):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else f"{bound:g}"
+                    lines.append(f"{full}_bucket{format_labels(key, (('le', le),))} {cumulative}")
+                lines.append(f"{full}_sum{format_labels(key)} {histogram.sum}")
+                lines.append(f"{full}_count{format_labels(key)} {histogram.count}")
+
+        gauges = {'uptime_seconds': time.time() - self.started, **(gauges or {})}
+        for name, value in sorted(gauges.items()):
+            full = f"{self.prefix}_{name}"
+            lines.append(f"# TYPE {full} gauge")
+            series = value if isinstance(value, dict) else {(): value}
+            for key, number in sorted(series.items()):
+                lines.append(f"{full}{format_labels(key)} {float(number)}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str, gauges: dict = None):
+        """Write the exposition atomically so a scraper never reads half a file"""
+        with atomic_open(path) as f:
+            f.write(self.render(gauges))
@@ -0,0 +1,106 @@
+import os
+import time
+import warnings
+
+# numpy, pandas, joblib and sklearn are imported inside the functions that
+# need them, so importing this module (and bot.py) stays cheap and the ML
+# stack loads on the background model-loading thread instead
+
+MODEL_PATH = 'models/predictor.joblib'
+FEATURE_INFO_PATH = 'models/feature_info.joblib'
+EXPECTED_CLASSES = [-1, 0, 1]
+
+
+class ModelBundle:
+    """Everything inference needs from one model version, swapped in as a unit"""
+
+    def __init__(self, model, feature_info: dict, flat_forest=None, proba_table=None,
+                 version=None, load_seconds: float = 0.0):
+        self.model = model
+        self.feature_info = feature_info
+        self.feature_columns = feature_info['feature_columns']
+        self.flat_forest = flat_forest
+        self.proba_table = proba_table
+        self.version = version
+        self.load_seconds = load_seconds
+
+    @property
+    def classes(self):
+        return self.model.classes_
+
+    def predict_proba(self, X):
+        """Model probabilities for a feature matrix, via the flat forest when available"""
+        if self.flat_forest is not None:
+            return self.flat_forest.predict_proba(X)
+        import pandas as pd
+        return self.model.predict_proba(pd.DataFrame(X, columns=self.feature_columns))
+
+
+def model_version(model_path: str = MODEL_PATH, info_path: str = FEATURE_INFO_PATH):
+    """Fingerprint of the model files on disk (None if either is missing)"""
+    try:
+        return tuple((os.stat(path).st_mtime_ns, os.stat(path).st_size) for path in (model_path, info_path))
+    except FileNotFoundError:
+        return None
+
+
+def validate_bundle(bundle: ModelBundle):
+    """Raise ValueError unless the bundle can serve predictions"""
+    import numpy as np
+    model, feature_columns = bundle.model, bundle.feature_columns
+    if not hasattr(model, 'predict_proba'):
+        raise ValueError("model has no predict_proba")
+    if list(model.classes_) != EXPECTED_CLASSES:
+        raise ValueError(f"unexpected classes {list(model.classes_)}")
+    if getattr(model, 'n_features_in_', len(feature_columns)) != len(feature_columns):
+        raise ValueError(f"model expects {model.n_features_in_} features, feature info lists {len(feature_columns)}")
+
+    # Probe a few typical rows end to end
+    probe = np.array([[2, 2, 10, 10, 1, 1], [5, 0, 1, 20, 3, 0], [0, 5, 20, 1, 0, 3]], dtype=float)
+    probabilities = bundle.predict_proba(probe[:, :len(feature_columns)])
+    if not np.all(np.isfinite(probabilities)) or not np.allclose(probabilities.sum(axis=1), 1.0):
+        raise ValueError("model returned invalid probabilities")
+
+
+def load_bundle(build_table: bool = False, model_path: str = MODEL_PATH,
+                info_path: str = FEATURE_INFO_PATH, timings: dict = None) -> ModelBundle:
+    """Load, prepare and validate a model version; safe to run on a worker thread
+
+    Raises FileNotFoundError if the model files are missing and ValueError if
+    they fail validation. Pass a dict as `timings` to get seconds per stage.
+    """
+    timings = {} if timings is None else timings
+    start = stage_start = time.perf_counter()
+
+    def stage(name):
+        nonlocal stage_start
+        now = time.perf_counter()
+        timings[name] = now - stage_start
+        stage_start = now
+
+    import joblib
+    import flat_forest as flat_forest_module
+    stage('import joblib/numpy')
+
+    version = model_version(model_path, info_path)
+    # Memory-map the numpy arrays inside the pickle instead of copying them
+    with warnings.catch_warnings():
+        # Compressed models (compress_model.py) are small and load without the map
+        warnings.filterwarnings('ignore', message='mmap_mode')
+        model = joblib.load(model_path, mmap_mode='r')
+    stage('load model (imports sklearn)')
+    feature_info = joblib.load(info_path)
+    stage('load feature info')
+
+    bundle = ModelBundle(model, feature_info, version=version)
+    bundle.flat_forest = flat_forest_module.load_or_build(model, bundle.feature_columns, model_path=model_path)
+    stage('flat forest')
+    validate_bundle(bundle)
+    stage('validate')
+
+    if build_table:
+        from prob_table import ProbabilityTable
+        bundle.proba_table = ProbabilityTable.build(bundle.flat_forest or model, bundle.feature_columns)
+        stage('probability table (imports pandas)')
+    bundle.load_seconds = time.perf_counter() - start
+    return bundle
@@ -0,0 +1,72 @@
+import time
+import numpy as np
+from data_pipeline.feature_store import FORM_WINDOW
+
+# Inclusive value range enumerated for each feature
+DEFAULT_RANGES = {
+    'form_home': (0, FORM_WINDOW),
+    'form_away': (0, FORM_WINDOW),
+    'standing_home': (1, 20),
+    'standing_away': (1, 20),
+    'h2h_home_wins': (0, 5),
+    'h2h_away_wins': (0, 5),
+}
+
+
+class ProbabilityTable:
+    """Dense table of model probabilities over every in-range feature combination"""
+
+    def __init__(self, table: np.ndarray, lows: np.ndarray, classes: np.ndarray,
+                 feature_columns: list, build_seconds: float = 0.0):
+        self.table = table
+        self.lows = lows
+        self.highs = lows + np.array(table.shape[:-1]) - 1
+        self.classes = classes
+        self.feature_columns = feature_columns
+        self.build_seconds = build_seconds
+
+    @classmethod
+    def build(cls, model, feature_columns: list, ranges: dict = None, batch_size: int = 100000):
+        """Evaluate the model once across the full feature grid"""
+        import pandas as pd
+        ranges = {**DEFAULT_RANGES, **(ranges or {})}
+        start = time.perf_counter()
+        lows = np.array([ranges[col][0] for col in feature_columns])
+        shape = tuple(ranges[col][1] - ranges[col][0] + 1 for col in feature_columns)
+
+        # Every grid cell in C order, so a flat index maps straight back to the table
+        grid = np.indices(shape).reshape(len(shape), -1).T + lows
+        probabilities = np.empty((len(grid), len(model.classes_)), dtype=np.float32)
+        for offset in range(0, len(grid), batch_size):
+            chunk = pd.DataFrame(grid[offset:offset + batch_size], columns=feature_columns)
+            probabilities[offset:offset + batch_size] = model.predict_proba(chunk)
+
+        table = probabilities.reshape(shape + (len(model.classes_),))
+        return cls(table, lows, model.classes_, feature_columns, time.perf_counter() - start)
+
+    @property
+    def nbytes(self) -> int:
+        return self.table.nbytes
+
+    def lookup(self, row: dict):
+        """Probabilities for one feature row, or None if any value is off the grid"""
+        index = []
+        for col, low, high in zip(self.feature_columns, self.lows, self.highs):
+            value = row[col]
+            if value != int(value) or not low <= value <= high:
+                return None
+            index.append(int(value) - low)
+        return self.table[tuple(index)]
+
+    def lookup_batch(self, X: np.ndarray):
+        """Probabilities for a feature matrix plus a mask of rows that were on the grid
+
+        Rows off the grid get zero probabilities and should go to the model.
+        """
+        X = np.asarray(X)
+        in_range = np.all((X >= self.lows) & (X <= self.highs) & (X == np.floor(X)), axis=1)
+        probabilities = np.zeros((len(X), len(self.classes)), dtype=self.table.dtype)
+        if in_range.any():
+            index = (X[in_range] - self.lows).astype(np.intp)
+            probabilities[in_range] = self.table[tuple(index.T)]
+        return probabilities, in_range
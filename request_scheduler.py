@@ -0,0 +1,198 @@
+"""
+Central scheduler for API-Football requests
+Requests wait for one of a few in-flight slots, highest priority first
+(interactive commands, then prefetch, then pipeline backfill). Each request
+spends one unit of a daily quota that is counted in SQLite, so the bot and
+pipeline runs draw from the same budget. Lower priorities stop early to leave
+the rest of the quota for higher ones, and a 429 pauses every request with a
+backoff that grows while the API keeps refusing.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from response_store import RESPONSE_STORE_PATH
+
+INTERACTIVE, PREFETCH, BACKFILL = 0, 1, 2
+PRIORITY_NAMES = {INTERACTIVE: 'interactive', PREFETCH: 'prefetch', BACKFILL: 'backfill'}
+
+# Requests per UTC day allowed by the API plan (free tier: 100)
+API_DAILY_QUOTA = int(os.getenv('API_DAILY_QUOTA', '100'))
+# Share of the daily quota each priority leaves untouched for the ones above it
+QUOTA_RESERVE = {
+    INTERACTIVE: 0.0,
+    PREFETCH: float(os.getenv('API_PREFETCH_RESERVE', '0.2')),
+    BACKFILL: float(os.getenv('API_BACKFILL_RESERVE', '0.4')),
+}
+API_MAX_IN_FLIGHT = int(os.getenv('API_MAX_IN_FLIGHT', '4'))
+# Shared pause after a 429, doubled on each further 429 and halved on success
+RATE_LIMIT_PAUSE = float(os.getenv('API_RATE_LIMIT_PAUSE', '2'))
+RATE_LIMIT_MAX_PAUSE = float(os.getenv('API_RATE_LIMIT_MAX_PAUSE', '120'))
+
+# Priority of the requests made by the current task; tasks inherit it from their creator
+current_priority = contextvars.ContextVar('api_priority', default=INTERACTIVE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS api_quota (
+    day TEXT PRIMARY KEY,
+    used INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+
+class QuotaExceeded(Exception):
+    """Raised when a request's priority has no daily quota left"""
+
+
+def utc_day() -> str:
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+class RequestScheduler:
+    """Priority admission, daily quota and shared 429 backoff for API requests"""
+
+    def __init__(self, daily_quota: int = API_DAILY_QUOTA, reserve: dict = None,
+                 max_in_flight: int = API_MAX_IN_FLIGHT, path: str = RESPONSE_STORE_PATH,
+                 clock=time.monotonic, day=utc_day):
+        self.daily_quota = daily_quota
+        self.reserve = QUOTA_RESERVE if reserve is None else reserve
+        self.max_in_flight = max_in_flight
+        self.path = path
+        self.clock = clock
+        self.day = day
+        self.conn = None
+        # take_quota runs in a worker thread (see acquire) and shares the connection
+        self.lock = threading.RLock()
+
+        self.in_flight = 0
+        self.waiters = []  # heap of (priority, sequence, future)
+        self.sequence = itertools.count()
+        self.pause = 0.0
+        self.paused_until = 0.0
+
+        # Usage counters per priority
+        self.sent = {priority: 0 for priority in PRIORITY_NAMES}
+        self.rejected = {priority: 0 for priority in PRIORITY_NAMES}
+        self.wait_seconds = {priority: 0.0 for priority in PRIORITY_NAMES}
+        self.rate_limited = 0
+
+    def connect(self):
+        """Open the quota table on first use (idempotent)"""
+        with self.lock:
+            if self.conn is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self.conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+                self.conn.execute("PRAGMA journal_mode=WAL")
+                self.conn.execute(SCHEMA)
+            return self.conn
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+    def limit_for(self, priority: int) -> int:
+        """Requests per day this priority may use, counting everyone's usage"""
+        return int(self.daily_quota * (1 - self.reserve.get(priority, 0.0)))
+
+    def used_today(self) -> int:
+        with self.lock:
+            row = self.connect().execute("SELECT used FROM api_quota WHERE day = ?", (self.day(),)).fetchone()
+        return row[0] if row else 0
+
+    def quota_left(self, priority: int = INTERACTIVE) -> int:
+        return max(0, self.limit_for(priority) - self.used_today())
+
+    def take_quota(self, priority: int) -> bool:
+        """Atomically spend one request if the priority's limit allows it"""
+        day = self.day()
+        with self.lock:
+            conn = self.connect()
+            conn.execute("INSERT OR IGNORE INTO api_quota (day, used) VALUES (?, 0)", (day,))
+            cursor = conn.execute("UPDATE api_quota SET used = used + 1 WHERE day = ? AND used < ?",
+                                  (day, self.limit_for(priority)))
+            return cursor.rowcount == 1
+
+    async def acquire(self, priority: int = None):
+        """Wait for an in-flight slot and spend quota; raises QuotaExceeded"""
+        priority = current_priority.get() if priority is None else priority
+        start = self.clock()
+        if self.in_flight < self.max_in_flight and not self.waiters:
+            self.in_flight += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self.waiters, (priority, next(self.sequence), future))
+            try:
+                await future
+            except asyncio.CancelledError:
+                # The slot may have been handed over just before cancellation
+                if future.done() and not future.cancelled():
+                    self.release()
+                raise
+
+        try:
+            # Every request sits out a 429 pause, whatever its priority
+            while self.clock() < self.paused_until:
+                await asyncio.sleep(self.paused_until - self.clock())
+        except asyncio.CancelledError:
+            self.release()
+            raise
+        self.wait_seconds[priority] += self.clock() - start
+
+        # Quota is spent in priority order, as slots are handed out. The SQLite write
+        # can wait on another process's lock, so it runs off the event loop
+        try:
+            taken = await asyncio.to_thread(self.take_quota, priority)
+        except BaseException:
+            self.release()
+            raise
+        if not taken:
+            self.rejected[priority] += 1
+            self.release()
+            raise QuotaExceeded(f"daily API quota reached for {PRIORITY_NAMES.get(priority, priority)} requests")
+        self.sent[priority] += 1
+
+    def release(self):
+        """Hand the slot to the highest-priority waiter, or free it"""
+        while self.waiters:
+            _, _, future = heapq.heappop(self.waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def record(self, status, retry_after=None):
+        """Adapt the shared pause to the API's response"""
+        if status == 429:
+            self.rate_limited += 1
+            self.pause = min(RATE_LIMIT_MAX_PAUSE, max(RATE_LIMIT_PAUSE, self.pause * 2))
+            if retry_after is not None and str(retry_after).isdigit():
+                self.pause = min(RATE_LIMIT_MAX_PAUSE, max(self.pause, float(retry_after)))
+            self.paused_until = max(self.paused_until, self.clock() + self.pause)
+        elif status is not None and status < 500:
+            self.pause = self.pause / 2 if self.pause > RATE_LIMIT_PAUSE / 8 else 0.0
+
+    def stats(self) -> dict:
+        used = self.used_today()
+        return {
+            'day': self.day(),
+            'daily_quota': self.daily_quota,
+            'used_today': used,
+            'remaining': {PRIORITY_NAMES[p]: max(0, self.limit_for(p) - used) for p in PRIORITY_NAMES},
+            'sent': {PRIORITY_NAMES[p]: count for p, count in self.sent.items()},
+            'rejected': {PRIORITY_NAMES[p]: count for p, count in self.rejected.items()},
+            'wait_seconds': {PRIORITY_NAMES[p]: seconds for p, seconds in self.wait_seconds.items()},
+            'in_flight': self.in_flight,
+            'queued': len(self.waiters),
+            'rate_limited': self.rate_limited,
+            'pause_seconds': self.pause,
+        }
@@ -0,0 +1,99 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+# Seconds each endpoint's responses stay fresh
+CACHE_TTLS = {
+    'get_standings': 3600,
+    'get_events': 300,
+    'get_H2H': 1800,
+}
+DEFAULT_TTL = 300
+
+
+def cache_key(params: dict) -> tuple:
+    """Build a cache key from endpoint params, leaving out the API key"""
+    return tuple(sorted((k, str(v)) for k, v in params.items() if k != 'APIkey'))
+
+
+class ResponseCache:
+    """Bounded TTL/LRU cache that coalesces concurrent lookups of the same key"""
+
+    def __init__(self, max_entries: int = 512, ttls: dict = None, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttls = CACHE_TTLS if ttls is None else ttls
+        self.clock = clock
+        self.entries = OrderedDict()  # key -> (expires_at, value)
+        self.inflight = {}            # key -> fetch Task shared by all waiters
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def ttl_for(self, endpoint: str) -> float:
+        return self.ttls.get(endpoint, DEFAULT_TTL)
+
+    def get(self, key):
+        """Return a fresh cached value or None, refreshing its LRU position"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value, ttl: float):
+        self.entries[key] = (self.clock() + ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_fetch(self, params: dict, fetch):
+        """Return the cached response for params, calling fetch() at most once per key"""
+        key = cache_key(params)
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        pending = self.inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        # The fetch runs in its own task, so cancelling any one caller (the first
+        # included) doesn't cancel it for the others
+        task = asyncio.ensure_future(self._fetch(key, params, fetch))
+        self.inflight[key] = task
+        # Mark failures retrieved even if every waiter was cancelled, so they don't log warnings
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key, params: dict, fetch):
+        try:
+            value = await fetch()
+            # Failed lookups (None) are shared with waiters but never cached
+            if value is not None:
+                self.put(key, value, self.ttl_for(params.get('action', '')))
+            return value
+        finally:
+            del self.inflight[key]
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'evictions': self.evictions,
+            'hit_rate': (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,149 @@
+"""
+Persistent SQLite store of API responses, shared by the bot and the data pipeline
+Responses stay fresh for a per-endpoint age; date-range event lists that
+only contain finished matches never change and are kept forever. With
+API_OFFLINE=1 every request is answered from the store without the network.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+from response_cache import cache_key
+
+RESPONSE_STORE_PATH = os.getenv('RESPONSE_STORE_PATH', 'data_pipeline/api_responses.sqlite3')
+# Replay stored responses only, never calling the API
+API_OFFLINE = os.getenv('API_OFFLINE', '0') == '1'
+
+# Seconds a stored response is served without refetching
+STORE_MAX_AGE = {
+    'get_standings': 6 * 3600,
+    'get_events': 3600,
+    'get_H2H': 12 * 3600,
+}
+DEFAULT_MAX_AGE = 3600
+# Expired, mutable responses are deleted after this long (still served while the API is down)
+STORE_RETENTION = 30 * 24 * 3600
+
+# Statuses after which a match's data no longer changes
+FINAL_STATUSES = {'Finished', 'After ET', 'After Pen.', 'Cancelled', 'Postponed', 'Awarded'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    action TEXT NOT NULL,
+    body TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    immutable INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+
+def is_immutable(params: dict, data) -> bool:
+    """True for a past date range of events in which every match is final"""
+    if params.get('action') != 'get_events' or 'team_id' in params or not isinstance(data, list):
+        return False
+    end = str(params.get('to', ''))
+    if not end or end >= date.today().isoformat():
+        return False
+    return all(event.get('match_status') in FINAL_STATUSES for event in data)
+
+
+class ResponseStore:
+    """On-disk response cache in WAL mode, so several processes can share it"""
+
+    def __init__(self, path: str = RESPONSE_STORE_PATH, offline: bool = API_OFFLINE,
+                 max_age: dict = None, clock=time.time):
+        self.path = path
+        self.offline = offline
+        self.max_age = STORE_MAX_AGE if max_age is None else max_age
+        self.clock = clock
+        self.conn = None
+        # Lookups run in worker threads (see ApiClient.fetch) and share one connection
+        self.lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.writes = 0
+
+    def connect(self):
+        """Open the database on first use (idempotent)"""
+        with self.lock:
+            if self.conn is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self.conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+                self.conn.execute("PRAGMA journal_mode=WAL")
+                self.conn.execute("PRAGMA synchronous=NORMAL")
+                self.conn.execute(SCHEMA)
+                self.prune()
+            return self.conn
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+    def key(self, params: dict) -> str:
+        return json.dumps(cache_key(params))
+
+    def get(self, params: dict, allow_stale: bool = False):
+        """Stored response if it is still fresh (or any age when offline/allow_stale), else None"""
+        with self.lock:
+            row = self.connect().execute(
+                "SELECT body, fetched_at, immutable FROM responses WHERE key = ?", (self.key(params),)
+            ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        body, fetched_at, immutable = row
+        age = self.clock() - fetched_at
+        fresh = immutable or age < self.max_age.get(params.get('action', ''), DEFAULT_MAX_AGE)
+        if fresh or self.offline:
+            self.hits += 1
+        elif allow_stale:
+            self.stale += 1
+        else:
+            self.misses += 1
+            return None
+        return json.loads(body)
+
+    def put(self, params: dict, data):
+        """Store a successful response, marking final match lists immutable"""
+        body = json.dumps(data)
+        with self.lock:
+            self.connect().execute(
+                "INSERT OR REPLACE INTO responses (key, action, body, fetched_at, immutable) VALUES (?, ?, ?, ?, ?)",
+                (self.key(params), params.get('action', ''), body, self.clock(), int(is_immutable(params, data))),
+            )
+        self.writes += 1
+
+    def prune(self, retention: float = STORE_RETENTION) -> int:
+        """Delete mutable responses older than `retention` seconds"""
+        with self.lock:
+            cursor = self.connect().execute(
+                "DELETE FROM responses WHERE immutable = 0 AND fetched_at < ?", (self.clock() - retention,)
+            )
+            return cursor.rowcount
+
+    def stats(self) -> dict:
+        with self.lock:
+            count, immutable = self.connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(immutable), 0) FROM responses"
+            ).fetchone()
+        lookups = self.hits + self.misses + self.stale
+        return {
+            'entries': count,
+            'immutable': immutable,
+            'hits': self.hits,
+            'misses': self.misses,
+            'stale_served': self.stale,
+            'writes': self.writes,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'offline': self.offline,
+        }
@@ -47,6 +47,10 @@ def main():
     if not run_command("python data_pipeline/train_model.py", "Training ML model"):
         return False
     
+    # Step 5: Report smaller, faster model candidates (ship one with compress_model.py --ship)
+    if not run_command("python data_pipeline/compress_model.py", "Comparing compressed model candidates"):
+        return False
+    
     print("\n🎉 ML Pipeline setup complete!")
     print("✅ You can now run your bot with: python bot.py")
     print("✅ Use /predict <home_team> <away_team> for ML predictions")
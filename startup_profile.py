@@ -0,0 +1,68 @@
+"""
+Startup profiler for the bot: import cost per package and model-load stages
+
+    python bot.py --profile-startup
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+BOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def import_times(code: str) -> dict:
+    """Run code in a fresh interpreter with -X importtime; self time (us) per top-level package"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            cwd=BOT_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else "profiling failed")
+
+    packages = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        package = name.strip().split('.')[0]
+        packages[package] = packages.get(package, 0) + int(self_us)
+    return packages
+
+
+def print_imports(title: str, packages: dict, top: int):
+    total = sum(packages.values())
+    print(f"\n{title}: {total / 1000:.0f} ms across {len(packages)} packages")
+    for package, micros in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {package:<24}{micros / 1000:>8.1f} ms  {micros / total:>5.1%}")
+
+
+def profile_startup(top: int = 12):
+    """Report what `import bot` and the background model load each cost"""
+    print("⏱️ Profiling bot startup (fresh interpreters, -X importtime)")
+
+    bot_imports = import_times("import bot")
+    print_imports("import bot (blocks before the gateway connects)", bot_imports, top)
+
+    with_model = import_times("import bot; bot.load_model()")
+    model_imports = {package: micros - bot_imports.get(package, 0)
+                     for package, micros in with_model.items()
+                     if micros - bot_imports.get(package, 0) > 0}
+    print_imports("Imports triggered by model load (background thread)", model_imports, top)
+
+    # Stage timings in this process; the ML stack is still cold, as on a real start
+    sys.path.insert(0, BOT_DIR)
+    os.chdir(BOT_DIR)
+    import bot
+    from model_store import load_bundle
+
+    timings = {}
+    start = time.perf_counter()
+    try:
+        load_bundle(bot.USE_PROBA_TABLE, timings=timings)
+    except FileNotFoundError:
+        print("\n⚠️ No trained model found, skipping model-load stages")
+        return
+    total = time.perf_counter() - start
+    print(f"\nModel load stages: {total * 1000:.0f} ms")
+    for name, seconds in timings.items():
+        print(f"  {name:<38}{seconds * 1000:>8.1f} ms")
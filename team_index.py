@@ -0,0 +1,201 @@
+"""
+Local index of team names to API team IDs
+Built from league standings and the event store, so /predict can turn a
+typed name into a numeric team_id without an API call, and slash-command
+autocomplete can answer from memory
+"""
+
+import bisect
+import difflib
+import json
+import os
+import unicodedata
+
+EVENT_STORE_META = 'data_pipeline/events/meta.json'
+RAW_EVENTS_PATH = 'data_pipeline/raw_events.json'
+
+# Discord shows at most 25 autocomplete choices
+MAX_CHOICES = 25
+# Minimum difflib similarity for a fuzzy match
+FUZZY_CUTOFF = 0.75
+
+# Club words dropped when deriving an alias ("Arsenal FC" -> "arsenal")
+CLUB_WORDS = {'fc', 'afc', 'cf', 'sc', 'ac', 'the'}
+
+# Common nicknames, keyed by normalized alias -> normalized team name
+TEAM_ALIASES = {
+    'man utd': 'manchester united',
+    'man united': 'manchester united',
+    'man u': 'manchester united',
+    'man city': 'manchester city',
+    'spurs': 'tottenham',
+    'tottenham hotspur': 'tottenham',
+    'wolves': 'wolverhampton wanderers',
+    'forest': 'nottingham forest',
+    'nottm forest': 'nottingham forest',
+    'villa': 'aston villa',
+    'brighton': 'brighton & hove albion',
+    'west ham united': 'west ham',
+    'newcastle united': 'newcastle',
+    'sheffield utd': 'sheffield united',
+    'leicester city': 'leicester',
+    'barca': 'barcelona',
+    'real': 'real madrid',
+    'atletico': 'atletico madrid',
+    'inter': 'inter milan',
+    'psg': 'paris saint germain',
+    'bayern': 'bayern munich',
+}
+
+
+def normalize(name: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace"""
+    name = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode()
+    name = ''.join(ch if ch.isalnum() or ch == '&' else ' ' for ch in name.lower())
+    return ' '.join(name.split())
+
+
+def derived_aliases(key: str) -> set:
+    """Extra keys for one normalized name: without club words, and each later word onwards"""
+    words = key.split()
+    aliases = set()
+    stripped = [word for word in words if word not in CLUB_WORDS]
+    if stripped and stripped != words:
+        aliases.add(' '.join(stripped))
+    # "manchester united" is also found by typing "united"
+    for start in range(1, len(words)):
+        if words[start] not in CLUB_WORDS:
+            aliases.add(' '.join(words[start:]))
+    return aliases
+
+
+class TeamIndex:
+    """Name -> team_id index with exact, prefix and fuzzy lookups"""
+
+    def __init__(self):
+        self.names = {}       # team_id -> display name
+        self.exact = {}       # full normalized name or alias -> team_id
+        self.partial = {}     # derived word-suffix key -> set of team_ids
+        self.keys = []        # sorted (key, team_id) pairs for prefix search
+        self.cache = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, team_id, name: str):
+        """Register a team; a later name for the same ID becomes its display name"""
+        team_id, key = str(team_id), normalize(name)
+        if not team_id or not key:
+            return
+        self.names[team_id] = name
+        self.exact[key] = team_id
+        for alias in derived_aliases(key):
+            self.partial.setdefault(alias, set()).add(team_id)
+
+    def add_standings(self, standings: list):
+        for team in standings:
+            self.add(team.get('team_id', ''), team.get('team_name', ''))
+
+    def add_events(self, events: list):
+        for event in events:
+            self.add(event.get('match_hometeam_id', ''), event.get('match_hometeam_name', ''))
+            self.add(event.get('match_awayteam_id', ''), event.get('match_awayteam_name', ''))
+
+    def add_team_names(self, team_names: dict):
+        for team_id, name in team_names.items():
+            self.add(team_id, name)
+
+    def finalize(self):
+        """Resolve aliases and rebuild the sorted key list; call after adding teams"""
+        for alias, target in TEAM_ALIASES.items():
+            team_id = self.exact.get(target)
+            if team_id is None:
+                team_ids = self.partial.get(target, ())
+                team_id = next(iter(team_ids)) if len(team_ids) == 1 else None
+            if team_id is not None:
+                self.exact.setdefault(alias, team_id)
+
+        keys = set(self.exact.items())
+        for key, team_ids in self.partial.items():
+            keys.update((key, team_id) for team_id in team_ids)
+        self.keys = sorted(keys)
+        self.cache = {}
+        return self
+
+    def prefix_matches(self, key: str) -> list:
+        """Team IDs with any key starting with `key`, best (shortest) key first"""
+        start = bisect.bisect_left(self.keys, (key, ''))
+        matches = []
+        for candidate, team_id in self.keys[start:]:
+            if not candidate.startswith(key):
+                break
+            matches.append((len(candidate), candidate, team_id))
+        seen, team_ids = set(), []
+        for _, _, team_id in sorted(matches):
+            if team_id not in seen:
+                seen.add(team_id)
+                team_ids.append(team_id)
+        return team_ids
+
+    def fuzzy_matches(self, key: str, limit: int = 5) -> list:
+        """Team IDs whose full name or alias is close to `key` (typos)"""
+        close = difflib.get_close_matches(key, self.exact.keys(), n=limit, cutoff=FUZZY_CUTOFF)
+        return list(dict.fromkeys(self.exact[match] for match in close))
+
+    def resolve(self, query: str):
+        """(team_id, display name) for a typed name or team ID, or None"""
+        key = normalize(query)
+        if key in self.cache:
+            return self.cache[key]
+
+        if str(query).strip() in self.names:
+            team_id = str(query).strip()
+        elif key in self.exact:
+            team_id = self.exact[key]
+        elif len(self.partial.get(key, ())) == 1:
+            team_id = next(iter(self.partial[key]))
+        else:
+            # A unique prefix, else the closest spelling if nothing starts with it
+            prefixed = self.prefix_matches(key) if key else []
+            fuzzy = self.fuzzy_matches(key, 1) if key and not prefixed else []
+            team_id = prefixed[0] if len(prefixed) == 1 else (fuzzy[0] if fuzzy else None)
+
+        resolved = (team_id, self.names[team_id]) if team_id is not None else None
+        self.cache[key] = resolved
+        return resolved
+
+    def complete(self, query: str, limit: int = MAX_CHOICES) -> list:
+        """Display names for autocomplete: prefix matches, then fuzzy ones"""
+        key = normalize(query)
+        if not key:
+            return sorted(self.names.values())[:limit]
+        team_ids = self.prefix_matches(key)
+        if len(team_ids) < limit and len(key) >= 3:
+            team_ids += [team_id for team_id in self.fuzzy_matches(key, limit)
+                         if team_id not in team_ids]
+        return [self.names[team_id] for team_id in team_ids[:limit]]
+
+
+def load_stored_team_names(meta_path: str = EVENT_STORE_META, json_fallback: str = RAW_EVENTS_PATH) -> dict:
+    """team_id -> name from the event store's metadata, or a legacy raw_events.json"""
+    try:
+        with open(meta_path, 'r') as f:
+            return json.load(f).get('team_names', {})
+    except FileNotFoundError:
+        pass
+    if not os.path.exists(json_fallback):
+        return {}
+
+    index = TeamIndex()
+    with open(json_fallback, 'r') as f:
+        index.add_events(json.load(f))
+    return index.names
+
+
+def build_team_index(standings_lists: list = (), team_names: dict = None) -> TeamIndex:
+    """Index stored names first so names from current standings take precedence"""
+    index = TeamIndex()
+    index.add_team_names(load_stored_team_names() if team_names is None else team_names)
+    for standings in standings_lists:
+        index.add_standings(standings)
+    return index.finalize()
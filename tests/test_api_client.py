@@ -0,0 +1,69 @@
+import asyncio
+
+import aiohttp
+
+from api_client import ApiClient
+from benchmarks.stub_api import StubApi
+
+PARAMS = {'action': 'get_standings', 'league_id': '152', 'APIkey': 'stub'}
+CALLS = 20
+
+
+async def with_stub(run, **stub_options):
+    stub = await StubApi(**stub_options).start()
+    try:
+        result = await run(stub)
+    finally:
+        await stub.stop()
+    return stub, result
+
+
+def test_shared_client_reuses_one_connection():
+    async def run(stub):
+        client = ApiClient(base_url=stub.base_url)
+        try:
+            return [await client.get_json(PARAMS) for _ in range(CALLS)]
+        finally:
+            await client.close()
+
+    stub, results = asyncio.run(with_stub(run))
+    assert stub.requests == CALLS
+    assert len(stub.connections) == 1
+    assert all(len(standings) == 20 for standings in results)
+
+
+def test_session_per_call_opens_a_connection_each_time():
+    # The behaviour the pooled client replaced, kept as a check that the stub counts connections
+    async def run(stub):
+        for _ in range(CALLS):
+            async with aiohttp.ClientSession() as session:
+                async with session.get(stub.base_url, params=PARAMS) as response:
+                    await response.json()
+
+    stub, _ = asyncio.run(with_stub(run))
+    assert len(stub.connections) == CALLS
+
+
+def test_concurrent_calls_stay_within_the_pool():
+    async def run(stub):
+        client = ApiClient(base_url=stub.base_url, limit_per_host=4)
+        try:
+            return await asyncio.gather(*(client.get_json(PARAMS) for _ in range(CALLS)))
+        finally:
+            await client.close()
+
+    stub, results = asyncio.run(with_stub(run, latency=0.01))
+    assert len(results) == CALLS
+    assert len(stub.connections) <= 4
+
+
+def test_http_errors_return_none():
+    async def run(stub):
+        client = ApiClient(base_url=stub.base_url)
+        try:
+            return await client.get_json({'action': 'unknown'})
+        finally:
+            await client.close()
+
+    _, result = asyncio.run(with_stub(run))
+    assert result is None
@@ -0,0 +1,67 @@
+import os
+import threading
+
+import pytest
+
+from atomic_write import UMASK, atomic_dir, atomic_open
+from benchmarks.synthetic import make_events
+from data_pipeline.event_store import events_to_columns, load_event_store, merge_columns, save_event_store
+
+
+def test_interleaved_writers_do_not_share_a_temp_file(tmp_path):
+    path = str(tmp_path / 'store.json')
+    with atomic_open(path) as first:
+        first.write('first')
+        with atomic_open(path) as second:
+            second.write('second')
+    # Both complete whole; the last to finish wins
+    assert open(path).read() == 'first'
+    assert os.listdir(tmp_path) == ['store.json']
+
+
+def test_failed_write_keeps_the_old_file(tmp_path):
+    path = str(tmp_path / 'store.json')
+    with atomic_open(path) as f:
+        f.write('old')
+    with pytest.raises(RuntimeError):
+        with atomic_open(path) as f:
+            f.write('half')
+            raise RuntimeError
+    assert open(path).read() == 'old'
+    assert os.listdir(tmp_path) == ['store.json']
+
+
+def test_files_get_umask_permissions(tmp_path):
+    path = str(tmp_path / 'metrics.prom')
+    with atomic_open(path) as f:
+        f.write('x')
+    assert os.stat(path).st_mode & 0o777 == 0o666 & ~UMASK
+
+
+def test_directory_replaces_the_old_one(tmp_path):
+    path = str(tmp_path / 'events')
+    for version in ('1', '2'):
+        with atomic_dir(path) as tmp_dir:
+            with open(os.path.join(tmp_dir, 'version'), 'w') as f:
+                f.write(version)
+    assert open(os.path.join(path, 'version')).read() == '2'
+    assert os.listdir(tmp_path) == ['events']
+
+
+def test_event_store_reader_waits_out_a_swap(tmp_path):
+    path = str(tmp_path / 'events')
+    columns, meta = events_to_columns(make_events())
+    save_event_store(merge_columns({}, columns), meta, path)
+
+    # Freeze the swap halfway: the old store moved aside, the new one not yet in place
+    os.rename(path, f"{path}.old")
+    timer = threading.Timer(0.1, os.rename, (f"{path}.old", path))
+    timer.start()
+    loaded, _ = load_event_store(path)
+    timer.join()
+    assert len(loaded['match_id']) == len(columns['match_id'])
+
+
+def test_missing_event_store_still_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        load_event_store(str(tmp_path / 'events'))
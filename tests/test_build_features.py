@@ -0,0 +1,78 @@
+from benchmarks.synthetic import make_events
+from data_pipeline.build_features import extract_features_offline
+from data_pipeline.feature_store import FORM_WINDOW, season_of
+from data_pipeline.matches import Match, kickoff_minutes, parse_events
+
+
+def match(match_id: int, home_id: int, away_id: int, home_score: int, away_score: int,
+          match_date: str = '2024-03-02', match_time: str = '15:00') -> Match:
+    return Match(match_id, 152, kickoff_minutes(match_date, match_time), home_id, away_id, home_score, away_score)
+
+
+def results_before(matches: list, team_id: int, kickoff: int) -> list:
+    """The team's results (1/0/-1) in kickoff order from matches strictly before `kickoff`"""
+    earlier = sorted((m for m in matches if m.kickoff < kickoff and team_id in (m.home_id, m.away_id)),
+                     key=lambda m: m.kickoff)
+    return [m.outcome if m.home_id == team_id else -m.outcome for m in earlier]
+
+
+def test_rows_only_see_earlier_kickoffs():
+    matches = parse_events(make_events(seasons=2, teams=6))
+    by_id = {m.match_id: m for m in matches}
+    rows = extract_features_offline(matches)
+    assert [row['match_id'] for row in rows] == [m.match_id for m in sorted(matches, key=lambda m: m.kickoff)]
+
+    for row in rows:
+        fixture = by_id[row['match_id']]
+        for side, team_id in (('home', fixture.home_id), ('away', fixture.away_id)):
+            assert row[f'form_{side}'] == results_before(matches, team_id, fixture.kickoff)[-FORM_WINDOW:].count(1)
+        h2h = [m for m in matches
+               if m.kickoff < fixture.kickoff and {m.home_id, m.away_id} == {fixture.home_id, fixture.away_id}]
+        winners = [m.home_id if m.outcome == 1 else m.away_id for m in h2h if m.outcome != 0]
+        assert row['h2h_home_wins'] == winners.count(fixture.home_id)
+        assert row['h2h_away_wins'] == winners.count(fixture.away_id)
+        assert row['result'] == fixture.outcome
+
+
+def test_later_results_do_not_change_earlier_rows():
+    events = make_events(seasons=1, teams=6)
+    last_day = max(event['match_date'] for event in events)
+    flipped = [{**event, 'match_hometeam_score': event['match_awayteam_score'],
+                'match_awayteam_score': event['match_hometeam_score']} if event['match_date'] == last_day else event
+               for event in events]
+    before = extract_features_offline(parse_events(events))
+    after = extract_features_offline(parse_events(flipped))
+    assert [row['result'] for row in before] != [row['result'] for row in after]
+    earlier = [row for row in before if row['match_date'] < last_day]
+    assert earlier == [row for row in after if row['match_date'] < last_day]
+
+
+def test_matches_sharing_a_kickoff_do_not_see_each_other():
+    rows = extract_features_offline([
+        match(1, 10, 20, 3, 0),
+        match(2, 10, 30, 1, 0),
+        match(3, 20, 10, 0, 2, match_time='17:30'),
+    ])
+    assert [(row['form_home'], row['form_away']) for row in rows] == [(0, 0), (0, 0), (0, 2)]
+
+
+def test_seasons_start_level_with_promoted_teams():
+    events = make_events(seasons=2, teams=6)
+    # Team 3005 is relegated after the first season and 3099 comes up in its place
+    for event in events:
+        if event['match_date'] >= '2006-08-01':
+            for side in ('match_hometeam_id', 'match_awayteam_id'):
+                if event[side] == '3005':
+                    event[side] = '3099'
+    matches = parse_events(events)
+    by_id = {m.match_id: m for m in matches}
+    rows = extract_features_offline(matches)
+
+    second = [row for row in rows if season_of(by_id[row['match_id']].kickoff) == 2006]
+    first_kickoff = by_id[second[0]['match_id']].kickoff
+    level = {team_id: position for position, team_id in enumerate(sorted([3000, 3001, 3002, 3003, 3004, 3099]), 1)}
+    for row in second:
+        if by_id[row['match_id']].kickoff == first_kickoff:
+            assert row['standing_home'] == level[row['home_id']]
+            assert row['standing_away'] == level[row['away_id']]
+    assert max(max(row['standing_home'], row['standing_away']) for row in second) <= 6
@@ -0,0 +1,39 @@
+import numpy as np
+
+from data_pipeline.event_store import COLUMN_TYPES, events_to_columns, merge_columns
+
+
+def event(match_id: int, match_date: str, home_score: str = '1', away_score: str = '0',
+          status: str = 'Finished') -> dict:
+    return {
+        'match_id': str(match_id), 'match_date': match_date, 'match_time': '15:00',
+        'match_status': status, 'league_id': '152', 'league_name': 'Premier League',
+        'match_hometeam_id': '1', 'match_hometeam_name': 'Home',
+        'match_awayteam_id': '2', 'match_awayteam_name': 'Away',
+        'match_hometeam_score': home_score, 'match_awayteam_score': away_score,
+    }
+
+
+def test_merge_into_empty_sorts_by_kickoff():
+    columns, _ = events_to_columns([event(2, '2024-03-09'), event(1, '2024-03-02')])
+    merged = merge_columns({}, columns)
+    assert merged['match_id'].tolist() == [1, 2]
+    assert set(merged) == set(COLUMN_TYPES)
+
+
+def test_merge_keeps_newest_row_per_match():
+    old, meta = events_to_columns([event(1, '2024-03-02', '', '', 'Not Started'), event(2, '2024-03-09')])
+    new, meta = events_to_columns([event(1, '2024-03-02', '3', '1'), event(3, '2024-03-16')], meta)
+    merged = merge_columns(merge_columns({}, old), new)
+
+    assert merged['match_id'].tolist() == [1, 2, 3]
+    assert merged['home_score'].tolist() == [3, 1, 1]
+    assert meta['statuses'][merged['status'][0]] == 'Finished'
+
+
+def test_merge_orders_by_kickoff_not_arrival():
+    old, meta = events_to_columns([event(5, '2024-04-01')])
+    new, meta = events_to_columns([event(4, '2024-01-01'), event(6, '2024-02-01')], meta)
+    merged = merge_columns(merge_columns({}, old), new)
+    assert merged['match_id'].tolist() == [4, 6, 5]
+    assert (np.diff(merged['kickoff'].astype(np.int64)) >= 0).all()
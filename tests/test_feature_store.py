@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from benchmarks.synthetic import make_events
+from data_pipeline.feature_store import FeatureStore, UNKNOWN_STANDING, season_of, update_feature_store
+from data_pipeline.matches import Match, kickoff_minutes, parse_events
+
+
+def match(match_id: int, home_id: int, away_id: int, home_score: int, away_score: int,
+          match_date: str = '2024-03-02', league_id: int = 152) -> Match:
+    return Match(match_id, league_id, kickoff_minutes(match_date, '15:00'), home_id, away_id, home_score, away_score)
+
+
+def test_season_starts_in_august():
+    assert season_of(kickoff_minutes('2023-07-31')) == 2022
+    assert season_of(kickoff_minutes('2023-08-01')) == 2023
+    assert season_of(kickoff_minutes('2024-05-31')) == 2023
+
+
+def test_update_counts_each_match_once():
+    store = FeatureStore()
+    assert store.update(match(1, 10, 20, 2, 0))
+    assert not store.update(match(1, 10, 20, 2, 0))
+    assert not store.update(match(2, 10, 20, -1, -1))
+    assert store.form(10) == 1 and store.form(20) == 0
+    assert store.standing(10) == 1 and store.standing(20) == 2
+    assert store.h2h_record(10, 20) == (1, 0, 0)
+    assert store.h2h_record(20, 10) == (0, 1, 0)
+
+
+def test_unknown_teams_have_no_features():
+    store = FeatureStore()
+    store.update(match(1, 10, 20, 1, 1))
+    assert store.features(10, 30) is None
+    assert store.standing(30) == UNKNOWN_STANDING
+
+
+def test_form_window():
+    store = FeatureStore(window=3)
+    for i in range(5):
+        store.update(match(i, 10, 20, 1, 0, f'2024-03-{i + 1:02d}'))
+    store.update(match(9, 20, 10, 1, 0, '2024-03-09'))
+    assert store.form(10) == 2
+
+
+def test_tables_reset_each_season():
+    store = FeatureStore()
+    store.update(match(1, 10, 20, 3, 0, '2023-03-01'))
+    store.update(match(2, 30, 40, 1, 0, '2023-08-20'))
+    assert store.positions(152, 2022) == {10: 1, 20: 2}
+    assert store.positions(152, 2023) == {30: 1, 40: 2}
+    # Without a season, a team's standing comes from its latest match's table
+    assert store.standing(10) == 1 and store.standing(40) == 2
+
+
+def test_save_load_round_trip(tmp_path):
+    store = FeatureStore()
+    store.apply(parse_events(make_events(seasons=2)))
+    path = str(tmp_path / 'store.json')
+    store.save(path)
+    loaded = FeatureStore.load(path)
+
+    assert loaded.to_dict() == store.to_dict()
+    assert loaded.last_kickoff == store.last_kickoff
+    for home_id, away_id in [(3000, 3001), (3005, 3012), (3019, 3002)]:
+        assert loaded.features(home_id, away_id) == store.features(home_id, away_id)
+
+
+def test_round_trip_keeps_updating(tmp_path):
+    matches = sorted(parse_events(make_events(seasons=1)), key=lambda m: m.kickoff)
+    path = str(tmp_path / 'store.json')
+    update_feature_store(matches[:200], path)
+    resumed = update_feature_store(matches, path)
+
+    full = FeatureStore()
+    full.apply(matches)
+    assert resumed.to_dict() == full.to_dict()
+
+
+def test_old_format_is_rejected_and_rebuilt(tmp_path):
+    path = tmp_path / 'store.json'
+    path.write_text(json.dumps({'window': 10, 'tables': {}}))
+    with pytest.raises(ValueError):
+        FeatureStore.load(str(path))
+    store = update_feature_store([match(1, 10, 20, 1, 0)], str(path))
+    assert len(store.applied) == 1
+    assert FeatureStore.load(str(path)).to_dict() == store.to_dict()
@@ -0,0 +1,97 @@
+import asyncio
+import json
+
+import pytest
+
+from benchmarks.stub_api import make_fixture
+from data_pipeline import fetch_data
+from data_pipeline.event_store import load_event_store
+
+SEASON_CHUNKS = fetch_data.month_chunks(*fetch_data.season_window('2022'))
+
+
+class FakeClient:
+    def __init__(self, data):
+        self.data = data
+
+    async def fetch(self, params, retries=0):
+        return 200, self.data
+
+
+def fixture_in(match_id: int, start: str) -> dict:
+    return {**make_fixture(match_id, 1, 2), 'match_date': start}
+
+
+@pytest.fixture
+def pipeline_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('API_FOOTBALL_KEY', 'test')
+    monkeypatch.setattr(fetch_data, 'FETCH_SAVE_EVERY', 3)
+    return tmp_path
+
+
+def run_fetch(monkeypatch, fake_fetch):
+    calls = []
+
+    async def fetch_events(client, start, end, league_id, api_key):
+        calls.append((start, end))
+        return fake_fetch(start, end)
+
+    monkeypatch.setattr(fetch_data, 'fetch_events_for_date_range', fetch_events)
+    asyncio.run(fetch_data.fetch_all_season_data(['152'], ['2022'], concurrency=1))
+    return calls
+
+
+def saved_checkpoint() -> set:
+    with open(fetch_data.CHECKPOINT_FILE) as f:
+        return set(json.load(f)['complete'])
+
+
+def test_no_event_found_is_an_empty_chunk():
+    no_events = FakeClient({'error': 404, 'message': 'No event found (please check your plan)!!'})
+    assert asyncio.run(fetch_data.fetch_events_for_date_range(no_events, '2022-08-01', '2022-08-31', '152', 'k')) == []
+    assert fetch_data.chunk_is_final('2022-08-31', [])
+
+    bad_key = FakeClient({'error': 401, 'message': 'Authentification failed!'})
+    assert asyncio.run(fetch_data.fetch_events_for_date_range(bad_key, '2022-08-01', '2022-08-31', '152', 'k')) is None
+
+
+def test_resume_fetches_only_unfinished_chunks(pipeline_dir, monkeypatch):
+    failing = SEASON_CHUNKS[4]
+
+    def first_run(start, end):
+        if (start, end) == failing:
+            return None
+        # Every other month is empty
+        return [fixture_in(int(start[5:7]), start)] if int(start[5:7]) % 2 else []
+
+    saves = []
+    save_event_store = fetch_data.save_event_store
+    monkeypatch.setattr(fetch_data, 'save_event_store', lambda *args: saves.append(save_event_store(*args)))
+    assert len(run_fetch(monkeypatch, first_run)) == len(SEASON_CHUNKS)
+    # Every third chunk and once at the end, not after every chunk
+    assert 0 < len(saves) <= len(SEASON_CHUNKS) // 3 + 1
+    complete = saved_checkpoint()
+    assert complete == {fetch_data.chunk_key('152', *chunk) for chunk in SEASON_CHUNKS if chunk != failing}
+    stored, _ = load_event_store(fetch_data.EVENT_STORE_DIR, mmap=False)
+    assert len(stored['match_id']) == sum(int(start[5:7]) % 2 for start, end in SEASON_CHUNKS
+                                          if (start, end) != failing)
+
+    assert run_fetch(monkeypatch, lambda start, end: []) == [failing]
+    assert saved_checkpoint() == {fetch_data.chunk_key('152', *chunk) for chunk in SEASON_CHUNKS}
+    assert run_fetch(monkeypatch, lambda start, end: []) == []
+
+
+def test_interrupted_run_keeps_finished_chunks(pipeline_dir, monkeypatch):
+    def interrupted(start, end):
+        if (start, end) == SEASON_CHUNKS[4]:
+            raise KeyboardInterrupt
+        return [fixture_in(int(start[5:7]), start)]
+
+    with pytest.raises(KeyboardInterrupt):
+        run_fetch(monkeypatch, interrupted)
+    complete = saved_checkpoint()
+    assert {fetch_data.chunk_key('152', *chunk) for chunk in SEASON_CHUNKS[:4]} <= complete
+    assert fetch_data.chunk_key('152', *SEASON_CHUNKS[4]) not in complete
+    stored, _ = load_event_store(fetch_data.EVENT_STORE_DIR, mmap=False)
+    assert len(stored['match_id']) == len(complete)
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from flat_forest import FlatForest, check_parity, export_flat_forest
+from data_pipeline.train_model import FEATURE_COLUMNS
+
+
+def small_forest(rows: int = 400, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.integers(0, 20, (rows, len(FEATURE_COLUMNS))).astype(float), columns=FEATURE_COLUMNS)
+    y = rng.choice([-1, 0, 1], rows)
+    model = RandomForestClassifier(n_estimators=15, max_depth=6, random_state=seed).fit(X, y)
+    return model, X
+
+
+def test_flat_forest_matches_predict_proba():
+    model, X = small_forest()
+    flat = FlatForest.from_sklearn(model, FEATURE_COLUMNS)
+    assert check_parity(model, flat, X.to_numpy()) == 0.0
+    assert list(flat.classes_) == list(model.classes_)
+    assert (flat.predict(X.to_numpy()) == model.predict(X)).all()
+
+
+def test_flat_forest_single_row_and_unseen_values():
+    model, X = small_forest()
+    flat = FlatForest.from_sklearn(model, FEATURE_COLUMNS)
+    rows = np.array([X.iloc[0].to_numpy(), np.full(len(FEATURE_COLUMNS), 99.0)])
+    assert check_parity(model, flat, rows[:1]) == 0.0
+    assert check_parity(model, flat, rows) == 0.0
+
+
+def test_export_round_trip(tmp_path):
+    model, X = small_forest()
+    path = str(tmp_path / 'flat.npz')
+    export_flat_forest(model, FEATURE_COLUMNS, path, X.to_numpy())
+    loaded = FlatForest.load(path)
+    assert loaded.n_trees == len(model.estimators_)
+    assert loaded.feature_columns == FEATURE_COLUMNS
+    assert check_parity(model, loaded, X.to_numpy()) == 0.0
@@ -0,0 +1,69 @@
+import asyncio
+import threading
+
+import pytest
+
+from inference import BatchPredictor
+
+
+def run(predictor: BatchPredictor, coro_fn):
+    async def main():
+        try:
+            return await coro_fn()
+        finally:
+            await predictor.stop()
+    return asyncio.run(main())
+
+
+def test_concurrent_requests_share_one_call_off_the_loop():
+    calls = []
+
+    def predict_fn(rows):
+        calls.append((list(rows), threading.current_thread().name))
+        return [row * 2 for row in rows]
+
+    predictor = BatchPredictor(predict_fn, window_ms=50)
+    assert run(predictor, lambda: predictor.predict_many([1, 2, 3, 4])) == [2, 4, 6, 8]
+    assert len(calls) == 1 and calls[0][0] == [1, 2, 3, 4]
+    assert calls[0][1].startswith('inference')
+    stats = predictor.stats()
+    assert stats['requests'] == 4 and stats['batches'] == 1 and stats['max_batch_size'] == 4
+
+
+def test_batches_are_capped_at_max_batch():
+    predictor = BatchPredictor(lambda rows: rows, window_ms=50, max_batch=3)
+    assert run(predictor, lambda: predictor.predict_many(list(range(7)))) == list(range(7))
+    assert predictor.stats()['batch_sizes'] == {1: 1, 3: 2}
+
+
+def test_errors_reach_every_caller_in_the_batch():
+    def predict_fn(rows):
+        if None in rows:
+            raise ValueError("bad row")
+        return rows
+
+    predictor = BatchPredictor(predict_fn, window_ms=50)
+
+    async def main():
+        results = await asyncio.gather(predictor.predict(1), predictor.predict(None), return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        # The batching task keeps serving after a failed batch
+        return await predictor.predict(5)
+
+    assert run(predictor, main) == 5
+
+
+def test_cancelled_requests_are_dropped_from_the_batch():
+    seen = []
+    predictor = BatchPredictor(lambda rows: seen.extend(rows) or rows, window_ms=50)
+
+    async def main():
+        cancelled = asyncio.create_task(predictor.predict('gone'))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        return await predictor.predict('kept')
+
+    assert run(predictor, main) == 'kept'
+    assert seen == ['kept']
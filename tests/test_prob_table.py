@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from prob_table import ProbabilityTable
+from data_pipeline.train_model import FEATURE_COLUMNS
+
+# A small grid keeps the build fast: 3 * 4 * 5 * 5 * 2 * 2 cells
+RANGES = {'form_home': (0, 2), 'form_away': (3, 6), 'standing_home': (1, 5), 'standing_away': (1, 5),
+          'h2h_home_wins': (0, 1), 'h2h_away_wins': (0, 1)}
+
+
+def small_table(seed: int = 0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.integers(0, 8, (300, len(FEATURE_COLUMNS))).astype(float), columns=FEATURE_COLUMNS)
+    model = RandomForestClassifier(n_estimators=10, max_depth=5, random_state=seed).fit(X, rng.choice([-1, 0, 1], 300))
+    return model, ProbabilityTable.build(model, FEATURE_COLUMNS, RANGES)
+
+
+def test_table_matches_the_model_on_the_grid():
+    model, table = small_table()
+    assert table.table.shape == (3, 4, 5, 5, 2, 2, 3)
+    assert list(table.classes) == list(model.classes_)
+    grid = np.indices(table.table.shape[:-1]).reshape(len(FEATURE_COLUMNS), -1).T + table.lows
+    expected = model.predict_proba(pd.DataFrame(grid.astype(float), columns=FEATURE_COLUMNS))
+    probabilities, in_range = table.lookup_batch(grid.astype(float))
+    assert in_range.all()
+    np.testing.assert_allclose(probabilities, expected, atol=1e-6)
+
+    row = dict(zip(FEATURE_COLUMNS, grid[17]))
+    np.testing.assert_allclose(table.lookup(row), expected[17], atol=1e-6)
+
+
+def test_off_grid_rows_are_left_to_the_model():
+    _, table = small_table()
+    on_grid = {'form_home': 1, 'form_away': 4, 'standing_home': 2, 'standing_away': 3,
+               'h2h_home_wins': 0, 'h2h_away_wins': 1}
+    assert table.lookup(on_grid) is not None
+    assert table.lookup({**on_grid, 'form_away': 7}) is None
+    assert table.lookup({**on_grid, 'standing_home': 2.5}) is None
+
+    X = np.array([[on_grid[col] for col in FEATURE_COLUMNS],
+                  [on_grid[col] if col != 'form_home' else 3 for col in FEATURE_COLUMNS],
+                  [on_grid[col] if col != 'h2h_away_wins' else 0.5 for col in FEATURE_COLUMNS]], dtype=float)
+    probabilities, in_range = table.lookup_batch(X)
+    assert in_range.tolist() == [True, False, False]
+    assert (probabilities[~in_range] == 0).all()
+    np.testing.assert_allclose(probabilities[0], table.lookup(on_grid))
@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from request_scheduler import (BACKFILL, INTERACTIVE, PREFETCH, RATE_LIMIT_PAUSE, QuotaExceeded,
+                               RequestScheduler)
+
+RESERVE = {INTERACTIVE: 0.0, PREFETCH: 0.2, BACKFILL: 0.5}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def scheduler(tmp_path, **kwargs) -> RequestScheduler:
+    return RequestScheduler(**{'daily_quota': 10, 'reserve': RESERVE, 'path': str(tmp_path / 'q.sqlite3'), **kwargs})
+
+
+async def spend(scheduler: RequestScheduler, priority: int) -> int:
+    """Requests sent at `priority` until its quota runs out"""
+    sent = 0
+    while True:
+        try:
+            await scheduler.acquire(priority)
+        except QuotaExceeded:
+            return sent
+        scheduler.release()
+        sent += 1
+
+
+def test_lower_priorities_leave_quota_for_higher_ones(tmp_path):
+    # The bot and a pipeline run count against the same table
+    bot, pipeline = scheduler(tmp_path), scheduler(tmp_path)
+    try:
+        assert asyncio.run(spend(pipeline, BACKFILL)) == 5
+        assert asyncio.run(spend(bot, PREFETCH)) == 3
+        assert asyncio.run(spend(bot, INTERACTIVE)) == 2
+        assert asyncio.run(spend(pipeline, BACKFILL)) == 0
+        stats = bot.stats()
+        assert stats['used_today'] == 10 and stats['remaining'] == {'interactive': 0, 'prefetch': 0, 'backfill': 0}
+        assert pipeline.stats()['rejected']['backfill'] == 2
+    finally:
+        bot.close()
+        pipeline.close()
+
+
+def test_quota_resets_each_day(tmp_path):
+    today = ['2024-03-01']
+    quota = scheduler(tmp_path, day=lambda: today[0])
+    try:
+        assert asyncio.run(spend(quota, INTERACTIVE)) == 10
+        today[0] = '2024-03-02'
+        assert quota.quota_left(INTERACTIVE) == 10
+        assert asyncio.run(spend(quota, BACKFILL)) == 5
+    finally:
+        quota.close()
+
+
+def test_waiters_get_slots_in_priority_order(tmp_path):
+    quota = scheduler(tmp_path, daily_quota=100, max_in_flight=1)
+    order = []
+
+    async def request(priority):
+        await quota.acquire(priority)
+        order.append(priority)
+        quota.release()
+
+    async def main():
+        await quota.acquire(INTERACTIVE)
+        waiters = [asyncio.create_task(request(priority)) for priority in (BACKFILL, PREFETCH, BACKFILL, INTERACTIVE)]
+        await asyncio.sleep(0)
+        assert quota.stats()['queued'] == 4
+        quota.release()
+        await asyncio.gather(*waiters)
+
+    try:
+        asyncio.run(main())
+        assert order == [INTERACTIVE, PREFETCH, BACKFILL, BACKFILL]
+        assert quota.in_flight == 0
+    finally:
+        quota.close()
+
+
+def test_cancelled_waiter_does_not_leak_its_slot(tmp_path):
+    quota = scheduler(tmp_path, max_in_flight=1)
+
+    async def main():
+        await quota.acquire(INTERACTIVE)
+        waiter = asyncio.create_task(quota.acquire(BACKFILL))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        quota.release()
+        await asyncio.wait_for(quota.acquire(INTERACTIVE), 1)
+        quota.release()
+
+    try:
+        asyncio.run(main())
+        assert quota.in_flight == 0 and quota.stats()['queued'] == 0
+    finally:
+        quota.close()
+
+
+def test_rate_limit_pause_backs_off_and_recovers(tmp_path):
+    clock = FakeClock()
+    quota = scheduler(tmp_path, clock=clock)
+    quota.record(429)
+    assert quota.pause == RATE_LIMIT_PAUSE and quota.paused_until == clock.now + RATE_LIMIT_PAUSE
+    quota.record(429)
+    assert quota.pause == 2 * RATE_LIMIT_PAUSE
+    quota.record(429, retry_after='30')
+    assert quota.pause == 30
+    quota.record(503)
+    assert quota.pause == 30
+    quota.record(200)
+    assert quota.pause == 15
+    assert quota.stats()['rate_limited'] == 3
+    quota.close()
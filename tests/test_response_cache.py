@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+
+from response_cache import ResponseCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def counting_fetch(value='data', delay: float = 0.01):
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return value
+    return fetch, calls
+
+
+def test_concurrent_lookups_share_one_fetch():
+    async def run():
+        cache = ResponseCache()
+        fetch, calls = counting_fetch()
+        params = {'action': 'get_events', 'team_id': 1, 'APIkey': 'a'}
+        results = await asyncio.gather(*(cache.get_or_fetch(params, fetch) for _ in range(5)))
+        return cache, calls, results
+
+    cache, calls, results = asyncio.run(run())
+    assert results == ['data'] * 5
+    assert len(calls) == 1
+    assert cache.stats()['misses'] == 1 and cache.stats()['coalesced'] == 4
+
+
+def test_api_key_is_not_part_of_the_key():
+    async def run():
+        cache = ResponseCache()
+        fetch, calls = counting_fetch()
+        await cache.get_or_fetch({'action': 'get_events', 'APIkey': 'a'}, fetch)
+        await cache.get_or_fetch({'action': 'get_events', 'APIkey': 'b'}, fetch)
+        return calls
+
+    assert len(asyncio.run(run())) == 1
+
+
+def test_entries_expire_after_their_ttl():
+    clock = FakeClock()
+
+    async def run():
+        cache = ResponseCache(ttls={'get_standings': 60}, clock=clock)
+        fetch, calls = counting_fetch(delay=0)
+        params = {'action': 'get_standings', 'league_id': 152}
+        await cache.get_or_fetch(params, fetch)
+        clock.now = 59
+        await cache.get_or_fetch(params, fetch)
+        clock.now = 60
+        await cache.get_or_fetch(params, fetch)
+        return cache, calls
+
+    cache, calls = asyncio.run(run())
+    assert len(calls) == 2
+    assert cache.stats()['hits'] == 1
+
+
+def test_failed_lookups_are_not_cached():
+    async def run():
+        cache = ResponseCache()
+        fetch, calls = counting_fetch(value=None, delay=0)
+        for _ in range(2):
+            assert await cache.get_or_fetch({'action': 'get_H2H'}, fetch) is None
+        return cache, calls
+
+    cache, calls = asyncio.run(run())
+    assert len(calls) == 2
+    assert cache.stats()['entries'] == 0
+
+
+def test_cancelling_the_first_caller_does_not_fail_the_others():
+    async def run():
+        cache = ResponseCache()
+        fetch, calls = counting_fetch(delay=0.05)
+        params = {'action': 'get_events'}
+        first = asyncio.ensure_future(cache.get_or_fetch(params, fetch))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(cache.get_or_fetch(params, fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second, calls, cache
+
+    value, calls, cache = asyncio.run(run())
+    assert value == 'data'
+    assert len(calls) == 1
+    assert cache.inflight == {}
+
+
+def test_errors_reach_every_waiter():
+    async def run():
+        cache = ResponseCache()
+
+        async def fetch():
+            await asyncio.sleep(0.01)
+            raise ValueError('boom')
+        return await asyncio.gather(*(cache.get_or_fetch({'action': 'x'}, fetch) for _ in range(3)),
+                                    return_exceptions=True), cache
+
+    results, cache = asyncio.run(run())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert cache.inflight == {}
+
+
+def test_lru_eviction():
+    async def run():
+        cache = ResponseCache(max_entries=2)
+        for team_id in (1, 2, 1, 3):
+            fetch, _ = counting_fetch(value=team_id, delay=0)
+            await cache.get_or_fetch({'action': 'get_events', 'team_id': team_id}, fetch)
+        return cache
+
+    cache = asyncio.run(run())
+    assert cache.stats()['evictions'] == 1
+    assert cache.get((('action', 'get_events'), ('team_id', '2'))) is None
+    assert cache.get((('action', 'get_events'), ('team_id', '1'))) == 1
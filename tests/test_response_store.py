@@ -0,0 +1,78 @@
+import asyncio
+import sqlite3
+import threading
+import time
+
+from api_client import ApiClient
+from benchmarks.stub_api import StubApi
+from response_store import ResponseStore
+
+STANDINGS = {'action': 'get_standings', 'league_id': '152', 'APIkey': 'a'}
+PAST_EVENTS = {'action': 'get_events', 'from': '2020-01-01', 'to': '2020-01-31', 'league_id': '152'}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_fresh_then_stale(tmp_path):
+    clock = FakeClock()
+    store = ResponseStore(str(tmp_path / 'r.sqlite3'), offline=False, max_age={'get_standings': 60}, clock=clock)
+    store.put(STANDINGS, [{'team_id': '1'}])
+    assert store.get(STANDINGS) == [{'team_id': '1'}]
+    # The API key isn't part of the stored key
+    assert store.get({**STANDINGS, 'APIkey': 'b'}) == [{'team_id': '1'}]
+    clock.now += 60
+    assert store.get(STANDINGS) is None
+    assert store.get(STANDINGS, allow_stale=True) == [{'team_id': '1'}]
+
+
+def test_finished_past_events_never_expire(tmp_path):
+    clock = FakeClock()
+    store = ResponseStore(str(tmp_path / 'r.sqlite3'), offline=False, max_age={'get_events': 1}, clock=clock)
+    store.put(PAST_EVENTS, [{'match_id': '1', 'match_status': 'Finished'}])
+    clock.now += 10 ** 6
+    assert store.get(PAST_EVENTS) is not None
+    assert store.stats()['immutable'] == 1
+
+
+def test_locked_database_does_not_block_the_event_loop(tmp_path):
+    path = str(tmp_path / 'r.sqlite3')
+    store = ResponseStore(path, offline=False)
+    store.connect()
+    # Another process (the pipeline) holding the write lock for a while
+    other = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    other.execute("BEGIN IMMEDIATE")
+    threading.Timer(0.5, other.execute, ("COMMIT",)).start()
+
+    async def run():
+        stub = await StubApi().start()
+        client = ApiClient(base_url=stub.base_url, store=store)
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        beat = asyncio.ensure_future(heartbeat())
+        try:
+            start = time.perf_counter()
+            data = await client.get_json(STANDINGS)
+            return data, ticks, time.perf_counter() - start
+        finally:
+            beat.cancel()
+            await client.close()
+            await stub.stop()
+
+    data, ticks, seconds = asyncio.run(run())
+    assert len(data) == 20
+    # The put waited on the lock in a worker thread while the loop kept running
+    assert seconds >= 0.4
+    assert ticks >= 20
+    assert store.get(STANDINGS) == data
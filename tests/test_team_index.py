@@ -0,0 +1,75 @@
+import asyncio
+
+from team_index import TeamIndex, build_team_index, load_stored_team_names, normalize
+
+STANDINGS = [
+    {'team_id': '3100', 'team_name': 'Manchester United'},
+    {'team_id': '3101', 'team_name': 'Manchester City'},
+    {'team_id': '3102', 'team_name': 'Tottenham'},
+    {'team_id': '3103', 'team_name': 'Arsenal FC'},
+]
+
+
+def test_normalize_strips_accents_and_punctuation():
+    assert normalize('  Atlético   Madrid! ') == 'atletico madrid'
+    assert normalize('Brighton & Hove Albion') == 'brighton & hove albion'
+
+
+def test_resolve_names_aliases_ids_and_typos():
+    index = build_team_index([STANDINGS], team_names={})
+    assert len(index) == 4
+    assert index.resolve('manchester united') == ('3100', 'Manchester United')
+    assert index.resolve('Man Utd') == ('3100', 'Manchester United')
+    assert index.resolve('Spurs') == ('3102', 'Tottenham')
+    assert index.resolve('arsenal') == ('3103', 'Arsenal FC')
+    assert index.resolve('3101') == ('3101', 'Manchester City')
+    assert index.resolve('Totenham') == ('3102', 'Tottenham')
+    # "manchester" starts both clubs, so it is ambiguous
+    assert index.resolve('manchester') is None
+    assert index.resolve('Nowhere Rovers') is None
+
+
+def test_complete_lists_prefix_matches_first():
+    index = build_team_index([STANDINGS], team_names={})
+    assert index.complete('manc') == ['Manchester City', 'Manchester United']
+    assert index.complete('') == ['Arsenal FC', 'Manchester City', 'Manchester United', 'Tottenham']
+    assert len(index.complete('', limit=2)) == 2
+
+
+def test_standings_names_take_precedence_over_stored_names():
+    index = build_team_index([STANDINGS], team_names={'3102': 'Tottenham Hotspur', '3200': 'Old Club'})
+    assert index.names['3102'] == 'Tottenham'
+    assert index.resolve('old club') == ('3200', 'Old Club')
+
+
+def test_load_stored_team_names_from_meta_or_raw_events(tmp_path):
+    meta = tmp_path / 'meta.json'
+    raw = tmp_path / 'raw_events.json'
+    assert load_stored_team_names(str(meta), str(raw)) == {}
+
+    raw.write_text('[{"match_hometeam_id": "1", "match_hometeam_name": "Home", '
+                   '"match_awayteam_id": "2", "match_awayteam_name": "Away"}]')
+    assert load_stored_team_names(str(meta), str(raw)) == {'1': 'Home', '2': 'Away'}
+
+    meta.write_text('{"team_names": {"7": "Seven"}}')
+    assert load_stored_team_names(str(meta), str(raw)) == {'7': 'Seven'}
+
+
+def test_bot_retries_soon_while_the_index_is_empty(monkeypatch):
+    import bot
+
+    monkeypatch.delenv('API_FOOTBALL_KEY', raising=False)
+    monkeypatch.setattr(bot, 'team_index', TeamIndex())
+    loop = bot.refresh_team_index
+    try:
+        monkeypatch.setattr(bot, 'load_stored_team_names', lambda: {})
+        asyncio.run(loop.coro())
+        assert len(bot.team_index) == 0
+        assert loop.minutes == bot.TEAM_INDEX_RETRY_MINUTES and loop.hours == 0
+
+        monkeypatch.setattr(bot, 'load_stored_team_names', lambda: {'3100': 'Manchester United'})
+        asyncio.run(loop.coro())
+        assert len(bot.team_index) == 1
+        assert loop.hours == bot.TEAM_INDEX_REFRESH_HOURS and loop.minutes == 0
+    finally:
+        loop.change_interval(hours=bot.TEAM_INDEX_REFRESH_HOURS)